@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+多进程模式基准测试：比较线程池与不同进程数下批量获取+解析+序列化的耗时
+
+用法:
+    python scripts/bench_workers.py --symbols 200 --processes 1 2 4 8
+
+使用桩数据（AKSHARE_STUB_PARSE=1，模拟网页解析的CPU开销，无网络延迟），
+缓存写入临时目录且有效期为0，每次都完整执行获取、解析和序列化。
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("AKSHARE_STUB_LATENCY", "0")
+os.environ.setdefault("AKSHARE_STUB_PARSE", "1")
+os.environ["AKSHARE_MCP_CACHE_TTL"] = "0"
+os.environ["AKSHARE_MCP_BASE_PATH"] = tempfile.mkdtemp(prefix="akshare_bench_")
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.dirname(SCRIPTS_DIR))
+
+import stub_akshare  # noqa: E402
+
+stub_akshare.install()
+
+from concurrent.futures import ThreadPoolExecutor  # noqa: E402
+
+from src.tools.batch_data import _fetch_single_stock_data  # noqa: E402
+from src.utils import WorkerPool, format_batch_results, format_batch_fragments  # noqa: E402
+
+
+async def run_threads(symbols: list, indicator_type: str, threads: int) -> int:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        loop = asyncio.get_event_loop()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(executor, _fetch_single_stock_data, symbol, indicator_type)
+            for symbol in symbols
+        ])
+    return len(format_batch_results(results))
+
+
+async def run_processes(pool: WorkerPool, symbols: list, indicator_type: str) -> int:
+    fragments, success_count, _ = await pool.run_batch(symbols, indicator_type)
+    return len(format_batch_fragments(fragments, success_count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多进程模式基准测试")
+    parser.add_argument("--symbols", type=int, default=200, help="股票数量")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--threads", type=int, default=5, help="线程池模式的线程数（与批量工具一致）")
+    parser.add_argument("--indicator-type", default="all")
+    args = parser.parse_args()
+
+    symbols = stub_akshare.STUB_CODES[:args.symbols]
+    print(f"CPU核数: {os.cpu_count()}  股票数: {len(symbols)}  指标类型: {args.indicator_type}")
+    print(f"{'模式':<16}{'耗时(s)':>10}{'股票/s':>10}{'加速比':>8}{'输出(MB)':>10}")
+
+    start = time.perf_counter()
+    size = asyncio.run(run_threads(symbols, args.indicator_type, args.threads))
+    baseline = time.perf_counter() - start
+    print(f"{f'threads={args.threads}':<16}{baseline:>10.2f}{len(symbols) / baseline:>10.1f}"
+          f"{1.0:>8.2f}{size / 1e6:>10.1f}")
+
+    for processes in args.processes:
+        pool = WorkerPool(processes)
+        # 预热：启动工作进程并完成导入
+        asyncio.run(run_processes(pool, symbols[:processes], args.indicator_type))
+        start = time.perf_counter()
+        size = asyncio.run(run_processes(pool, symbols, args.indicator_type))
+        elapsed = time.perf_counter() - start
+        pool.shutdown()
+        print(f"{f'processes={processes}':<16}{elapsed:>10.2f}{len(symbols) / elapsed:>10.1f}"
+              f"{baseline / elapsed:>8.2f}{size / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
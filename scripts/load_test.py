@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+HTTP 传输压测脚本：模拟多个 MCP 客户端并发调用同一个常驻服务器
+
+用法:
+    # 对已启动的服务器压测
+    python scripts/load_test.py --url http://127.0.0.1:8000/mcp --clients 20 --requests 50
+
+    # 自动启动桩数据服务器（不访问上游）后压测
+    python scripts/load_test.py --spawn-stub --clients 20 --requests 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 调用组合：(权重, 工具名, 参数生成函数)
+DEFAULT_SYMBOLS = ["000001", "000002", "000858", "600000", "600036", "600519", "601318", "601398"]
+
+
+def build_mix(symbols: list) -> list:
+    return [
+        (40, "get_stock_financial_indicators", lambda: {
+            "symbol": random.choice(symbols),
+            "indicator_type": random.choice(["all", "profit", "growth", "debt"])
+        }),
+        (15, "get_stock_income_statement", lambda: {"symbol": random.choice(symbols)}),
+        (10, "get_stock_balance_sheet", lambda: {"symbol": random.choice(symbols)}),
+        (10, "get_stock_derived_metrics", lambda: {"symbol": random.choice(symbols)}),
+        (10, "search_stock", lambda: {"query": random.choice(["银行", "600", "000", "股票6005"])}),
+        (10, "get_batch_stock_indicators", lambda: {
+            "symbols": random.sample(symbols, min(5, len(symbols))),
+            "indicator_type": "profit"
+        }),
+        (5, "get_stock_main_indicators", lambda: {"symbol": random.choice(symbols)}),
+    ]
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _client(url: str, transport: str):
+    if transport == "sse":
+        return sse_client(url)
+    return streamablehttp_client(url)
+
+
+async def run_client(client_id: int, args, mix: list, latencies: dict, errors: dict):
+    """单个模拟客户端：建立会话后按权重随机调用工具"""
+    weights = [item[0] for item in mix]
+    async with _client(args.url, args.transport) as streams:
+        async with ClientSession(streams[0], streams[1]) as session:
+            await session.initialize()
+            for _ in range(args.requests):
+                _, tool, make_args = random.choices(mix, weights=weights)[0]
+                start = time.perf_counter()
+                try:
+                    result = await session.call_tool(tool, make_args())
+                    text = result.content[0].text if result.content else ""
+                    if text.startswith("工具执行失败") or '"error": true' in text[:200]:
+                        errors[tool] += 1
+                except Exception:
+                    errors[tool] += 1
+                latencies[tool].append(time.perf_counter() - start)
+                if args.think_time > 0:
+                    await asyncio.sleep(random.uniform(0, args.think_time))
+
+
+async def run_load_test(args) -> dict:
+    mix = build_mix(args.symbols)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        run_client(i, args, mix, latencies, errors)
+        for i in range(args.clients)
+    ])
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "elapsed": elapsed,
+        "total": len(all_latencies),
+        "errors": sum(errors.values()),
+        "latencies": latencies,
+        "errors_by_tool": errors,
+        "all": all_latencies,
+    }
+
+
+def print_report(report: dict):
+    print(f"\n总请求数: {report['total']}  错误: {report['errors']}  耗时: {report['elapsed']:.2f}s  "
+          f"吞吐: {report['total'] / report['elapsed']:.1f} req/s")
+    print(f"{'工具':<36}{'次数':>8}{'错误':>6}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+    rows = sorted(report["latencies"].items()) + [("ALL", report["all"])]
+    for tool, values in rows:
+        values_ms = [v * 1000 for v in values]
+        errors = report["errors"] if tool == "ALL" else report["errors_by_tool"].get(tool, 0)
+        print(f"{tool:<36}{len(values):>8}{errors:>6}"
+              f"{percentile(values_ms, 50):>10.1f}{percentile(values_ms, 90):>10.1f}"
+              f"{percentile(values_ms, 99):>10.1f}{max(values_ms, default=0):>10.1f}")
+    if report["all"]:
+        print(f"平均延迟: {statistics.mean(report['all']) * 1000:.1f}ms")
+
+
+def spawn_stub_server(transport: str, port: int) -> subprocess.Popen:
+    """启动桩数据服务器子进程并等待端口可用"""
+    import socket
+
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(PROJECT_ROOT, "scripts", "stub_akshare.py"),
+         "--transport", transport, "--port", str(port)],
+        cwd=PROJECT_ROOT
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("桩数据服务器启动失败")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("等待桩数据服务器启动超时")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MCP HTTP 传输压测")
+    parser.add_argument("--url", help="服务器地址（streamable-http 为 /mcp，sse 为 /sse）")
+    parser.add_argument("--transport", choices=["streamable-http", "sse"], default="streamable-http")
+    parser.add_argument("--clients", type=int, default=10, help="并发客户端数")
+    parser.add_argument("--requests", type=int, default=20, help="每个客户端的请求数")
+    parser.add_argument("--think-time", type=float, default=0.0, help="请求间随机等待上限（秒）")
+    parser.add_argument("--symbols", nargs="+", default=DEFAULT_SYMBOLS)
+    parser.add_argument("--spawn-stub", action="store_true", help="启动桩数据服务器后压测")
+    parser.add_argument("--port", type=int, default=8765, help="--spawn-stub 时使用的端口")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    process = None
+    if args.spawn_stub:
+        process = spawn_stub_server(args.transport, args.port)
+        path = "/sse" if args.transport == "sse" else "/mcp"
+        args.url = args.url or f"http://127.0.0.1:{args.port}{path}"
+    elif not args.url:
+        raise SystemExit("需要 --url 或 --spawn-stub")
+
+    try:
+        print_report(asyncio.run(run_load_test(args)))
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
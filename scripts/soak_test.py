@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+浸泡测试：长时间以接近实际的调用组合驱动 call_tool，观察内存和延迟是否随时间劣化
+
+用法:
+    python scripts/soak_test.py --duration 14400 --concurrency 8
+    python scripts/soak_test.py --duration 600 --sample-interval 10 --tracemalloc
+
+在进程内直接调用服务器的 call_tool（不经过传输层），上游使用桩数据
+（AKSHARE_STUB_LATENCY 默认0.02秒），数据写入临时目录。每个采样周期记录
+RSS、Python对象数（总数及 DataFrame 等关注的类型）、打开的文件描述符、
+线程数、缓存占用和该周期内各工具的延迟分位数，逐行写入
+logs/soak/<时间>.jsonl。结束时对预热之后的采样做线性回归，RSS 增长速度、
+对象数增长、p95 延迟劣化等超过阈值时列为回归并以退出码1结束。
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+
+os.environ.setdefault("AKSHARE_STUB_LATENCY", "0.02")
+os.environ.setdefault("AKSHARE_MCP_BASE_PATH", tempfile.mkdtemp(prefix="akshare_soak_"))
+os.environ.setdefault("AKSHARE_MCP_TRACE_LOG", "")
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPTS_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+import stub_akshare  # noqa: E402
+
+stub_akshare.install()
+
+from load_test import percentile  # noqa: E402
+from src.server import call_tool  # noqa: E402
+from src.tools import cache_maintenance_loop  # noqa: E402
+from src.utils import get_data_cache, get_response_cache  # noqa: E402
+from src.utils.settings import BASE_PATH  # noqa: E402
+
+
+# 逐个统计实例数的类型（名称），用于发现泄漏的来源
+TRACKED_TYPES = ("DataFrame", "Series", "FileManager", "FileCatalog", "Connection", "Trace", "Span", "Future", "Thread")
+
+
+def build_mix(symbols: list) -> list:
+    """调用组合：(权重, 工具名, 参数生成函数)"""
+    exports_dir = BASE_PATH / "data" / "exports"
+    return [
+        (30, "get_stock_financial_indicators", lambda: {
+            "symbol": random.choice(symbols),
+            "indicator_type": random.choice(["all", "profit", "growth", "debt"])
+        }),
+        (10, "get_stock_income_statement", lambda: {"symbol": random.choice(symbols), "page_size": 20}),
+        (8, "get_stock_balance_sheet", lambda: {"symbol": random.choice(symbols)}),
+        (6, "get_stock_derived_metrics", lambda: {"symbol": random.choice(symbols)}),
+        (8, "get_stock_quote", lambda: {"symbols": random.sample(symbols, min(10, len(symbols)))}),
+        (6, "get_stock_price_history", lambda: {"symbol": random.choice(symbols)}),
+        (4, "get_valuation_history", lambda: {"symbols": random.sample(symbols, min(3, len(symbols)))}),
+        (3, "compare_peers", lambda: {"symbol": random.choice(symbols), "max_peers": 10}),
+        (6, "search_stock", lambda: {"query": random.choice(["银行", "600", "000", "股票6005"])}),
+        (6, "get_batch_stock_indicators", lambda: {
+            "symbols": random.sample(symbols, min(5, len(symbols))),
+            "indicator_type": "profit",
+            "save_to_file": random.random() < 0.3
+        }),
+        # 导出文件名固定，文件数量不随时间增长
+        (3, "export_data_to_file", lambda: {
+            "data_type": "indicators",
+            "symbol": (symbol := random.choice(symbols[:20])),
+            "output_path": str(exports_dir / f"soak_{symbol}.csv")
+        }),
+        (4, "get_stock_main_indicators", lambda: {"symbol": random.choice(symbols)}),
+        (1, "invalidate_cache", lambda: {"dataset": "indicators", "symbol": random.choice(symbols)}),
+    ]
+
+
+def rss_bytes() -> int:
+    """当前常驻内存（Linux 读取 /proc，其他系统退回到峰值RSS）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+
+def open_fds() -> int:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+
+def object_counts() -> dict:
+    """Python对象总数及关注类型的实例数"""
+    gc.collect()
+    objects = gc.get_objects()
+    by_type = Counter(type(obj).__name__ for obj in objects)
+    return {"total": len(objects), **{name: by_type.get(name, 0) for name in TRACKED_TYPES}}
+
+
+def latency_summary(latencies: dict) -> dict:
+    result = {}
+    for tool, values in list(latencies.items()) + [("ALL", [v for vs in latencies.values() for v in vs])]:
+        values_ms = [v * 1000 for v in values]
+        result[tool] = {
+            "count": len(values_ms),
+            "p50": round(percentile(values_ms, 50), 2),
+            "p95": round(percentile(values_ms, 95), 2),
+            "p99": round(percentile(values_ms, 99), 2),
+            "max": round(max(values_ms, default=0.0), 2),
+        }
+    return result
+
+
+async def run_worker(mix: list, deadline: float, window: dict):
+    """一个并发调用方：按权重随机调用工具直到截止时间"""
+    weights = [item[0] for item in mix]
+    while time.time() < deadline:
+        _, tool, make_args = random.choices(mix, weights=weights)[0]
+        start = time.perf_counter()
+        try:
+            result = await call_tool(tool, make_args())
+            text = result[0].text if result else ""
+            if text.startswith("工具执行失败") or '"error": true' in text[:200]:
+                window["errors"][tool] += 1
+                window["error_samples"].setdefault(tool, text[:300])
+        except Exception as e:
+            window["errors"][tool] += 1
+            window["error_samples"].setdefault(tool, repr(e)[:300])
+        window["latencies"][tool].append(time.perf_counter() - start)
+
+
+def new_window() -> dict:
+    return {"latencies": defaultdict(list), "errors": defaultdict(int), "error_samples": {}, "started": time.time()}
+
+
+async def run_soak(args, output: Path) -> list:
+    symbols = stub_akshare.STUB_CODES[:args.symbols]
+    mix = build_mix(symbols)
+    start = time.time()
+    deadline = start + args.duration
+    samples = []
+    window = new_window()
+
+    maintenance = asyncio.create_task(cache_maintenance_loop(args.maintenance_interval))
+    workers = [asyncio.create_task(run_worker(mix, deadline, window)) for _ in range(args.concurrency)]
+    snapshot = tracemalloc.take_snapshot() if args.tracemalloc else None
+
+    with open(output, "w", encoding="utf-8") as f:
+        while time.time() < deadline:
+            await asyncio.sleep(min(args.sample_interval, max(0.0, deadline - time.time())))
+            # 采样前换成新的统计窗口（调用方持有的是同一个 dict，原地替换内容）
+            finished = {key: window[key] for key in ("latencies", "errors", "error_samples", "started")}
+            window.update(new_window())
+
+            cache_stats = get_data_cache().stats()
+            response_cache = get_response_cache()
+            sample = {
+                "elapsed_s": round(time.time() - start, 1),
+                "rss_mb": round(rss_bytes() / 1024 / 1024, 2),
+                "objects": object_counts(),
+                "open_fds": open_fds(),
+                "threads": len(sys._current_frames()),
+                "cache_memory_mb": round(cache_stats["memory_bytes"] / 1024 / 1024, 2),
+                "negative_entries": cache_stats.get("negative_entries", 0),
+                "response_cache_mb": round(response_cache.stats()["bytes"] / 1024 / 1024, 2) if response_cache else 0,
+                "calls": sum(len(v) for v in finished["latencies"].values()),
+                "errors": dict(finished["errors"]),
+                "error_samples": finished["error_samples"],
+                "throughput": round(
+                    sum(len(v) for v in finished["latencies"].values()) / max(time.time() - finished["started"], 1e-9), 2
+                ),
+                "latency_ms": latency_summary(finished["latencies"]),
+            }
+            samples.append(sample)
+            f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+            f.flush()
+            all_latency = sample["latency_ms"]["ALL"]
+            print(
+                f"[{sample['elapsed_s']:>8.0f}s] rss={sample['rss_mb']:.1f}MB objects={sample['objects']['total']} "
+                f"DataFrame={sample['objects']['DataFrame']} fds={sample['open_fds']} threads={sample['threads']} "
+                f"calls={sample['calls']} p50={all_latency['p50']}ms p95={all_latency['p95']}ms",
+                flush=True
+            )
+
+    await asyncio.gather(*workers)
+    maintenance.cancel()
+
+    if snapshot is not None:
+        print("\n内存增长最多的代码位置（tracemalloc）:")
+        for stat in tracemalloc.take_snapshot().compare_to(snapshot, "lineno")[:15]:
+            print(f"  {stat}")
+    return samples
+
+
+def slope_per_hour(points: list) -> float:
+    """最小二乘斜率（每小时）"""
+    if len(points) < 2:
+        return 0.0
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    if denominator == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / denominator * 3600
+
+
+def analyze(samples: list, args) -> list:
+    """
+    对预热之后的采样判断是否有回归
+
+    Returns:
+        回归描述列表（为空表示没有发现）
+    """
+    steady = [s for s in samples if s["elapsed_s"] >= args.warmup]
+    if len(steady) < 3:
+        return []
+    first, last = steady[:max(1, len(steady) // 5)], steady[-max(1, len(steady) // 5):]
+
+    def mean(values):
+        return sum(values) / len(values)
+
+    regressions = []
+    rss_slope = slope_per_hour([(s["elapsed_s"], s["rss_mb"]) for s in steady])
+    if rss_slope > args.max_rss_slope:
+        # 缓存未达到容量上限前 RSS 随缓存增长属于正常现象，一并列出便于区分
+        cache_slope = slope_per_hour([(s["elapsed_s"], s["cache_memory_mb"] + s["response_cache_mb"]) for s in steady])
+        regressions.append(
+            f"RSS 持续增长 {rss_slope:.1f} MB/小时（阈值 {args.max_rss_slope}，同期缓存增长 {cache_slope:.1f} MB/小时）"
+        )
+
+    for name in ("total",) + TRACKED_TYPES:
+        before = mean([s["objects"][name] for s in first])
+        after = mean([s["objects"][name] for s in last])
+        if after > before * (1 + args.max_object_growth) and after - before > 1000 / (1 if name == "total" else 10):
+            regressions.append(f"{name} 对象数 {before:.0f} → {after:.0f}")
+
+    p95_before = mean([s["latency_ms"]["ALL"]["p95"] for s in first])
+    p95_after = mean([s["latency_ms"]["ALL"]["p95"] for s in last])
+    if p95_before > 0 and p95_after > p95_before * args.max_latency_ratio:
+        regressions.append(f"p95 延迟 {p95_before:.1f}ms → {p95_after:.1f}ms")
+
+    for name in ("open_fds", "threads"):
+        before = min(s[name] for s in first)
+        after = max(s[name] for s in last)
+        if after > before + 10:
+            regressions.append(f"{name} {before} → {after}")
+    return regressions
+
+
+def print_report(samples: list, regressions: list, output: Path):
+    if not samples:
+        print("没有采样数据")
+        return
+    first, last = samples[0], samples[-1]
+    total_calls = sum(s["calls"] for s in samples)
+    total_errors = sum(sum(s["errors"].values()) for s in samples)
+    print(f"\n运行 {last['elapsed_s']:.0f}s，调用 {total_calls} 次，错误 {total_errors} 次，采样 {len(samples)} 个")
+    print(f"{'指标':<20}{'开始':>14}{'结束':>14}")
+    rows = [
+        ("RSS(MB)", first["rss_mb"], last["rss_mb"]),
+        ("对象数", first["objects"]["total"], last["objects"]["total"]),
+        ("DataFrame", first["objects"]["DataFrame"], last["objects"]["DataFrame"]),
+        ("文件描述符", first["open_fds"], last["open_fds"]),
+        ("线程数", first["threads"], last["threads"]),
+        ("缓存内存(MB)", first["cache_memory_mb"], last["cache_memory_mb"]),
+        ("响应缓存(MB)", first["response_cache_mb"], last["response_cache_mb"]),
+        ("p50(ms)", first["latency_ms"]["ALL"]["p50"], last["latency_ms"]["ALL"]["p50"]),
+        ("p95(ms)", first["latency_ms"]["ALL"]["p95"], last["latency_ms"]["ALL"]["p95"]),
+        ("p99(ms)", first["latency_ms"]["ALL"]["p99"], last["latency_ms"]["ALL"]["p99"]),
+    ]
+    for name, before, after in rows:
+        print(f"{name:<20}{before:>14}{after:>14}")
+    print(f"\n采样记录: {output}")
+    if regressions:
+        print("\n发现回归:")
+        for item in regressions:
+            print(f"  - {item}")
+    else:
+        print("\n未发现回归")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MCP 服务器浸泡测试（内存与延迟稳定性）")
+    parser.add_argument("--duration", type=float, default=3600, help="运行时长（秒，默认3600）")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发调用数（默认8）")
+    parser.add_argument("--symbols", type=int, default=500, help="使用的桩股票数量（默认500）")
+    parser.add_argument("--sample-interval", type=float, default=30, help="采样间隔（秒，默认30）")
+    parser.add_argument("--warmup", type=float, default=300, help="不参与回归判断的预热时长（秒，默认300）")
+    parser.add_argument("--maintenance-interval", type=int, default=600, help="缓存维护间隔（秒，默认600）")
+    parser.add_argument("--max-rss-slope", type=float, default=20.0, help="RSS 增长速度阈值（MB/小时，默认20）")
+    parser.add_argument("--max-object-growth", type=float, default=0.2, help="对象数增长比例阈值（默认0.2）")
+    parser.add_argument("--max-latency-ratio", type=float, default=1.5, help="p95 延迟劣化倍数阈值（默认1.5）")
+    parser.add_argument("--tracemalloc", action="store_true", help="记录内存分配位置（有额外开销）")
+    parser.add_argument("--output", help="采样记录文件（默认 logs/soak/<时间>.jsonl）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = Path(args.output) if args.output else (
+        Path(PROJECT_ROOT) / "logs" / "soak" / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if args.tracemalloc:
+        tracemalloc.start(10)
+
+    print(f"数据目录: {BASE_PATH}  时长: {args.duration:.0f}s  并发: {args.concurrency}  股票数: {args.symbols}")
+    samples = asyncio.run(run_soak(args, output))
+    regressions = analyze(samples, args)
+    print_report(samples, regressions, output)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+AKShare 桩数据（用于压测/浸泡测试，不访问上游）
+
+用法:
+    python scripts/stub_akshare.py --transport streamable-http --port 8765
+
+以桩数据替换本服务器用到的 AKShare 接口后启动服务器，其余参数与
+src/server.py 相同。每个接口按 AKSHARE_STUB_LATENCY（秒，默认0.05）模拟网络延迟；
+AKSHARE_STUB_PARSE=1 时先把结果渲染为HTML再用 pd.read_html 解析，模拟
+AKShare 解析网页的CPU开销。多进程模式下工作进程会自动安装桩数据。
+"""
+import os
+import sys
+import time
+import zlib
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import akshare as ak
+
+
+LATENCY = float(os.environ.get("AKSHARE_STUB_LATENCY", "0.05"))
+PARSE = os.environ.get("AKSHARE_STUB_PARSE", "0") == "1"
+
+# 桩股票池：000001-002999、600000-601999
+STUB_CODES = [f"{i:06d}" for i in range(1, 3000)] + [str(600000 + i) for i in range(2000)]
+
+STUB_INDUSTRIES = ["银行", "白酒", "半导体", "医药", "汽车", "电力", "证券", "房地产"]
+
+
+def _rng(symbol: str, salt: str) -> np.random.Generator:
+    return np.random.default_rng(zlib.crc32(f"{symbol}:{salt}".encode()))
+
+
+def _sleep():
+    if LATENCY > 0:
+        time.sleep(LATENCY)
+
+
+def _parse(df: pd.DataFrame) -> pd.DataFrame:
+    """模拟上游网页解析"""
+    if not PARSE or df.empty:
+        return df
+    parsed = pd.read_html(StringIO(df.to_html(index=False)))[0]
+    parsed.columns = df.columns
+    return parsed
+
+
+def _report_dates(periods: int = 40) -> list:
+    dates = pd.date_range(end="2025-09-30", periods=periods, freq="QE")
+    return [d.strftime("%Y-%m-%d 00:00:00") for d in dates[::-1]]
+
+
+def _statement(symbol: str, salt: str, columns: list, extra_columns: int) -> pd.DataFrame:
+    _sleep()
+    if symbol not in _CODE_SET:
+        return pd.DataFrame()
+    rng = _rng(symbol, salt)
+    dates = _report_dates()
+    data = {
+        "SECUCODE": [f"{symbol}.{'SH' if symbol.startswith('6') else 'SZ'}"] * len(dates),
+        "SECURITY_CODE": [symbol] * len(dates),
+        "SECURITY_NAME_ABBR": [f"股票{symbol}"] * len(dates),
+        "REPORT_DATE": dates,
+        "REPORT_TYPE": [{3: "一季报", 6: "中报", 9: "三季报", 12: "年报"}[int(d[5:7])] for d in dates],
+        "NOTICE_DATE": [
+            (pd.Timestamp(d) + pd.Timedelta(days=90 if d[5:7] == "12" else 25)).strftime("%Y-%m-%d 00:00:00")
+            for d in dates
+        ],
+    }
+    base = rng.uniform(1e8, 1e11)
+    quarters = np.array([int(d[5:7]) // 3 for d in dates])
+    for column in columns:
+        data[column] = base * rng.uniform(0.05, 1.0) * quarters / 4
+    for i in range(extra_columns):
+        data[f"ITEM_{salt.upper()}_{i:03d}"] = rng.normal(base / 100, base / 1000, len(dates))
+    return _parse(pd.DataFrame(data))
+
+
+def stock_profit_sheet_by_report_em(symbol: str = "600519") -> pd.DataFrame:
+    return _statement(symbol, "income", [
+        "TOTAL_OPERATE_INCOME", "OPERATE_INCOME", "OPERATE_COST",
+        "OPERATE_PROFIT", "NETPROFIT", "PARENT_NETPROFIT"
+    ], 150)
+
+
+def stock_balance_sheet_by_report_em(symbol: str = "600519") -> pd.DataFrame:
+    return _statement(symbol, "balance", [
+        "TOTAL_ASSETS", "TOTAL_LIABILITIES", "TOTAL_EQUITY", "TOTAL_PARENT_EQUITY", "SHARE_CAPITAL"
+    ], 300)
+
+
+def stock_cash_flow_sheet_by_report_em(symbol: str = "600519") -> pd.DataFrame:
+    return _statement(symbol, "cash", [
+        "NETCASH_OPERATE", "NETCASH_INVEST", "NETCASH_FINANCE"
+    ], 250)
+
+
+def stock_financial_analysis_indicator(symbol: str = "600519", start_year: str = "1900") -> pd.DataFrame:
+    _sleep()
+    if symbol not in _CODE_SET:
+        return pd.DataFrame()
+    rng = _rng(symbol, "indicator")
+    dates = pd.date_range(end="2025-09-30", periods=40, freq="QE").date
+    columns = [
+        "摊薄每股收益(元)", "加权每股收益(元)", "每股净资产_调整前(元)", "净资产收益率(%)",
+        "总资产利润率(%)", "销售毛利率(%)", "销售净利率(%)", "主营业务收入增长率(%)",
+        "净利润增长率(%)", "净资产增长率(%)", "总资产增长率(%)", "流动比率", "速动比率",
+        "资产负债率(%)", "总资产周转率(次)", "存货周转率(次)", "应收账款周转率(次)",
+    ] + [f"其他指标{i:02d}" for i in range(70)]
+    data = {"日期": dates}
+    for column in columns:
+        data[column] = rng.normal(10, 5, len(dates)).round(4)
+    return _parse(pd.DataFrame(data))
+
+
+def stock_individual_info_em(symbol: str = "600519", timeout: float = None) -> pd.DataFrame:
+    _sleep()
+    rng = _rng(symbol, "profile")
+    return pd.DataFrame({
+        "item": ["股票代码", "股票简称", "总股本", "流通股", "总市值", "流通市值", "行业", "上市时间"],
+        "value": [
+            symbol, f"股票{symbol}", float(rng.uniform(1e8, 1e10)), float(rng.uniform(1e8, 1e10)),
+            float(rng.uniform(1e9, 1e12)), float(rng.uniform(1e9, 1e12)),
+            _industry(symbol), 20000101
+        ]
+    })
+
+
+def stock_info_a_code_name() -> pd.DataFrame:
+    _sleep()
+    return pd.DataFrame({"code": STUB_CODES, "name": [f"股票{code}" for code in STUB_CODES]})
+
+
+def stock_zh_a_spot_em() -> pd.DataFrame:
+    _sleep()
+    rng = np.random.default_rng(int(time.time()) // 10)
+    count = len(STUB_CODES)
+    price = rng.uniform(2, 200, count).round(2)
+    change = rng.normal(0, 2, count).round(2)
+    return _parse(pd.DataFrame({
+        "序号": range(1, count + 1),
+        "代码": STUB_CODES,
+        "名称": [f"股票{code}" for code in STUB_CODES],
+        "最新价": price,
+        "涨跌幅": change,
+        "涨跌额": (price * change / 100).round(2),
+        "成交量": rng.integers(1e3, 1e7, count),
+        "成交额": rng.uniform(1e6, 1e10, count).round(0),
+        "换手率": rng.uniform(0, 10, count).round(2),
+        "市盈率-动态": rng.normal(20, 10, count).round(2),
+        "市净率": rng.uniform(0.5, 10, count).round(2),
+        "总市值": rng.uniform(1e9, 1e12, count).round(0),
+        "流通市值": rng.uniform(1e9, 1e12, count).round(0),
+    }))
+
+
+def stock_zh_a_hist(
+    symbol: str = "000001",
+    period: str = "daily",
+    start_date: str = "19700101",
+    end_date: str = "20500101",
+    adjust: str = "",
+    timeout: float = None
+) -> pd.DataFrame:
+    _sleep()
+    if symbol not in _CODE_SET:
+        return pd.DataFrame()
+    # 固定的随机游走（2000-01-03起的工作日），保证不同区间的请求结果一致
+    days = pd.bdate_range("2000-01-03", pd.Timestamp.today().normalize())
+    rng = _rng(symbol, "hist")
+    close = (10 * np.exp(np.cumsum(rng.normal(0, 0.02, len(days))))).round(2)
+    close = close * {"": 1.0, "qfq": 0.9, "hfq": 2.0}[adjust]
+    df = pd.DataFrame({
+        "日期": days.date,
+        "股票代码": symbol,
+        "开盘": (close * 0.99).round(2),
+        "收盘": close.round(2),
+        "最高": (close * 1.02).round(2),
+        "最低": (close * 0.98).round(2),
+        "成交量": rng.integers(1e4, 1e7, len(days)),
+        "成交额": rng.uniform(1e6, 1e10, len(days)).round(0),
+        "涨跌幅": rng.normal(0, 2, len(days)).round(2),
+        "换手率": rng.uniform(0, 10, len(days)).round(2),
+    })
+    start = pd.Timestamp(start_date).date()
+    end = pd.Timestamp(end_date).date()
+    return _parse(df[(df["日期"] >= start) & (df["日期"] <= end)].reset_index(drop=True))
+
+
+def _industry(symbol: str) -> str:
+    return STUB_INDUSTRIES[int(_rng(symbol, "industry").integers(len(STUB_INDUSTRIES)))]
+
+
+def stock_board_industry_cons_em(symbol: str = "小金属") -> pd.DataFrame:
+    _sleep()
+    codes = [code for code in STUB_CODES if _industry(code) == symbol]
+    return pd.DataFrame({
+        "序号": range(1, len(codes) + 1),
+        "代码": codes,
+        "名称": [f"股票{code}" for code in codes],
+    })
+
+
+def _market_report(date: str, columns: list, notice_column: str) -> pd.DataFrame:
+    """按报告期返回全市场数据（同一报告期结果固定）"""
+    _sleep()
+    rng = _rng(date, "market_report")
+    count = len(STUB_CODES)
+    df = pd.DataFrame({"序号": range(1, count + 1), "股票代码": STUB_CODES, "股票简称": [f"股票{code}" for code in STUB_CODES]})
+    for column in columns:
+        df[column] = rng.normal(1e8, 5e7, count).round(2)
+    df[notice_column] = (pd.Timestamp(date) + pd.Timedelta(days=30)).date()
+    return _parse(df)
+
+
+def stock_yjbb_em(date: str = "20200331") -> pd.DataFrame:
+    return _market_report(date, [
+        "每股收益", "营业总收入-营业总收入", "营业总收入-同比增长", "净利润-净利润", "净利润-同比增长",
+        "每股净资产", "净资产收益率", "每股经营现金流量", "销售毛利率"
+    ], "最新公告日期")
+
+
+def stock_zcfz_em(date: str = "20240331") -> pd.DataFrame:
+    return _market_report(date, [
+        "资产-货币资金", "资产-应收账款", "资产-存货", "资产-总资产", "负债-总负债", "资产负债率", "股东权益合计"
+    ], "公告日期")
+
+
+def stock_lrb_em(date: str = "20240331") -> pd.DataFrame:
+    return _market_report(date, [
+        "净利润", "净利润同比", "营业总收入", "营业总收入同比", "营业总支出-营业总支出", "营业利润", "利润总额"
+    ], "公告日期")
+
+
+def stock_xjll_em(date: str = "20240331") -> pd.DataFrame:
+    return _market_report(date, [
+        "净现金流-净现金流", "经营性现金流-现金流量净额", "投资性现金流-现金流量净额", "融资性现金流-现金流量净额"
+    ], "公告日期")
+
+
+_CODE_SET = set(STUB_CODES)
+
+STUBS = {
+    "stock_profit_sheet_by_report_em": stock_profit_sheet_by_report_em,
+    "stock_balance_sheet_by_report_em": stock_balance_sheet_by_report_em,
+    "stock_cash_flow_sheet_by_report_em": stock_cash_flow_sheet_by_report_em,
+    "stock_financial_analysis_indicator": stock_financial_analysis_indicator,
+    "stock_individual_info_em": stock_individual_info_em,
+    "stock_info_a_code_name": stock_info_a_code_name,
+    "stock_zh_a_spot_em": stock_zh_a_spot_em,
+    "stock_zh_a_hist": stock_zh_a_hist,
+    "stock_board_industry_cons_em": stock_board_industry_cons_em,
+    "stock_yjbb_em": stock_yjbb_em,
+    "stock_zcfz_em": stock_zcfz_em,
+    "stock_lrb_em": stock_lrb_em,
+    "stock_xjll_em": stock_xjll_em,
+}
+
+
+def install():
+    """用桩数据替换 AKShare 接口（多进程模式下工作进程同样生效）"""
+    for name, func in STUBS.items():
+        setattr(ak, name, func)
+    os.environ["AKSHARE_MCP_WORKER_INIT"] = "stub_akshare:install"
+
+
+if __name__ == "__main__":
+    install()
+    from src.server import cli
+    cli()
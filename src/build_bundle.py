@@ -0,0 +1,217 @@
+"""离线数据包构建命令（批量导出 AKShare 接口结果）"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import akshare as ak
+import pandas as pd
+
+from src.utils.data_bundle import (
+    BUNDLE_FORMAT,
+    HISTORY_FUNCTION,
+    bundle_file,
+    read_bundle_frame,
+    write_bundle_frame
+)
+from src.utils.data_source import DATASETS
+from src.utils.industry_index import profile_value
+from src.utils.market_reports import REPORT_KINDS, recent_periods
+
+
+def _export(root: Path, name: str, fetch: Callable[[], pd.DataFrame], **kwargs) -> int:
+    """调用一次上游接口并写入数据包，返回写入的字节数"""
+    df = fetch()
+    if df is None:
+        df = pd.DataFrame()
+    return write_bundle_frame(bundle_file(root, name, **kwargs), df).stat().st_size
+
+
+def build_bundle(
+    output: str,
+    symbols: List[str],
+    datasets: List[str],
+    adjust_modes: List[str],
+    history_start: str,
+    workers: int = 4,
+    keep: int = 2,
+    report_periods: int = 0
+) -> Dict:
+    """
+    构建一个新版本的离线数据包
+
+    先写入 <output>/<版本>.tmp，全部完成后重命名并更新 CURRENT，
+    正在使用旧版本的服务不受影响。
+
+    Args:
+        output: 数据包目录
+        symbols: 股票代码列表（为空表示全部A股）
+        datasets: 导出的数据集（DATASETS 中的名称）
+        adjust_modes: 日K线复权方式（""、"qfq"、"hfq"），为空则不导出日K线
+        history_start: 日K线开始日期（YYYY-MM-DD）
+        workers: 并发请求数
+        keep: 保留的数据包版本数
+        report_periods: 导出最近几个报告期的全市场报告期数据（0 表示不导出）
+
+    Returns:
+        数据包清单
+    """
+    output_dir = Path(output)
+    version = datetime.now().strftime("%Y%m%d%H%M%S")
+    tmp_root = output_dir / f"{version}.tmp"
+    tmp_root.mkdir(parents=True, exist_ok=True)
+
+    errors: Dict[str, str] = {}
+    files: Dict[str, int] = {}
+    total_bytes = 0
+    lock = threading.Lock()
+
+    def run(name: str, fetch: Callable[[], pd.DataFrame], **kwargs):
+        nonlocal total_bytes
+        try:
+            size = _export(tmp_root, name, fetch, **kwargs)
+        except Exception as e:
+            with lock:
+                errors[f"{name}({kwargs.get('symbol', kwargs.get('date', ''))})"] = str(e)
+            return
+        directory = bundle_file(tmp_root, name, **kwargs).parent.name
+        with lock:
+            total_bytes += size
+            files[directory] = files.get(directory, 0) + 1
+
+    stock_list = ak.stock_info_a_code_name()
+    run("stock_info_a_code_name", lambda: stock_list)
+    run("stock_zh_a_spot_em", ak.stock_zh_a_spot_em)
+    if not symbols:
+        symbols = stock_list["code"].astype(str).tolist()
+
+    # 日K线结束于昨天，与K线存储一致（当日K线收盘前会变化）
+    history_end = (date.today() - timedelta(days=1)).strftime("%Y%m%d")
+    tasks = []
+    for symbol in symbols:
+        for dataset in datasets:
+            function = DATASETS[dataset]
+            tasks.append((function, lambda f=function, s=symbol: getattr(ak, f)(symbol=s), {"symbol": symbol}))
+        for adjust in adjust_modes:
+            tasks.append((
+                HISTORY_FUNCTION,
+                lambda s=symbol, a=adjust: ak.stock_zh_a_hist(
+                    symbol=s, period="daily", start_date=history_start.replace("-", ""),
+                    end_date=history_end, adjust=a
+                ),
+                {"symbol": symbol, "adjust": adjust}
+            ))
+    for period in recent_periods(report_periods) if report_periods > 0 else []:
+        for function in REPORT_KINDS.values():
+            day = period.strftime("%Y%m%d")
+            tasks.append((function, lambda f=function, d=day: getattr(ak, f)(date=d), {"date": day}))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda task: run(task[0], task[1], **task[2]), tasks))
+
+    # 同业比较需要行业板块成分股，行业取自已导出的个股信息
+    industries = set()
+    if "profile" in datasets:
+        for symbol in symbols:
+            profile = read_bundle_frame(bundle_file(tmp_root, DATASETS["profile"], symbol=symbol))
+            industry = profile_value(profile, "行业")
+            if industry:
+                industries.add(industry)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(
+            lambda industry: run(
+                "stock_board_industry_cons_em",
+                lambda: ak.stock_board_industry_cons_em(symbol=industry),
+                symbol=industry
+            ),
+            sorted(industries)
+        ))
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "symbols": len(symbols),
+        "datasets": datasets,
+        "adjust": adjust_modes,
+        "history_start": history_start,
+        "report_periods": report_periods,
+        "files": files,
+        "bytes": total_bytes,
+        "errors": errors,
+    }
+    with open(tmp_root / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    os.replace(tmp_root, output_dir / version)
+    current_tmp = output_dir / "CURRENT.tmp"
+    current_tmp.write_text(version, encoding="utf-8")
+    os.replace(current_tmp, output_dir / "CURRENT")
+
+    versions = sorted(
+        path for path in output_dir.iterdir()
+        if path.is_dir() and (path / "manifest.json").exists()
+    )
+    for path in versions[:-keep] if keep > 0 else []:
+        shutil.rmtree(path, ignore_errors=True)
+
+    return manifest
+
+
+def cli():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="构建/刷新 AKShare MCP 离线数据包")
+    parser.add_argument("--output", default="data/bundle", help="数据包目录（默认 data/bundle）")
+    parser.add_argument("--symbols", default="", help="股票代码，逗号分隔（默认全部A股）")
+    parser.add_argument(
+        "--datasets",
+        default=",".join(DATASETS),
+        help=f"导出的数据集，逗号分隔（默认全部：{','.join(DATASETS)}）"
+    )
+    parser.add_argument(
+        "--adjust",
+        default="none,qfq",
+        help="日K线复权方式，逗号分隔（none/qfq/hfq，传空字符串则不导出日K线）"
+    )
+    parser.add_argument("--history-start", default="2015-01-01", help="日K线开始日期（默认 2015-01-01）")
+    parser.add_argument("--workers", type=int, default=4, help="并发请求数（默认 4）")
+    parser.add_argument("--keep", type=int, default=2, help="保留的数据包版本数（默认 2）")
+    parser.add_argument(
+        "--report-periods", type=int, default=0,
+        help="导出最近几个报告期的全市场报告期数据（默认 0，不导出）"
+    )
+    args = parser.parse_args()
+
+    symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+    datasets = [d.strip() for d in args.datasets.split(",") if d.strip()]
+    unknown = [d for d in datasets if d not in DATASETS]
+    if unknown:
+        parser.error(f"未知的数据集: {', '.join(unknown)}")
+    adjust_modes = []
+    for mode in (m.strip() for m in args.adjust.split(",") if m.strip()):
+        if mode not in ("none", "qfq", "hfq"):
+            parser.error(f"复权方式不正确: {mode}")
+        adjust_modes.append("" if mode == "none" else mode)
+
+    manifest = build_bundle(
+        args.output, symbols, datasets, adjust_modes, args.history_start, args.workers, args.keep,
+        args.report_periods
+    )
+    print(
+        f"离线数据包 {manifest['version']} 已生成: {manifest['symbols']} 只股票，"
+        f"{sum(manifest['files'].values())} 个文件，{manifest['bytes'] / 1024 / 1024:.1f} MB，"
+        f"{len(manifest['errors'])} 个错误"
+    )
+    if manifest["errors"]:
+        for label, message in list(manifest["errors"].items())[:20]:
+            print(f"  {label}: {message}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    cli()
@@ -3,6 +3,10 @@
 import sys
 import os
 import asyncio
+import argparse
+import contextvars
+import functools
+from typing import Optional, Tuple
 
 # 添加项目根目录到Python路径，以便可以导入src包
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -17,15 +21,59 @@ from src.tools import (
     get_stock_income_statement,
     get_stock_cash_flow,
     get_stock_main_indicators,
+    get_stock_derived_metrics,
     get_batch_stock_indicators,
     export_data_to_file,
     search_stock,
-    get_all_stocks
+    get_all_stocks,
+    get_stock_quote,
+    get_stock_price_history,
+    get_valuation_history,
+    compare_peers,
+    ingest_market_reports,
+    get_market_report,
+    get_cache_stats,
+    invalidate_cache,
+    prefetch_stock_data,
+    cleanup_cache,
+    cache_maintenance_loop
+)
+from src.tools.peer_data import SORT_COLUMNS
+from src.utils import (
+    DATASETS,
+    REPORT_KINDS,
+    ErrorResponse,
+    ProfileSession,
+    current_trace,
+    format_error,
+    get_data_cache,
+    get_response_cache,
+    get_worker_pool,
+    indicator_types,
+    normalize_symbol,
+    request_trace,
+    response_key,
+    span,
+    start_profile
 )
+from src.utils.settings import CACHE_MAINTENANCE_INTERVAL
 
 # 创建MCP服务器实例
 server = Server("akshare-stock-server")
 
+# 支持分页的工具共用的参数
+_PAGINATION_PROPERTIES = {
+    "page_size": {
+        "type": "integer",
+        "description": "每页条数（0 表示返回全部）；结果超过一页时返回 pagination.next_cursor",
+        "minimum": 0
+    },
+    "cursor": {
+        "type": "string",
+        "description": "上一页返回的 pagination.next_cursor，用于获取下一页"
+    }
+}
+
 
 @server.list_tools()
 async def list_tools() -> list[Tool]:
@@ -43,9 +91,13 @@ async def list_tools() -> list[Tool]:
                     },
                     "indicator_type": {
                         "type": "string",
-                        "enum": ["basic", "profit", "growth", "debt", "operation", "all"],
-                        "description": "指标类型：basic(基本财务指标)、profit(盈利能力)、growth(成长能力)、debt(偿债能力)、operation(运营能力)、all(所有指标，默认)",
+                        "enum": indicator_types(),
+                        "description": "指标类型：basic(基本财务指标)、profit(盈利能力)、growth(成长能力)、debt(偿债能力)、operation(运营能力)、all(所有指标，默认)，以及服务器加载的自定义指标集",
                         "default": "all"
+                    },
+                    "if_changed_since": {
+                        "type": "string",
+                        "description": "上次响应中的 delta.etag；数据未变化时返回 not_modified，否则只返回新增或修订的报告期"
                     }
                 },
                 "required": ["symbol"]
@@ -66,7 +118,8 @@ async def list_tools() -> list[Tool]:
                         "enum": ["quarter", "annual"],
                         "description": "报告期类型：quarter(季度报告)、annual(年度报告，默认)",
                         "default": "annual"
-                    }
+                    },
+                    **_PAGINATION_PROPERTIES
                 },
                 "required": ["symbol"]
             }
@@ -86,7 +139,8 @@ async def list_tools() -> list[Tool]:
                         "enum": ["quarter", "annual"],
                         "description": "报告期类型：quarter(季度报告)、annual(年度报告，默认)",
                         "default": "annual"
-                    }
+                    },
+                    **_PAGINATION_PROPERTIES
                 },
                 "required": ["symbol"]
             }
@@ -106,7 +160,8 @@ async def list_tools() -> list[Tool]:
                         "enum": ["quarter", "annual"],
                         "description": "报告期类型：quarter(季度报告)、annual(年度报告，默认)",
                         "default": "annual"
-                    }
+                    },
+                    **_PAGINATION_PROPERTIES
                 },
                 "required": ["symbol"]
             }
@@ -125,6 +180,20 @@ async def list_tools() -> list[Tool]:
                 "required": ["symbol"]
             }
         ),
+        Tool(
+            name="get_stock_derived_metrics",
+            description="获取股票的派生财务指标（营收/净利润的单季值、TTM、同比/环比增长率，以及毛利率、净利率等利润率），基于缓存的利润表预先计算",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbol": {
+                        "type": "string",
+                        "description": "股票代码（6位数字）"
+                    }
+                },
+                "required": ["symbol"]
+            }
+        ),
         Tool(
             name="get_batch_stock_indicators",
             description="批量获取多个股票的财务指标（最多20个股票）",
@@ -138,7 +207,7 @@ async def list_tools() -> list[Tool]:
                     },
                     "indicator_type": {
                         "type": "string",
-                        "enum": ["basic", "profit", "growth", "debt", "operation", "all"],
+                        "enum": indicator_types(),
                         "description": "指标类型",
                         "default": "all"
                     },
@@ -199,7 +268,12 @@ async def list_tools() -> list[Tool]:
                     "query": {
                         "type": "string",
                         "description": "搜索关键词（股票代码或名称）"
-                    }
+                    },
+                    "page_size": {
+                        **_PAGINATION_PROPERTIES["page_size"],
+                        "default": 50
+                    },
+                    "cursor": _PAGINATION_PROPERTIES["cursor"]
                 },
                 "required": ["query"]
             }
@@ -207,46 +281,395 @@ async def list_tools() -> list[Tool]:
         Tool(
             name="get_all_stocks",
             description="获取所有A股股票列表",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    **_PAGINATION_PROPERTIES
+                }
+            }
+        ),
+        Tool(
+            name="get_stock_quote",
+            description="获取股票实时行情（最新价、涨跌幅、成交量/额、换手率、市盈率-动态、市净率、总市值、流通市值等），数据来自定期刷新的全市场快照",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbols": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "股票代码列表（最多500个）"
+                    }
+                },
+                "required": ["symbols"]
+            }
+        ),
+        Tool(
+            name="get_stock_price_history",
+            description="获取股票历史日K线（开盘、收盘、最高、最低、成交量、成交额、涨跌幅、换手率等），已获取的日期区间从本地存储读取",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbol": {
+                        "type": "string",
+                        "description": "股票代码（6位数字）"
+                    },
+                    "start_date": {
+                        "type": "string",
+                        "description": "开始日期（YYYYMMDD 或 YYYY-MM-DD，默认结束日期前一年）"
+                    },
+                    "end_date": {
+                        "type": "string",
+                        "description": "结束日期（默认今天）"
+                    },
+                    "adjust": {
+                        "type": "string",
+                        "enum": ["", "qfq", "hfq"],
+                        "description": "复权方式：\"\"(不复权，默认)、qfq(前复权)、hfq(后复权)",
+                        "default": ""
+                    }
+                },
+                "required": ["symbol"]
+            }
+        ),
+        Tool(
+            name="get_valuation_history",
+            description="获取多只股票的历史估值：每个交易日的收盘价、总市值、市盈率TTM、市净率、市销率TTM（按财报披露日期对齐，只使用当时已公布的财报）",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbols": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "股票代码列表（最多50个）"
+                    },
+                    "start_date": {
+                        "type": "string",
+                        "description": "开始日期（YYYYMMDD 或 YYYY-MM-DD，默认结束日期前一年）"
+                    },
+                    "end_date": {
+                        "type": "string",
+                        "description": "结束日期（默认今天）"
+                    },
+                    **_PAGINATION_PROPERTIES
+                },
+                "required": ["symbols"]
+            }
+        ),
+        Tool(
+            name="compare_peers",
+            description="同业对比：找出股票所属行业的同业公司（按总市值选取），返回行情与最新财务指标（ROE、毛利率、净利率、增长率、资产负债率）的排名表及目标股票在各指标上的名次",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbol": {
+                        "type": "string",
+                        "description": "股票代码（6位数字）"
+                    },
+                    "sort_by": {
+                        "type": "string",
+                        "enum": SORT_COLUMNS,
+                        "description": "排序列（默认总市值）",
+                        "default": "总市值"
+                    },
+                    "ascending": {
+                        "type": "boolean",
+                        "description": "是否升序排列（默认降序）",
+                        "default": False
+                    },
+                    "max_peers": {
+                        "type": "integer",
+                        "description": "最多对比的股票数（2-100，包含目标股票，默认20）",
+                        "default": 20
+                    }
+                },
+                "required": ["symbol"]
+            }
+        ),
+        Tool(
+            name="ingest_market_reports",
+            description="按报告期获取全市场业绩报表及资产负债、利润、现金流量摘要并保存到本地（每个报告期一次请求覆盖所有股票，已过披露期的报告期不重复获取）",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "kinds": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": list(REPORT_KINDS)},
+                        "description": "报表类型（默认全部）"
+                    },
+                    "periods": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "报告期列表（YYYYMMDD 或 YYYY-MM-DD，须为季末日）"
+                    },
+                    "recent": {
+                        "type": "integer",
+                        "description": "未指定报告期时获取最近几个报告期（1-40，默认8）",
+                        "default": 8
+                    },
+                    "refresh": {
+                        "type": "boolean",
+                        "description": "是否重新获取已过披露期的报告期",
+                        "default": False
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="get_market_report",
+            description="查询本地保存的全市场报告期数据：不指定股票时返回一个报告期内所有股票，指定股票时返回其各报告期数据（需先调用 ingest_market_reports）",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "kind": {
+                        "type": "string",
+                        "enum": list(REPORT_KINDS),
+                        "description": "报表类型"
+                    },
+                    "period": {
+                        "type": "string",
+                        "description": "报告期（YYYYMMDD 或 YYYY-MM-DD，默认最近已保存的报告期）"
+                    },
+                    "symbols": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "股票代码列表（可选）"
+                    },
+                    **_PAGINATION_PROPERTIES
+                },
+                "required": ["kind"]
+            }
+        ),
+        Tool(
+            name="get_cache_stats",
+            description="查看缓存状态（内存占用、淘汰次数、各数据集的条目数/大小/命中率、批量和导出目录大小）",
             inputSchema={
                 "type": "object",
                 "properties": {}
             }
+        ),
+        Tool(
+            name="invalidate_cache",
+            description="按数据集或股票代码删除缓存（都不指定时清空全部缓存）",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "dataset": {
+                        "type": "string",
+                        "enum": list(DATASETS) + ["derived"],
+                        "description": "数据集名称（可选）"
+                    },
+                    "symbol": {
+                        "type": "string",
+                        "description": "股票代码（可选）"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="prefetch_stock_data",
+            description="预取多个股票的数据到缓存（最多200个）",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbols": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "股票代码列表"
+                    },
+                    "datasets": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": list(DATASETS)},
+                        "description": "数据集列表（默认 [\"indicators\"]）"
+                    }
+                },
+                "required": ["symbols"]
+            }
+        ),
+        Tool(
+            name="cleanup_cache",
+            description="立即按容量和时间限制清理缓存及过期的批量/导出文件",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "max_age_days": {
+                        "type": "integer",
+                        "description": "缓存最长保留天数（可选，默认使用服务器配置）"
+                    },
+                    "max_size_mb": {
+                        "type": "integer",
+                        "description": "磁盘缓存容量上限，单位MB（可选，默认使用服务器配置）"
+                    }
+                }
+            }
         )
     ]
 
 
+# 解析和序列化开销较大的工具，启用多进程模式时在工作进程中执行
+_PROCESS_POOL_TOOLS = {
+    get_stock_financial_indicators,
+    get_stock_balance_sheet,
+    get_stock_income_statement,
+    get_stock_cash_flow,
+    search_stock,
+    get_all_stocks
+}
+
+
+# 响应可缓存的工具 -> 所依赖的数据集（按参数 symbol 取数据版本号）；
+# 空元组表示只按有效期失效。行情、K线、批量、导出和缓存维护类工具不缓存
+_RESPONSE_CACHE_TOOLS = {
+    "get_stock_financial_indicators": ("indicators",),
+    "get_stock_balance_sheet": ("balance_sheet",),
+    "get_stock_income_statement": ("income",),
+    "get_stock_cash_flow": ("cash_flow",),
+    "get_stock_main_indicators": ("profile",),
+    "get_stock_derived_metrics": ("income",),
+    "search_stock": (),
+    "get_all_stocks": (),
+}
+
+
+# 内部再分发到线程池的异步工具，剖析时使用采样方式
+_ASYNC_TOOLS = {"get_batch_stock_indicators", "prefetch_stock_data"}
+
+# 当前调用的剖析会话（同步工具在执行线程中用 cProfile 记录）
+_profile_session: contextvars.ContextVar[Optional[ProfileSession]] = contextvars.ContextVar(
+    "profile_session", default=None
+)
+
+
+async def _run_blocking(func, **kwargs):
+    """在线程池（或多进程模式下的工作进程）中执行同步工具函数，避免阻塞事件循环"""
+    loop = asyncio.get_event_loop()
+    # 在复制的上下文中执行，线程中记录的阶段归入本次调用的追踪
+    context = contextvars.copy_context()
+    session = _profile_session.get()
+    if session is not None:
+        # 剖析时始终在本进程的线程中执行，cProfile 才能记录到
+        return await loop.run_in_executor(None, functools.partial(context.run, session.run, func, **kwargs))
+    
+    pool = get_worker_pool()
+    if pool is not None and func in _PROCESS_POOL_TOOLS:
+        with span("worker_pool", function=func.__name__):
+            return await pool.run_tool(func, **kwargs)
+    
+    return await loop.run_in_executor(None, functools.partial(context.run, func, **kwargs))
+
+
 @server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """处理工具调用"""
+    with request_trace(name):
+        session = start_profile(name, arguments)
+        if session is None:
+            return await _cached_call_tool(name, arguments)
+        
+        if name in _ASYNC_TOOLS:
+            session.start_sampling()
+        token = _profile_session.set(session)
+        try:
+            return (await _call_tool(name, arguments))[0]
+        finally:
+            _profile_session.reset(token)
+            summary_path = await asyncio.get_event_loop().run_in_executor(None, session.finish)
+            if summary_path is not None:
+                print(f"性能剖析结果已保存: {summary_path}", file=sys.stderr)
+
+
+def _response_lookup(name: str, arguments: dict) -> tuple:
+    """
+    响应缓存的键（股票代码按标准化后的代码计算）和所依赖数据的当前版本号
+
+    Returns:
+        (键, 版本号元组)
+    """
+    if not arguments.get("symbol"):
+        return response_key(name, arguments), ()
+    symbol = normalize_symbol(arguments["symbol"])
+    cache = get_data_cache()
+    stamps = tuple(cache.generation(dataset, symbol) for dataset in _RESPONSE_CACHE_TOOLS[name])
+    return response_key(name, {**arguments, "symbol": symbol}), stamps
+
+
+async def _cached_call_tool(name: str, arguments: dict) -> list[TextContent]:
+    """执行工具调用，可缓存的工具先查响应缓存（剖析时不使用，以记录实际执行过程）"""
+    cache = get_response_cache()
+    if cache is None or name not in _RESPONSE_CACHE_TOOLS:
+        return (await _call_tool(name, arguments))[0]
+    
+    loop = asyncio.get_event_loop()
+    with span("response_cache") as lookup:
+        # 解析股票名称可能需要加载A股列表，在线程池中执行
+        key, stamps = await loop.run_in_executor(None, _response_lookup, name, arguments)
+        text = cache.get(key, stamps)
+        lookup.set(hit=text is not None)
+    if text is not None:
+        return [TextContent(type="text", text=text)]
+    
+    result, is_error = await _call_tool(name, arguments)
+    # 错误响应不缓存；数据在本次调用中获取时版本号已变化，按调用后的版本号保存
+    if not is_error:
+        key, stamps = await loop.run_in_executor(None, _response_lookup, name, arguments)
+        cache.put(key, stamps, result[0].text)
+    return result
+
+
+async def _call_tool(name: str, arguments: dict) -> Tuple[list[TextContent], bool]:
+    """
+    执行工具调用
+
+    Returns:
+        (响应内容, 是否为错误响应)；工具返回 ErrorResponse（format_error 的结果）、
+        未知工具或执行异常时为错误响应
+    """
     try:
         result = None
         
         if name == "get_stock_financial_indicators":
-            result = get_stock_financial_indicators(
+            result = await _run_blocking(
+                get_stock_financial_indicators,
                 symbol=arguments["symbol"],
-                indicator_type=arguments.get("indicator_type", "all")
+                indicator_type=arguments.get("indicator_type", "all"),
+                if_changed_since=arguments.get("if_changed_since")
             )
         
         elif name == "get_stock_balance_sheet":
-            result = get_stock_balance_sheet(
+            result = await _run_blocking(
+                get_stock_balance_sheet,
                 symbol=arguments["symbol"],
-                period=arguments.get("period", "annual")
+                period=arguments.get("period", "annual"),
+                page_size=arguments.get("page_size", 0),
+                cursor=arguments.get("cursor")
             )
         
         elif name == "get_stock_income_statement":
-            result = get_stock_income_statement(
+            result = await _run_blocking(
+                get_stock_income_statement,
                 symbol=arguments["symbol"],
-                period=arguments.get("period", "annual")
+                period=arguments.get("period", "annual"),
+                page_size=arguments.get("page_size", 0),
+                cursor=arguments.get("cursor")
             )
         
         elif name == "get_stock_cash_flow":
-            result = get_stock_cash_flow(
+            result = await _run_blocking(
+                get_stock_cash_flow,
                 symbol=arguments["symbol"],
-                period=arguments.get("period", "annual")
+                period=arguments.get("period", "annual"),
+                page_size=arguments.get("page_size", 0),
+                cursor=arguments.get("cursor")
             )
         
         elif name == "get_stock_main_indicators":
-            result = get_stock_main_indicators(
+            result = await _run_blocking(
+                get_stock_main_indicators,
+                symbol=arguments["symbol"]
+            )
+        
+        elif name == "get_stock_derived_metrics":
+            result = await _run_blocking(
+                get_stock_derived_metrics,
                 symbol=arguments["symbol"]
             )
         
@@ -260,7 +683,8 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             )
         
         elif name == "export_data_to_file":
-            result = export_data_to_file(
+            result = await _run_blocking(
+                export_data_to_file,
                 data_type=arguments["data_type"],
                 symbol=arguments["symbol"],
                 output_path=arguments["output_path"],
@@ -268,26 +692,114 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
             )
         
         elif name == "search_stock":
-            result = search_stock(
-                query=arguments["query"]
+            result = await _run_blocking(
+                search_stock,
+                query=arguments["query"],
+                page_size=arguments.get("page_size", 50),
+                cursor=arguments.get("cursor")
             )
         
         elif name == "get_all_stocks":
-            result = get_all_stocks()
+            result = await _run_blocking(
+                get_all_stocks,
+                page_size=arguments.get("page_size", 0),
+                cursor=arguments.get("cursor")
+            )
+        
+        elif name == "get_stock_quote":
+            # 在主进程中执行，所有请求共用同一份行情快照
+            result = await _run_blocking(
+                get_stock_quote,
+                symbols=arguments["symbols"]
+            )
+        
+        elif name == "get_stock_price_history":
+            result = await _run_blocking(
+                get_stock_price_history,
+                symbol=arguments["symbol"],
+                start_date=arguments.get("start_date"),
+                end_date=arguments.get("end_date"),
+                adjust=arguments.get("adjust", "")
+            )
+        
+        elif name == "get_valuation_history":
+            result = await _run_blocking(
+                get_valuation_history,
+                symbols=arguments["symbols"],
+                start_date=arguments.get("start_date"),
+                end_date=arguments.get("end_date"),
+                page_size=arguments.get("page_size", 0),
+                cursor=arguments.get("cursor")
+            )
+        
+        elif name == "compare_peers":
+            result = await _run_blocking(
+                compare_peers,
+                symbol=arguments["symbol"],
+                sort_by=arguments.get("sort_by", "总市值"),
+                ascending=arguments.get("ascending", False),
+                max_peers=arguments.get("max_peers", 20)
+            )
+        
+        elif name == "ingest_market_reports":
+            result = await _run_blocking(
+                ingest_market_reports,
+                kinds=arguments.get("kinds"),
+                periods=arguments.get("periods"),
+                recent=arguments.get("recent", 8),
+                refresh=arguments.get("refresh", False)
+            )
+        
+        elif name == "get_market_report":
+            result = await _run_blocking(
+                get_market_report,
+                kind=arguments["kind"],
+                period=arguments.get("period"),
+                symbols=arguments.get("symbols"),
+                page_size=arguments.get("page_size", 0),
+                cursor=arguments.get("cursor")
+            )
+        
+        elif name == "get_cache_stats":
+            result = await _run_blocking(get_cache_stats)
+        
+        elif name == "invalidate_cache":
+            result = await _run_blocking(
+                invalidate_cache,
+                dataset=arguments.get("dataset"),
+                symbol=arguments.get("symbol")
+            )
+        
+        elif name == "prefetch_stock_data":
+            result = await prefetch_stock_data(
+                symbols=arguments["symbols"],
+                datasets=arguments.get("datasets")
+            )
+        
+        elif name == "cleanup_cache":
+            result = await _run_blocking(
+                cleanup_cache,
+                max_age_days=arguments.get("max_age_days"),
+                max_size_mb=arguments.get("max_size_mb")
+            )
         
         else:
-            result = f"未知工具: {name}"
+            result = ErrorResponse(f"未知工具: {name}")
         
-        return [TextContent(type="text", text=result)]
+        return [TextContent(type="text", text=result)], isinstance(result, ErrorResponse)
     
     except Exception as e:
-        import traceback
-        error_msg = f"工具执行失败: {str(e)}\n{traceback.format_exc()}"
-        return [TextContent(type="text", text=error_msg)]
+        # 调用栈写入追踪日志，客户端只收到错误信息和追踪ID
+        trace = current_trace()
+        message = f"工具执行失败: {str(e)}"
+        if trace is not None:
+            trace.record_error(e)
+            message += f"（trace_id: {trace.trace_id}）"
+        return [TextContent(type="text", text=format_error(message))], True
 
 
-async def main():
-    """主函数"""
+async def _serve_stdio():
+    """通过标准输入输出提供服务（每个客户端一个进程）"""
     async with stdio_server() as (read_stream, write_stream):
         await server.run(
             read_stream,
@@ -296,8 +808,115 @@ async def main():
         )
 
 
-if __name__ == "__main__":
+def _create_http_app(transport: str):
+    """
+    创建HTTP应用（多个客户端共享同一进程的缓存和线程池）
+    
+    Args:
+        transport: sse 或 streamable-http
+    
+    Returns:
+        Starlette应用
+    """
+    from contextlib import asynccontextmanager
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Mount, Route
+    
+    if transport == "sse":
+        from mcp.server.sse import SseServerTransport
+        
+        sse = SseServerTransport("/messages/")
+        
+        async def handle_sse(request):
+            async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+                await server.run(
+                    read_stream,
+                    write_stream,
+                    server.create_initialization_options()
+                )
+            return Response()
+        
+        return Starlette(routes=[
+            Route("/sse", endpoint=handle_sse, methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message)
+        ])
+    
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    
+    session_manager = StreamableHTTPSessionManager(app=server)
+    
+    async def handle_streamable_http(scope, receive, send):
+        await session_manager.handle_request(scope, receive, send)
+    
+    @asynccontextmanager
+    async def lifespan(app):
+        async with session_manager.run():
+            yield
+    
+    return Starlette(
+        routes=[Mount("/mcp", app=handle_streamable_http)],
+        lifespan=lifespan
+    )
+
+
+async def _serve_http(transport: str, host: str, port: int):
+    """通过HTTP（SSE / Streamable HTTP）提供服务"""
+    import uvicorn
+    
+    config = uvicorn.Config(
+        _create_http_app(transport),
+        host=host,
+        port=port,
+        log_level="warning"
+    )
+    await uvicorn.Server(config).serve()
+
+
+async def main(transport: str = "stdio", host: str = "127.0.0.1", port: int = 8000):
+    """
+    主函数
+    
+    Args:
+        transport: 传输方式（stdio / sse / streamable-http）
+        host: HTTP监听地址
+        port: HTTP监听端口
+    """
+    maintenance_task = None
+    if CACHE_MAINTENANCE_INTERVAL > 0:
+        maintenance_task = asyncio.create_task(cache_maintenance_loop(CACHE_MAINTENANCE_INTERVAL))
+    
     try:
-        asyncio.run(main())
+        if transport == "stdio":
+            await _serve_stdio()
+        else:
+            await _serve_http(transport, host, port)
+    finally:
+        if maintenance_task:
+            maintenance_task.cancel()
+        pool = get_worker_pool()
+        if pool is not None:
+            pool.shutdown()
+
+
+def cli():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="AKShare股票财务数据MCP服务器")
+    parser.add_argument(
+        "--transport",
+        choices=["stdio", "sse", "streamable-http"],
+        default=os.environ.get("AKSHARE_MCP_TRANSPORT", "stdio"),
+        help="传输方式（默认 stdio；sse/streamable-http 可让多个客户端共享一个常驻进程）"
+    )
+    parser.add_argument("--host", default=os.environ.get("AKSHARE_MCP_HOST", "127.0.0.1"), help="HTTP监听地址")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("AKSHARE_MCP_PORT", "8000")), help="HTTP监听端口")
+    args = parser.parse_args()
+    
+    try:
+        asyncio.run(main(args.transport, args.host, args.port))
     except KeyboardInterrupt:
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    cli()
@@ -4,11 +4,24 @@ from .financial_data import (
     get_stock_balance_sheet,
     get_stock_income_statement,
     get_stock_cash_flow,
-    get_stock_main_indicators
+    get_stock_main_indicators,
+    get_stock_derived_metrics
 )
 from .batch_data import get_batch_stock_indicators
 from .export_data import export_data_to_file
 from .stock_info import search_stock, get_all_stocks
+from .quote_data import get_stock_quote
+from .price_data import get_stock_price_history
+from .valuation_data import get_valuation_history
+from .peer_data import compare_peers
+from .market_data import ingest_market_reports, get_market_report
+from .cache_tools import (
+    get_cache_stats,
+    invalidate_cache,
+    prefetch_stock_data,
+    cleanup_cache,
+    cache_maintenance_loop
+)
 
 __all__ = [
     'get_stock_financial_indicators',
@@ -16,8 +29,20 @@ __all__ = [
     'get_stock_income_statement',
     'get_stock_cash_flow',
     'get_stock_main_indicators',
+    'get_stock_derived_metrics',
     'get_batch_stock_indicators',
     'export_data_to_file',
     'search_stock',
-    'get_all_stocks'
+    'get_all_stocks',
+    'get_stock_quote',
+    'get_stock_price_history',
+    'get_valuation_history',
+    'compare_peers',
+    'ingest_market_reports',
+    'get_market_report',
+    'get_cache_stats',
+    'invalidate_cache',
+    'prefetch_stock_data',
+    'cleanup_cache',
+    'cache_maintenance_loop'
 ]
\ No newline at end of file
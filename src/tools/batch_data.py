@@ -1,8 +1,8 @@
 """批量数据查询工具"""
-import akshare as ak
 import pandas as pd
-from typing import List
+from typing import List, Optional, Tuple
 import asyncio
+import contextvars
 from concurrent.futures import ThreadPoolExecutor
 from src.utils import (
     validate_stock_symbols,
@@ -10,52 +10,111 @@ from src.utils import (
     validate_file_format,
     normalize_symbols,
     format_batch_results,
+    format_batch_fragments,
     format_error,
     simplify_financial_data,
     format_file_info,
+    fetch_dataset,
+    get_worker_pool,
+    workload,
+    BULK,
     FileManager
 )
-import os
+from src.utils.settings import BASE_PATH
 
 
-def _fetch_single_stock_data(symbol: str, indicator_type: str = "all") -> dict:
+def _fetch_single_stock_frame(symbol: str, indicator_type: str = "all") -> Tuple[Optional[pd.DataFrame], Optional[str]]:
     """
-    获取单个股票的财务指标
+    获取并简化单个股票的财务指标
     
     Args:
         symbol: 股票代码
         indicator_type: 指标类型
     
     Returns:
-        包含股票数据或错误信息的字典
+        (简化后的DataFrame, None) 或 (None, 错误信息)
     """
     try:
-        df = ak.stock_financial_analysis_indicator(symbol=symbol)
+        df = fetch_dataset("indicators", symbol)
         
         if df is None or df.empty:
-            return {
-                "symbol": symbol,
-                "error": "未找到数据",
-                "data": None
-            }
+            return None, "未找到数据"
         
         # 简化数据
-        df = simplify_financial_data(df, indicator_type)
-        
-        # 转换为字典
-        data = df.to_dict(orient='records')
-        
-        return {
-            "symbol": symbol,
-            "data": data,
-            "count": len(data)
-        }
+        return simplify_financial_data(df, indicator_type), None
     except Exception as e:
+        return None, str(e)
+
+
+def _fetch_single_stock_result(symbol: str, indicator_type: str = "all") -> Tuple[dict, Optional[pd.DataFrame]]:
+    """
+    获取单个股票的财务指标，同时返回结果字典和简化后的DataFrame
+    
+    Args:
+        symbol: 股票代码
+        indicator_type: 指标类型
+    
+    Returns:
+        (包含股票数据或错误信息的字典, DataFrame或None)
+    """
+    df, error = _fetch_single_stock_frame(symbol, indicator_type)
+    
+    if df is None:
         return {
             "symbol": symbol,
-            "error": str(e),
+            "error": error,
             "data": None
-        }
+        }, None
+    
+    # 转换为字典
+    data = df.to_dict(orient='records')
+    
+    return {
+        "symbol": symbol,
+        "data": data,
+        "count": len(data)
+    }, df
+
+
+def _fetch_single_stock_data(symbol: str, indicator_type: str = "all") -> dict:
+    """
+    获取单个股票的财务指标
+    
+    Args:
+        symbol: 股票代码
+        indicator_type: 指标类型
+    
+    Returns:
+        包含股票数据或错误信息的字典
+    """
+    return _fetch_single_stock_result(symbol, indicator_type)[0]
+
+
+async def _save_batch_file(
+    df: pd.DataFrame,
+    symbols: List[str],
+    file_format: str,
+    output_path: str
+) -> str:
+    """
+    保存批量查询结果
+    
+    Returns:
+        文件信息JSON
+    """
+    # 获取文件管理器
+    file_manager = FileManager(str(BASE_PATH))
+    
+    # 保存文件（异步写入，不阻塞事件循环）
+    file_path = await file_manager.save_dataframe_async(
+        df=df,
+        file_type="batch",
+        symbols=symbols,
+        format=file_format,
+        output_path=output_path
+    )
+    
+    return format_file_info(file_path, len(df))
 
 
 async def get_batch_stock_indicators(
@@ -93,48 +152,50 @@ async def get_batch_stock_indicators(
         if save_to_file and not validate_file_format(file_format):
             return format_error(f"文件格式不正确: {file_format}")
         
-        # 使用线程池并发查询（AKShare是同步的）
-        with ThreadPoolExecutor(max_workers=5) as executor:
+        # 多进程模式：获取、简化和序列化都在工作进程中完成
+        pool = get_worker_pool()
+        if pool is not None:
+            fragments, success_count, df = await pool.run_batch(
+                symbols, indicator_type, with_table=save_to_file
+            )
+            result_text = format_batch_fragments(fragments, success_count)
+            
+            if save_to_file and df is not None and len(df) > 0:
+                file_info = await _save_batch_file(df, symbols, file_format, output_path)
+                return result_text + f"\n\n文件已保存:\n{file_info}"
+            
+            return result_text
+        
+        # 使用线程池并发查询（AKShare是同步的），上游请求按批量类别调度，让位于交互查询
+        with ThreadPoolExecutor(max_workers=5) as executor, workload(BULK):
             loop = asyncio.get_event_loop()
             tasks = [
                 loop.run_in_executor(
                     executor,
-                    _fetch_single_stock_data,
+                    contextvars.copy_context().run,
+                    _fetch_single_stock_result,
                     symbol,
                     indicator_type
                 )
                 for symbol in symbols
             ]
-            results = await asyncio.gather(*tasks)
+            outcomes = await asyncio.gather(*tasks)
+        results = [result for result, _ in outcomes]
         
         # 如果需要保存到文件
         if save_to_file:
-            # 合并所有成功的数据
-            all_data = []
-            for result in results:
-                if result.get("data"):
-                    for record in result["data"]:
-                        record["股票代码"] = result["symbol"]
-                        all_data.append(record)
+            # 直接合并各股票的DataFrame，不经过记录列表
+            frames = [
+                frame.assign(股票代码=result["symbol"])
+                for result, frame in outcomes
+                if frame is not None and not frame.empty
+            ]
             
-            if all_data:
-                df = pd.DataFrame(all_data)
-                
-                # 获取文件管理器
-                base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-                file_manager = FileManager(base_path)
-                
-                # 保存文件
-                file_path = file_manager.save_dataframe(
-                    df=df,
-                    file_type="batch",
-                    symbols=symbols,
-                    format=file_format,
-                    output_path=output_path
-                )
+            if frames:
+                df = pd.concat(frames, ignore_index=True)
                 
                 # 添加文件信息到结果
-                file_info = format_file_info(file_path, len(all_data))
+                file_info = await _save_batch_file(df, symbols, file_format, output_path)
                 
                 return format_batch_results(results) + f"\n\n文件已保存:\n{file_info}"
         
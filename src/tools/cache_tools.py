@@ -0,0 +1,233 @@
+"""缓存查看与维护工具"""
+import asyncio
+import contextvars
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+
+from src.utils import (
+    validate_stock_symbols,
+    normalize_symbols,
+    format_dict_to_json,
+    format_error,
+    fetch_dataset,
+    get_data_cache,
+    get_offline_bundle,
+    DATASETS,
+    BULK,
+    FileManager,
+    get_upstream_scheduler,
+    get_stock_universe,
+    get_response_cache,
+    workload
+)
+from src.utils.settings import (
+    BASE_PATH,
+    CACHE_MAX_DISK_BYTES,
+    CACHE_MAX_AGE_DAYS,
+    BATCH_MAX_AGE_DAYS,
+    EXPORTS_MAX_AGE_DAYS
+)
+
+
+def get_cache_stats() -> str:
+    """
+    获取缓存统计信息
+    
+    Returns:
+        JSON格式的缓存占用、命中率和文件目录大小
+    """
+    try:
+        cache = get_data_cache()
+        file_manager = FileManager(str(BASE_PATH))
+        bundle = get_offline_bundle()
+        scheduler = get_upstream_scheduler()
+        response_cache = get_response_cache()
+        
+        return format_dict_to_json({
+            "memory": cache.stats(),
+            "datasets": cache.dataset_stats(),
+            "files": {
+                "batch_bytes": file_manager.get_directory_size("batch"),
+                "exports_bytes": file_manager.get_directory_size("exports")
+            },
+            "offline_bundle": None if bundle is None else {
+                "version": bundle.version,
+                "created_at": bundle.manifest.get("created_at"),
+                "path": str(bundle.root)
+            },
+            "upstream_scheduler": None if scheduler is None else scheduler.stats(),
+            "stock_universe": get_stock_universe().stats(),
+            "response_cache": None if response_cache is None else response_cache.stats(),
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return format_error(f"获取缓存统计失败: {str(e)}")
+
+
+def invalidate_cache(dataset: Optional[str] = None, symbol: Optional[str] = None) -> str:
+    """
+    按数据集或股票代码删除缓存（同时清空响应缓存）
+    
+    Args:
+        dataset: 数据集名称（为空表示所有数据集）
+        symbol: 股票代码（为空表示所有股票）
+    
+    Returns:
+        JSON格式的删除结果
+    """
+    try:
+        if dataset and dataset not in DATASETS and dataset != "derived":
+            return format_error(f"数据集不正确: {dataset}，有效值: {', '.join(DATASETS)}")
+        
+        removed = get_data_cache().invalidate(dataset=dataset, symbol=symbol)
+        response_cache = get_response_cache()
+        
+        return format_dict_to_json({
+            "dataset": dataset,
+            "symbol": symbol,
+            "removed": removed,
+            "responses_removed": 0 if response_cache is None else response_cache.clear(),
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return format_error(f"删除缓存失败: {str(e)}", symbol)
+
+
+def _prefetch_single_stock(symbol: str, datasets: List[str]) -> dict:
+    """
+    预取单个股票的数据集
+    
+    Args:
+        symbol: 股票代码
+        datasets: 数据集列表
+    
+    Returns:
+        包含各数据集行数或错误信息的字典
+    """
+    result = {"symbol": symbol, "datasets": {}}
+    for dataset in datasets:
+        try:
+            df = fetch_dataset(dataset, symbol)
+            result["datasets"][dataset] = 0 if df is None else len(df)
+        except Exception as e:
+            result["error"] = f"{dataset}: {str(e)}"
+    return result
+
+
+async def prefetch_stock_data(symbols: List[str], datasets: Optional[List[str]] = None) -> str:
+    """
+    预取股票数据到缓存
+    
+    Args:
+        symbols: 股票代码列表
+        datasets: 数据集列表（默认 indicators）
+    
+    Returns:
+        JSON格式的预取结果
+    """
+    try:
+        symbols = normalize_symbols(symbols)
+        datasets = datasets or ["indicators"]
+        
+        is_valid, error_msg = validate_stock_symbols(symbols, max_count=200)
+        if not is_valid:
+            return format_error(error_msg)
+        
+        invalid_datasets = [d for d in datasets if d not in DATASETS]
+        if invalid_datasets:
+            return format_error(f"数据集不正确: {', '.join(invalid_datasets)}，有效值: {', '.join(DATASETS)}")
+        
+        # 使用线程池并发查询（AKShare是同步的），上游请求按批量类别调度，让位于交互查询
+        with ThreadPoolExecutor(max_workers=5) as executor, workload(BULK):
+            loop = asyncio.get_event_loop()
+            tasks = [
+                loop.run_in_executor(
+                    executor, contextvars.copy_context().run, _prefetch_single_stock, symbol, datasets
+                )
+                for symbol in symbols
+            ]
+            results = await asyncio.gather(*tasks)
+        
+        failed = [r for r in results if "error" in r]
+        return format_dict_to_json({
+            "total": len(results),
+            "success": len(results) - len(failed),
+            "failed": len(failed),
+            "results": failed,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return format_error(f"预取数据失败: {str(e)}")
+
+
+def run_cache_maintenance(max_age_days: Optional[int] = None, max_size_mb: Optional[int] = None) -> dict:
+    """
+    按配置的容量和时间限制清理缓存及批量/导出文件
+    
+    Args:
+        max_age_days: 缓存最长保留天数（默认取配置）
+        max_size_mb: 磁盘缓存容量上限（MB，默认取配置）
+    
+    Returns:
+        各目录删除的条目数
+    """
+    max_age_days = CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    max_disk_bytes = CACHE_MAX_DISK_BYTES if max_size_mb is None else max_size_mb * 1024 * 1024
+    
+    removed = {
+        "cache": get_data_cache().enforce_quota(
+            max_disk_bytes=max_disk_bytes,
+            max_age_seconds=max_age_days * 24 * 3600 if max_age_days > 0 else None
+        )
+    }
+    
+    file_manager = FileManager(str(BASE_PATH))
+    for directory, age_days in [("batch", BATCH_MAX_AGE_DAYS), ("exports", EXPORTS_MAX_AGE_DAYS)]:
+        if age_days > 0:
+            removed[directory] = file_manager.cleanup_old_files(max_age_days=age_days, directory=directory) or 0
+    
+    return removed
+
+
+def cleanup_cache(max_age_days: Optional[int] = None, max_size_mb: Optional[int] = None) -> str:
+    """
+    立即执行一次缓存清理
+    
+    Args:
+        max_age_days: 缓存最长保留天数
+        max_size_mb: 磁盘缓存容量上限（MB）
+    
+    Returns:
+        JSON格式的清理结果
+    """
+    try:
+        removed = run_cache_maintenance(max_age_days=max_age_days, max_size_mb=max_size_mb)
+        
+        return format_dict_to_json({
+            "removed": removed,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return format_error(f"清理缓存失败: {str(e)}")
+
+
+async def cache_maintenance_loop(interval_seconds: int):
+    """
+    后台定期执行缓存清理
+    
+    Args:
+        interval_seconds: 执行间隔（秒）
+    """
+    loop = asyncio.get_event_loop()
+    while True:
+        try:
+            await loop.run_in_executor(None, run_cache_maintenance)
+        except Exception as e:
+            print(f"缓存维护时出错: {str(e)}", file=sys.stderr)
+        await asyncio.sleep(interval_seconds)
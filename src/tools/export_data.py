@@ -1,14 +1,15 @@
 """数据导出工具"""
-import akshare as ak
 import pandas as pd
-import os
 from src.utils import (
     validate_stock_symbol,
+    normalize_symbol,
     validate_file_format,
     format_error,
     format_file_info,
+    fetch_dataset,
     FileManager
 )
+from src.utils.settings import BASE_PATH
 
 
 def export_data_to_file(
@@ -31,8 +32,9 @@ def export_data_to_file(
     """
     try:
         # 验证参数
+        symbol = normalize_symbol(symbol)
         if not validate_stock_symbol(symbol):
-            return format_error(f"股票代码格式不正确: {symbol}")
+            return format_error(f"股票代码格式不正确或不存在: {symbol}")
         
         if not validate_file_format(file_format):
             return format_error(f"文件格式不正确: {file_format}")
@@ -41,23 +43,14 @@ def export_data_to_file(
         if data_type not in valid_types:
             return format_error(f"数据类型不正确: {data_type}，有效值: {', '.join(valid_types)}")
         
-        # 根据数据类型获取数据
-        df = None
-        if data_type == "indicators":
-            df = ak.stock_financial_analysis_indicator(symbol=symbol)
-        elif data_type == "balance_sheet":
-            df = ak.stock_balance_sheet_by_report_em(symbol=symbol)
-        elif data_type == "income":
-            df = ak.stock_profit_sheet_by_report_em(symbol=symbol)
-        elif data_type == "cash_flow":
-            df = ak.stock_cash_flow_sheet_by_report_em(symbol=symbol)
+        # 根据数据类型获取数据（优先读取缓存）
+        df = fetch_dataset(data_type, symbol)
         
         if df is None or df.empty:
             return format_error(f"未找到股票 {symbol} 的 {data_type} 数据")
         
         # 获取文件管理器
-        base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        file_manager = FileManager(base_path)
+        file_manager = FileManager(str(BASE_PATH))
         
         # 保存文件
         file_path = file_manager.save_dataframe(
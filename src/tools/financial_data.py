@@ -1,38 +1,50 @@
 """财务数据查询工具"""
-import akshare as ak
 import pandas as pd
 from typing import Optional
 from src.utils import (
     validate_stock_symbol,
+    normalize_symbol,
     validate_period,
     validate_indicator_type,
+    validate_page_size,
     format_dataframe_to_json,
     format_error,
-    simplify_financial_data
+    simplify_financial_data,
+    fetch_dataset,
+    get_derived_metrics_store,
+    diff_since,
+    paginate,
+    resume_page
 )
 
 
-def get_stock_financial_indicators(symbol: str, indicator_type: str = "all") -> str:
+def get_stock_financial_indicators(
+    symbol: str,
+    indicator_type: str = "all",
+    if_changed_since: Optional[str] = None
+) -> str:
     """
     获取股票财务指标
     
     Args:
         symbol: 股票代码
         indicator_type: 指标类型
+        if_changed_since: 上次响应中的 delta.etag，指定时只返回新增或修订的报告期
     
     Returns:
         JSON格式的财务指标数据
     """
     try:
         # 验证参数
+        symbol = normalize_symbol(symbol)
         if not validate_stock_symbol(symbol):
-            return format_error(f"股票代码格式不正确: {symbol}")
+            return format_error(f"股票代码格式不正确或不存在: {symbol}")
         
         if not validate_indicator_type(indicator_type):
             return format_error(f"指标类型不正确: {indicator_type}")
         
-        # 调用AKShare接口获取财务指标
-        df = ak.stock_financial_analysis_indicator(symbol=symbol)
+        # 调用AKShare接口（优先读取缓存）获取财务指标
+        df = fetch_dataset("indicators", symbol)
         
         if df is None or df.empty:
             return format_error(f"未找到股票 {symbol} 的财务指标数据")
@@ -40,33 +52,52 @@ def get_stock_financial_indicators(symbol: str, indicator_type: str = "all") ->
         # 根据指标类型简化数据
         df = simplify_financial_data(df, indicator_type)
         
+        # 与客户端上次获取的版本比较，未变化时不返回数据
+        df, delta = diff_since(f"indicators:{symbol}:{indicator_type}", df, if_changed_since)
+        
         # 转换为JSON
-        return format_dataframe_to_json(df)
+        return format_dataframe_to_json(df, delta=delta)
         
     except Exception as e:
         return format_error(f"获取财务指标失败: {str(e)}", symbol)
 
 
-def get_stock_balance_sheet(symbol: str, period: str = "annual") -> str:
+def get_stock_balance_sheet(
+    symbol: str,
+    period: str = "annual",
+    page_size: int = 0,
+    cursor: Optional[str] = None
+) -> str:
     """
     获取资产负债表
     
     Args:
         symbol: 股票代码
         period: 报告期类型（quarter/annual）
+        page_size: 每页条数（0 表示返回全部）
+        cursor: 上一页返回的 next_cursor
     
     Returns:
         JSON格式的资产负债表数据
     """
     try:
+        symbol = normalize_symbol(symbol)
         if not validate_stock_symbol(symbol):
-            return format_error(f"股票代码格式不正确: {symbol}")
+            return format_error(f"股票代码格式不正确或不存在: {symbol}")
         
         if not validate_period(period):
             return format_error(f"报告期类型不正确: {period}")
         
-        # 调用AKShare接口
-        df = ak.stock_balance_sheet_by_report_em(symbol=symbol)
+        if not validate_page_size(page_size):
+            return format_error(f"每页条数不正确: {page_size}")
+        
+        # 翻页时直接读取首次查询缓存的完整结果
+        page_key = f"balance_sheet:{symbol}:{period}"
+        if cursor:
+            return format_dataframe_to_json(*resume_page(page_key, cursor, page_size))
+        
+        # 调用AKShare接口（优先读取缓存）
+        df = fetch_dataset("balance_sheet", symbol)
         
         if df is None or df.empty:
             return format_error(f"未找到股票 {symbol} 的资产负债表数据")
@@ -76,32 +107,48 @@ def get_stock_balance_sheet(symbol: str, period: str = "annual") -> str:
             # 筛选季度报告（通常包含Q1, Q2, Q3, Q4）
             df = df[df["报告期"].str.contains("Q", na=False)]
         
-        return format_dataframe_to_json(df)
+        return format_dataframe_to_json(*paginate(page_key, df, page_size))
         
     except Exception as e:
         return format_error(f"获取资产负债表失败: {str(e)}", symbol)
 
 
-def get_stock_income_statement(symbol: str, period: str = "annual") -> str:
+def get_stock_income_statement(
+    symbol: str,
+    period: str = "annual",
+    page_size: int = 0,
+    cursor: Optional[str] = None
+) -> str:
     """
     获取利润表
     
     Args:
         symbol: 股票代码
         period: 报告期类型（quarter/annual）
+        page_size: 每页条数（0 表示返回全部）
+        cursor: 上一页返回的 next_cursor
     
     Returns:
         JSON格式的利润表数据
     """
     try:
+        symbol = normalize_symbol(symbol)
         if not validate_stock_symbol(symbol):
-            return format_error(f"股票代码格式不正确: {symbol}")
+            return format_error(f"股票代码格式不正确或不存在: {symbol}")
         
         if not validate_period(period):
             return format_error(f"报告期类型不正确: {period}")
         
-        # 调用AKShare接口
-        df = ak.stock_profit_sheet_by_report_em(symbol=symbol)
+        if not validate_page_size(page_size):
+            return format_error(f"每页条数不正确: {page_size}")
+        
+        # 翻页时直接读取首次查询缓存的完整结果
+        page_key = f"income:{symbol}:{period}"
+        if cursor:
+            return format_dataframe_to_json(*resume_page(page_key, cursor, page_size))
+        
+        # 调用AKShare接口（优先读取缓存）
+        df = fetch_dataset("income", symbol)
         
         if df is None or df.empty:
             return format_error(f"未找到股票 {symbol} 的利润表数据")
@@ -110,32 +157,48 @@ def get_stock_income_statement(symbol: str, period: str = "annual") -> str:
         if period == "quarter" and "报告期" in df.columns:
             df = df[df["报告期"].str.contains("Q", na=False)]
         
-        return format_dataframe_to_json(df)
+        return format_dataframe_to_json(*paginate(page_key, df, page_size))
         
     except Exception as e:
         return format_error(f"获取利润表失败: {str(e)}", symbol)
 
 
-def get_stock_cash_flow(symbol: str, period: str = "annual") -> str:
+def get_stock_cash_flow(
+    symbol: str,
+    period: str = "annual",
+    page_size: int = 0,
+    cursor: Optional[str] = None
+) -> str:
     """
     获取现金流量表
     
     Args:
         symbol: 股票代码
         period: 报告期类型（quarter/annual）
+        page_size: 每页条数（0 表示返回全部）
+        cursor: 上一页返回的 next_cursor
     
     Returns:
         JSON格式的现金流量表数据
     """
     try:
+        symbol = normalize_symbol(symbol)
         if not validate_stock_symbol(symbol):
-            return format_error(f"股票代码格式不正确: {symbol}")
+            return format_error(f"股票代码格式不正确或不存在: {symbol}")
         
         if not validate_period(period):
             return format_error(f"报告期类型不正确: {period}")
         
-        # 调用AKShare接口
-        df = ak.stock_cash_flow_sheet_by_report_em(symbol=symbol)
+        if not validate_page_size(page_size):
+            return format_error(f"每页条数不正确: {page_size}")
+        
+        # 翻页时直接读取首次查询缓存的完整结果
+        page_key = f"cash_flow:{symbol}:{period}"
+        if cursor:
+            return format_dataframe_to_json(*resume_page(page_key, cursor, page_size))
+        
+        # 调用AKShare接口（优先读取缓存）
+        df = fetch_dataset("cash_flow", symbol)
         
         if df is None or df.empty:
             return format_error(f"未找到股票 {symbol} 的现金流量表数据")
@@ -144,7 +207,7 @@ def get_stock_cash_flow(symbol: str, period: str = "annual") -> str:
         if period == "quarter" and "报告期" in df.columns:
             df = df[df["报告期"].str.contains("Q", na=False)]
         
-        return format_dataframe_to_json(df)
+        return format_dataframe_to_json(*paginate(page_key, df, page_size))
         
     except Exception as e:
         return format_error(f"获取现金流量表失败: {str(e)}", symbol)
@@ -161,11 +224,12 @@ def get_stock_main_indicators(symbol: str) -> str:
         JSON格式的主要指标数据
     """
     try:
+        symbol = normalize_symbol(symbol)
         if not validate_stock_symbol(symbol):
-            return format_error(f"股票代码格式不正确: {symbol}")
+            return format_error(f"股票代码格式不正确或不存在: {symbol}")
         
-        # 调用AKShare接口获取个股信息
-        df = ak.stock_individual_info_em(symbol=symbol)
+        # 调用AKShare接口（优先读取缓存）获取个股信息
+        df = fetch_dataset("profile", symbol)
         
         if df is None or df.empty:
             return format_error(f"未找到股票 {symbol} 的主要指标数据")
@@ -173,4 +237,36 @@ def get_stock_main_indicators(symbol: str) -> str:
         return format_dataframe_to_json(df)
         
     except Exception as e:
-        return format_error(f"获取主要指标失败: {str(e)}", symbol)
\ No newline at end of file
+        return format_error(f"获取主要指标失败: {str(e)}", symbol)
+
+
+def get_stock_derived_metrics(symbol: str) -> str:
+    """
+    获取股票派生指标（TTM、同比/环比增长率、利润率）
+    
+    Args:
+        symbol: 股票代码
+    
+    Returns:
+        JSON格式的派生指标数据
+    """
+    try:
+        symbol = normalize_symbol(symbol)
+        if not validate_stock_symbol(symbol):
+            return format_error(f"股票代码格式不正确或不存在: {symbol}")
+        
+        # 确保利润表已缓存，派生指标基于缓存中的利润表计算
+        df = fetch_dataset("income", symbol)
+        
+        if df is None or df.empty:
+            return format_error(f"未找到股票 {symbol} 的利润表数据")
+        
+        df = get_derived_metrics_store().lookup(symbol)
+        
+        if df is None or df.empty:
+            return format_error(f"无法计算股票 {symbol} 的派生指标")
+        
+        return format_dataframe_to_json(df)
+        
+    except Exception as e:
+        return format_error(f"获取派生指标失败: {str(e)}", symbol)
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""全市场报告期数据工具"""
+from typing import List, Optional
+
+from src.utils import (
+    REPORT_KINDS,
+    normalize_symbols,
+    validate_stock_symbols,
+    validate_page_size,
+    format_dataframe_to_json,
+    format_dict_to_json,
+    format_error,
+    paginate,
+    resume_page,
+    get_market_report_store,
+    parse_report_period,
+    recent_periods
+)
+
+
+def _validate_kinds(kinds: Optional[List[str]]) -> List[str]:
+    kinds = kinds or list(REPORT_KINDS)
+    unknown = [kind for kind in kinds if kind not in REPORT_KINDS]
+    if unknown:
+        raise ValueError(f"报表类型不正确: {', '.join(unknown)}（可选: {', '.join(REPORT_KINDS)}）")
+    return kinds
+
+
+def ingest_market_reports(
+    kinds: Optional[List[str]] = None,
+    periods: Optional[List[str]] = None,
+    recent: int = 8,
+    refresh: bool = False
+) -> str:
+    """
+    按报告期获取全市场业绩报表和资产负债、利润、现金流量摘要并保存到本地
+
+    每个报告期一次请求得到所有股票的数据；已过披露期的报告期保存后不再重复获取。
+
+    Args:
+        kinds: 报表类型（performance/balance_sheet/income/cash_flow，默认全部）
+        periods: 报告期列表（YYYYMMDD 或 YYYY-MM-DD，须为季末日）
+        recent: 未指定报告期时获取最近几个报告期
+        refresh: 是否重新获取已过披露期的报告期
+
+    Returns:
+        JSON格式的获取结果（请求次数、各报告期行数、跳过和失败的报告期）
+    """
+    try:
+        try:
+            kinds = _validate_kinds(kinds)
+            if periods:
+                report_periods = [parse_report_period(period) for period in periods]
+            else:
+                if not 1 <= recent <= 40:
+                    return format_error(f"报告期数量应在1到40之间: {recent}")
+                report_periods = recent_periods(recent)
+        except ValueError as e:
+            return format_error(str(e))
+
+        summary = get_market_report_store().ingest(kinds, report_periods, refresh)
+        summary["periods"] = [period.isoformat() for period in report_periods]
+        return format_dict_to_json(summary)
+
+    except Exception as e:
+        return format_error(f"获取全市场报告期数据失败: {str(e)}")
+
+
+def get_market_report(
+    kind: str,
+    period: Optional[str] = None,
+    symbols: Optional[List[str]] = None,
+    page_size: int = 0,
+    cursor: Optional[str] = None
+) -> str:
+    """
+    查询本地保存的全市场报告期数据
+
+    未指定股票时返回一个报告期内所有股票的数据；指定股票时返回这些股票在
+    所有已保存报告期（或指定报告期）的数据。需先调用 ingest_market_reports。
+
+    Args:
+        kind: 报表类型（performance/balance_sheet/income/cash_flow）
+        period: 报告期（YYYYMMDD 或 YYYY-MM-DD，默认最近已保存的报告期）
+        symbols: 股票代码列表
+        page_size: 每页条数（0 表示返回全部）
+        cursor: 上一页返回的 next_cursor
+
+    Returns:
+        JSON格式的报告期数据
+    """
+    try:
+        try:
+            _validate_kinds([kind])
+            report_period = parse_report_period(period) if period else None
+        except ValueError as e:
+            return format_error(str(e))
+
+        if symbols:
+            symbols = normalize_symbols(symbols)
+            is_valid, error_msg = validate_stock_symbols(symbols, max_count=500)
+            if not is_valid:
+                return format_error(error_msg)
+
+        if not validate_page_size(page_size):
+            return format_error(f"每页条数不正确: {page_size}")
+
+        page_key = f"market_report:{kind}:{period or ''}:{','.join(symbols or [])}"
+        if cursor:
+            return format_dataframe_to_json(*resume_page(page_key, cursor, page_size))
+
+        store = get_market_report_store()
+        if symbols:
+            df = store.history(kind, symbols)
+            if report_period is not None and not df.empty:
+                df = df[df["报告期"] == report_period.isoformat()].reset_index(drop=True)
+        else:
+            _, df = store.market(kind, report_period)
+
+        if df is None or df.empty:
+            return format_error(f"本地没有 {kind} 报表{'（' + period + '）' if period else ''}的数据，请先调用 ingest_market_reports")
+
+        return format_dataframe_to_json(*paginate(page_key, df, page_size))
+
+    except Exception as e:
+        return format_error(f"查询全市场报告期数据失败: {str(e)}")
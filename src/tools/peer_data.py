@@ -0,0 +1,144 @@
+"""同业对比工具"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+import pandas as pd
+
+from src.utils import (
+    validate_stock_symbol,
+    normalize_symbol,
+    format_dict_to_json,
+    format_error,
+    fetch_dataset,
+    get_industry_index,
+    get_spot_quotes,
+    normalize_column,
+    workload,
+    BULK
+)
+
+
+# 对比的行情列
+QUOTE_COLUMNS = ["名称", "最新价", "涨跌幅", "总市值", "市盈率-动态", "市净率"]
+
+# 对比的财务指标：标准化列名 -> 输出列名（取最新报告期）
+PEER_INDICATORS = {
+    "净资产收益率": "净资产收益率(%)",
+    "销售毛利率": "销售毛利率(%)",
+    "销售净利率": "销售净利率(%)",
+    "主营业务收入增长率": "营收增长率(%)",
+    "净利润增长率": "净利润增长率(%)",
+    "资产负债率": "资产负债率(%)",
+}
+
+SORT_COLUMNS = ["总市值", "涨跌幅", "市盈率-动态", "市净率"] + list(PEER_INDICATORS.values())
+
+
+def _latest_indicators(symbol: str) -> Dict[str, Optional[float]]:
+    """读取单个股票最新一期的对比指标（优先读取缓存）"""
+    row = {"代码": symbol}
+    try:
+        df = fetch_dataset("indicators", symbol)
+    except Exception:
+        return row
+    if df is None or df.empty:
+        return row
+
+    latest = df.loc[df["日期"].astype(str).idxmax()] if "日期" in df.columns else df.iloc[0]
+    for column in df.columns:
+        output = PEER_INDICATORS.get(normalize_column(column))
+        if output and output not in row:
+            row[output] = pd.to_numeric(latest[column], errors="coerce")
+    return row
+
+
+def compare_peers(
+    symbol: str,
+    sort_by: str = "总市值",
+    ascending: bool = False,
+    max_peers: int = 20
+) -> str:
+    """
+    同业对比：按行业找出同业股票，返回行情与最新财务指标的排名表
+    
+    Args:
+        symbol: 股票代码
+        sort_by: 排序列
+        ascending: 是否升序（默认降序）
+        max_peers: 最多对比的股票数（按总市值选取，包含目标股票）
+    
+    Returns:
+        JSON格式的对比结果
+    """
+    try:
+        symbol = normalize_symbol(symbol)
+        if not validate_stock_symbol(symbol):
+            return format_error(f"股票代码格式不正确或不存在: {symbol}")
+        
+        if sort_by not in SORT_COLUMNS:
+            return format_error(f"排序列不正确: {sort_by}，有效值: {', '.join(SORT_COLUMNS)}")
+        
+        if not 2 <= max_peers <= 100:
+            return format_error("对比股票数应在2-100之间")
+        
+        index = get_industry_index()
+        industry = index.industry(symbol)
+        if not industry:
+            return format_error(f"无法确定股票 {symbol} 的所属行业", symbol)
+        
+        members = index.members(industry)
+        if symbol not in members:
+            members.append(symbol)
+        
+        # 行情来自全市场快照（一次上游请求），按总市值选取同业
+        try:
+            quotes, _, _ = get_spot_quotes().quotes(members)
+            quotes = quotes.set_index("代码").reindex(columns=QUOTE_COLUMNS)
+        except Exception:
+            quotes = pd.DataFrame(index=pd.Index(members, name="代码"), columns=QUOTE_COLUMNS)
+        
+        ranked = quotes["总市值"].sort_values(ascending=False, na_position="last").index
+        peers = [symbol] + [code for code in ranked if code != symbol][:max_peers - 1]
+        
+        # 并发读取同业股票的财务指标（已缓存的直接读取）；同业最多99只，
+        # 按批量类别调度，不占满交互查询的上游名额，目标股票仍按交互查询获取
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            with workload(BULK):
+                futures = [
+                    executor.submit(contextvars.copy_context().run, _latest_indicators, peer)
+                    for peer in peers[1:]
+                ]
+            rows = [_latest_indicators(symbol)] + [future.result() for future in futures]
+        indicators = pd.DataFrame(rows)
+        
+        table = quotes.reindex(peers).reset_index().merge(indicators, on="代码", how="left")
+        table = table.reindex(columns=["代码"] + QUOTE_COLUMNS + list(PEER_INDICATORS.values()))
+        table[sort_by] = pd.to_numeric(table[sort_by], errors="coerce")
+        table = table.sort_values(sort_by, ascending=ascending, na_position="last", ignore_index=True)
+        table.insert(0, "排名", range(1, len(table) + 1))
+        
+        # 目标股票在各指标上的名次（降序）
+        target = table["代码"] == symbol
+        target_ranks = {}
+        for column in SORT_COLUMNS:
+            values = pd.to_numeric(table[column], errors="coerce")
+            if values[target].notna().any():
+                rank = values.rank(ascending=False, method="min")[target].iloc[0]
+                target_ranks[column] = f"{int(rank)}/{int(values.notna().sum())}"
+        
+        data = table.astype(object).where(table.notna(), None).to_dict(orient="records")
+        return format_dict_to_json({
+            "symbol": symbol,
+            "industry": industry,
+            "industry_size": len(members),
+            "count": len(data),
+            "sort_by": sort_by,
+            "target_ranks": target_ranks,
+            "data": data,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return format_error(f"同业对比失败: {str(e)}", symbol)
@@ -0,0 +1,69 @@
+"""历史行情工具"""
+from datetime import date, timedelta
+from typing import Optional
+
+import pandas as pd
+
+from src.utils import (
+    validate_stock_symbol,
+    normalize_symbol,
+    validate_adjust,
+    format_dataframe_to_json,
+    format_error,
+    get_price_history_store
+)
+
+
+def _parse_date(value: Optional[str], default: date) -> str:
+    """解析 YYYYMMDD 或 YYYY-MM-DD 格式的日期，为空时使用默认值"""
+    if not value:
+        return default.isoformat()
+    return pd.Timestamp(value.strip()).date().isoformat()
+
+
+def get_stock_price_history(
+    symbol: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    adjust: str = ""
+) -> str:
+    """
+    获取股票历史日K线
+    
+    已获取过的日期区间从本地存储读取，只向上游请求缺失的日期。
+    
+    Args:
+        symbol: 股票代码
+        start_date: 开始日期（YYYYMMDD 或 YYYY-MM-DD，默认结束日期前一年）
+        end_date: 结束日期（默认今天）
+        adjust: 复权方式（""不复权、"qfq"前复权、"hfq"后复权）
+    
+    Returns:
+        JSON格式的K线数据
+    """
+    try:
+        symbol = normalize_symbol(symbol)
+        if not validate_stock_symbol(symbol):
+            return format_error(f"股票代码格式不正确或不存在: {symbol}")
+        
+        if not validate_adjust(adjust):
+            return format_error(f"复权方式不正确: {adjust}")
+        
+        try:
+            end = min(_parse_date(end_date, date.today()), date.today().isoformat())
+            start = _parse_date(start_date, date.fromisoformat(end) - timedelta(days=365))
+        except ValueError:
+            return format_error(f"日期格式不正确: {start_date} / {end_date}")
+        
+        if start > end:
+            return format_error(f"开始日期晚于结束日期: {start} > {end}")
+        
+        df = get_price_history_store().get(symbol, start, end, adjust)
+        
+        if df is None or df.empty:
+            return format_error(f"未找到股票 {symbol} 在 {start} 至 {end} 的K线数据")
+        
+        return format_dataframe_to_json(df)
+        
+    except Exception as e:
+        return format_error(f"获取历史行情失败: {str(e)}", symbol)
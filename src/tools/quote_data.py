@@ -0,0 +1,45 @@
+"""实时行情工具"""
+from datetime import datetime
+from typing import List
+
+from src.utils import (
+    validate_stock_symbols,
+    normalize_symbols,
+    format_dict_to_json,
+    format_error,
+    get_spot_quotes
+)
+
+
+def get_stock_quote(symbols: List[str]) -> str:
+    """
+    获取股票实时行情（最新价、涨跌幅、成交额、市盈率、市净率、总市值等）
+    
+    所有查询共用一份定期刷新的全市场行情快照，不按股票逐个请求上游。
+    
+    Args:
+        symbols: 股票代码列表
+    
+    Returns:
+        JSON格式的行情数据
+    """
+    try:
+        symbols = normalize_symbols(symbols)
+        
+        is_valid, error_msg = validate_stock_symbols(symbols, max_count=500)
+        if not is_valid:
+            return format_error(error_msg)
+        
+        df, missing, fetched_at = get_spot_quotes().quotes(symbols)
+        data = df.fillna("").to_dict(orient="records")
+        
+        return format_dict_to_json({
+            "data": data,
+            "count": len(data),
+            "not_found": missing,
+            "snapshot_time": fetched_at.isoformat(),
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return format_error(f"获取实时行情失败: {str(e)}")
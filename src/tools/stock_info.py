@@ -1,15 +1,24 @@
 """股票信息和搜索工具"""
-import akshare as ak
 import pandas as pd
-from src.utils import format_dataframe_to_json, format_error
+from typing import Optional
+from src.utils import (
+    validate_page_size,
+    format_dataframe_to_json,
+    format_error,
+    get_stock_universe,
+    paginate,
+    resume_page
+)
 
 
-def search_stock(query: str) -> str:
+def search_stock(query: str, page_size: int = 50, cursor: Optional[str] = None) -> str:
     """
     搜索股票
     
     Args:
         query: 搜索关键词（股票代码或名称）
+        page_size: 每页条数（默认50，0 表示返回全部）
+        cursor: 上一页返回的 next_cursor
     
     Returns:
         JSON格式的股票列表
@@ -20,8 +29,16 @@ def search_stock(query: str) -> str:
         
         query = query.strip()
         
-        # 获取A股股票列表
-        df = ak.stock_info_a_code_name()
+        if not validate_page_size(page_size):
+            return format_error(f"每页条数不正确: {page_size}")
+        
+        # 翻页时直接读取首次查询缓存的完整结果
+        page_key = f"search_stock:{query}"
+        if cursor:
+            return format_dataframe_to_json(*resume_page(page_key, cursor, page_size))
+        
+        # A股股票列表（与代码校验共用，不重复请求上游）
+        df = get_stock_universe().frame()
         
         if df is None or df.empty:
             return format_error("获取股票列表失败")
@@ -40,31 +57,38 @@ def search_stock(query: str) -> str:
                 "message": [f"未找到匹配 '{query}' 的股票"]
             }))
         
-        # 限制返回数量
-        if len(result_df) > 50:
-            result_df = result_df.head(50)
-            # 添加提示信息
-        
-        return format_dataframe_to_json(result_df)
+        # 超过一页时返回 next_cursor 用于获取后续结果
+        return format_dataframe_to_json(*paginate(page_key, result_df, page_size))
         
     except Exception as e:
         return format_error(f"搜索股票失败: {str(e)}")
 
 
-def get_all_stocks() -> str:
+def get_all_stocks(page_size: int = 0, cursor: Optional[str] = None) -> str:
     """
     获取所有A股股票列表
     
+    Args:
+        page_size: 每页条数（0 表示返回全部）
+        cursor: 上一页返回的 next_cursor
+    
     Returns:
         JSON格式的股票列表
     """
     try:
-        df = ak.stock_info_a_code_name()
+        if not validate_page_size(page_size):
+            return format_error(f"每页条数不正确: {page_size}")
+        
+        # 翻页时直接读取首次查询缓存的完整结果
+        if cursor:
+            return format_dataframe_to_json(*resume_page("get_all_stocks", cursor, page_size))
+        
+        df = get_stock_universe().frame()
         
         if df is None or df.empty:
             return format_error("获取股票列表失败")
         
-        return format_dataframe_to_json(df)
+        return format_dataframe_to_json(*paginate("get_all_stocks", df, page_size))
         
     except Exception as e:
         return format_error(f"获取股票列表失败: {str(e)}")
\ No newline at end of file
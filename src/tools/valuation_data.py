@@ -0,0 +1,71 @@
+"""估值指标工具"""
+from datetime import date, timedelta
+from typing import List, Optional
+
+import pandas as pd
+
+from src.utils import (
+    validate_stock_symbols,
+    validate_page_size,
+    normalize_symbols,
+    format_dataframe_to_json,
+    format_error,
+    valuation_history,
+    paginate,
+    resume_page
+)
+
+
+def get_valuation_history(
+    symbols: List[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    page_size: int = 0,
+    cursor: Optional[str] = None
+) -> str:
+    """
+    获取多只股票的历史估值（每个交易日的总市值、市盈率TTM、市净率、市销率TTM）
+    
+    Args:
+        symbols: 股票代码列表
+        start_date: 开始日期（YYYYMMDD 或 YYYY-MM-DD，默认结束日期前一年）
+        end_date: 结束日期（默认今天）
+        page_size: 每页条数（0 表示返回全部）
+        cursor: 上一页返回的 next_cursor
+    
+    Returns:
+        JSON格式的估值数据
+    """
+    try:
+        symbols = normalize_symbols(symbols)
+        
+        is_valid, error_msg = validate_stock_symbols(symbols, max_count=50)
+        if not is_valid:
+            return format_error(error_msg)
+        
+        if not validate_page_size(page_size):
+            return format_error(f"每页条数不正确: {page_size}")
+        
+        try:
+            end = min(pd.Timestamp(end_date).date() if end_date else date.today(), date.today())
+            start = pd.Timestamp(start_date).date() if start_date else end - timedelta(days=365)
+        except ValueError:
+            return format_error(f"日期格式不正确: {start_date} / {end_date}")
+        
+        if start > end:
+            return format_error(f"开始日期晚于结束日期: {start} > {end}")
+        
+        # 翻页时直接读取首次查询缓存的完整结果
+        page_key = f"valuation:{','.join(symbols)}:{start}:{end}"
+        if cursor:
+            return format_dataframe_to_json(*resume_page(page_key, cursor, page_size))
+        
+        df = valuation_history(symbols, start.isoformat(), end.isoformat())
+        
+        if df is None or df.empty:
+            return format_error("未找到可计算估值的数据")
+        
+        return format_dataframe_to_json(*paginate(page_key, df, page_size))
+        
+    except Exception as e:
+        return format_error(f"获取历史估值失败: {str(e)}")
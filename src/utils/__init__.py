@@ -5,6 +5,8 @@ from .validators import (
     validate_period,
     validate_indicator_type,
     validate_file_format,
+    validate_page_size,
+    validate_adjust,
     normalize_symbol,
     normalize_symbols
 )
@@ -12,11 +14,51 @@ from .data_formatter import (
     format_dataframe_to_json,
     format_dict_to_json,
     format_batch_results,
+    format_batch_fragments,
     format_error,
+    ErrorResponse,
     simplify_financial_data,
     format_file_info
 )
+from .arrow_io import HAS_ARROW, read_arrow_file, write_arrow_file
+from .indicator_groups import IndicatorGroups, get_indicator_groups, indicator_types, normalize_column
 from .file_manager import FileManager
+from .file_catalog import FileCatalog
+from .data_cache import CachedFetchError, DataCache, classify_error
+from .data_bundle import DataBundle, get_offline_bundle
+from .data_source import DATASETS, get_data_cache, fetch_dataset, call_upstream
+from .delta import ETAGS_DATASET, diff_since
+from .result_pages import PAGES_DATASET, paginate, resume_page
+from .response_cache import ResponseCache, get_response_cache, response_key
+from .spot_quotes import SpotQuotes, get_spot_quotes
+from .stock_universe import StockUniverse, get_stock_universe
+from .price_history import PriceHistoryStore, get_price_history_store
+from .valuation import build_fundamentals, compute_valuation, valuation_history
+from .industry_index import IndustryIndex, get_industry_index
+from .market_reports import (
+    REPORT_KINDS,
+    MarketReportStore,
+    get_market_report_store,
+    parse_report_period,
+    recent_periods
+)
+from .worker_pool import WorkerPool, get_worker_pool
+from .upstream_scheduler import (
+    BULK,
+    INTERACTIVE,
+    UpstreamScheduler,
+    current_workload,
+    disable_upstream_scheduler,
+    get_upstream_scheduler,
+    workload
+)
+from .profiling import ProfileSession, start_profile
+from .tracing import Span, Trace, current_trace, request_trace, span, traced
+from .derived_metrics import (
+    compute_derived_metrics,
+    DerivedMetricsStore,
+    get_derived_metrics_store
+)
 
 __all__ = [
     'validate_stock_symbol',
@@ -24,13 +66,78 @@ __all__ = [
     'validate_period',
     'validate_indicator_type',
     'validate_file_format',
+    'validate_page_size',
+    'validate_adjust',
     'normalize_symbol',
     'normalize_symbols',
     'format_dataframe_to_json',
     'format_dict_to_json',
     'format_batch_results',
+    'format_batch_fragments',
     'format_error',
+    'ErrorResponse',
     'simplify_financial_data',
     'format_file_info',
-    'FileManager'
+    'IndicatorGroups',
+    'get_indicator_groups',
+    'indicator_types',
+    'normalize_column',
+    'HAS_ARROW',
+    'read_arrow_file',
+    'write_arrow_file',
+    'FileManager',
+    'FileCatalog',
+    'DataCache',
+    'CachedFetchError',
+    'classify_error',
+    'DATASETS',
+    'get_data_cache',
+    'fetch_dataset',
+    'call_upstream',
+    'DataBundle',
+    'get_offline_bundle',
+    'ETAGS_DATASET',
+    'diff_since',
+    'PAGES_DATASET',
+    'paginate',
+    'resume_page',
+    'ResponseCache',
+    'get_response_cache',
+    'response_key',
+    'SpotQuotes',
+    'get_spot_quotes',
+    'StockUniverse',
+    'get_stock_universe',
+    'PriceHistoryStore',
+    'get_price_history_store',
+    'build_fundamentals',
+    'compute_valuation',
+    'valuation_history',
+    'IndustryIndex',
+    'get_industry_index',
+    'REPORT_KINDS',
+    'MarketReportStore',
+    'get_market_report_store',
+    'parse_report_period',
+    'recent_periods',
+    'WorkerPool',
+    'get_worker_pool',
+    'BULK',
+    'INTERACTIVE',
+    'UpstreamScheduler',
+    'current_workload',
+    'get_upstream_scheduler',
+    'disable_upstream_scheduler',
+    'workload',
+    'ProfileSession',
+    'start_profile',
+    'Span',
+    'Trace',
+    'current_trace',
+    'request_trace',
+    'span',
+    'traced',
+    'compute_derived_metrics',
+    'DerivedMetricsStore',
+    'get_derived_metrics_store'
 ]
\ No newline at end of file
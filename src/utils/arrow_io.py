@@ -0,0 +1,92 @@
+"""Arrow 读写工具（pyarrow 为可选依赖，未安装时调用方回退到 pandas）"""
+from pathlib import Path
+from typing import BinaryIO, List, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover - pyarrow为可选依赖
+    pa = None
+    pc = None
+    pa_csv = None
+
+
+HAS_ARROW = pa is not None
+
+# DataFrame 或 pyarrow.Table
+TableLike = Union[pd.DataFrame, "pa.Table"]
+
+
+def is_arrow_table(data) -> bool:
+    """判断是否为 pyarrow.Table"""
+    return HAS_ARROW and isinstance(data, pa.Table)
+
+
+def to_arrow_table(df: pd.DataFrame) -> "pa.Table":
+    """
+    DataFrame 转换为 Arrow 表
+
+    Raises:
+        pa.ArrowException / TypeError: 列中混合了无法统一类型的值
+    """
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def to_dataframe(table: "pa.Table") -> pd.DataFrame:
+    """Arrow 表转换为 DataFrame（按列拆分，数值列尽量不复制）"""
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+
+def write_arrow_file(df: pd.DataFrame, path: Path) -> bool:
+    """
+    以 Arrow IPC 文件格式写入 DataFrame
+
+    Returns:
+        是否写入成功（未安装pyarrow或数据无法转换为Arrow时返回False）
+    """
+    if not HAS_ARROW:
+        return False
+    try:
+        table = to_arrow_table(df)
+    except (pa.ArrowException, TypeError, ValueError):
+        return False
+
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return True
+
+
+def read_arrow_table(path: Path) -> "pa.Table":
+    """通过内存映射读取 Arrow IPC 文件为 Arrow 表（数据缓冲区直接引用映射的页）"""
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def read_arrow_file(path: Path) -> pd.DataFrame:
+    """通过内存映射读取 Arrow IPC 文件（多个进程读取同一文件时共享页缓存）"""
+    return to_dataframe(read_arrow_table(path))
+
+
+def filter_range(table: "pa.Table", column: str, start, end) -> "pa.Table":
+    """筛选 start <= column <= end 的行"""
+    values = table.column(column)
+    return table.filter(pc.and_(pc.greater_equal(values, start), pc.less_equal(values, end)))
+
+
+def concat_tables(tables: List["pa.Table"]) -> "pa.Table":
+    """合并列不完全相同的 Arrow 表（缺失列补空值）"""
+    return pa.concat_tables(tables, promote_options="default")
+
+
+def write_csv(table: "pa.Table", target: Union[Path, BinaryIO]):
+    """用 Arrow 的CSV写出器写入文件路径或二进制流（带BOM，便于Excel识别UTF-8）"""
+    if isinstance(target, (str, Path)):
+        with open(target, "wb") as f:
+            write_csv(table, f)
+        return
+    target.write(b"\xef\xbb\xbf")
+    pa_csv.write_csv(table, target)
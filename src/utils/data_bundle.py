@@ -0,0 +1,148 @@
+"""离线数据包（预先导出的 AKShare 接口结果，离线模式下代替上游）"""
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .arrow_io import read_arrow_file, write_arrow_file
+from .settings import OFFLINE_BUNDLE_PATH
+
+
+BUNDLE_FORMAT = 1
+
+# 无 symbol / date 参数的接口（如股票列表、全市场行情）在数据包中的文件名
+ALL_KEY = "_all"
+
+# 按复权方式分别保存的日K线接口
+HISTORY_FUNCTION = "stock_zh_a_hist"
+
+
+def _directory_name(name: str, kwargs: Dict[str, Any]) -> str:
+    if name == HISTORY_FUNCTION:
+        return f"{name}_{kwargs.get('adjust') or 'none'}"
+    return name
+
+
+def bundle_file(root: Path, name: str, **kwargs) -> Path:
+    """
+    数据包中保存某次接口调用结果的文件（不含扩展名）
+
+    Args:
+        root: 数据包版本目录
+        name: AKShare 接口名称
+        **kwargs: 接口参数（按 symbol 区分文件，按报告期获取的接口按 date 区分，
+            日K线另按 adjust 区分目录）
+    """
+    key = str(kwargs.get("symbol", kwargs.get("date", ALL_KEY))).replace("/", "_").replace("\\", "_")
+    return root / _directory_name(name, kwargs) / key
+
+
+def write_bundle_frame(path: Path, df: pd.DataFrame) -> Path:
+    """
+    写入数据包文件（优先Arrow IPC，无法转换时使用pickle）
+
+    Returns:
+        实际写入的文件路径
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    target = Path(f"{path}.arrow")
+    if not write_arrow_file(df.reset_index(drop=True), target):
+        target = Path(f"{path}.pkl")
+        df.to_pickle(target)
+    return target
+
+
+def read_bundle_frame(path: Path) -> Optional[pd.DataFrame]:
+    """
+    读取数据包文件
+
+    Args:
+        path: bundle_file 返回的路径（不含扩展名）
+
+    Returns:
+        DataFrame，文件不存在时返回None
+    """
+    arrow_path, pickle_path = Path(f"{path}.arrow"), Path(f"{path}.pkl")
+    if arrow_path.exists():
+        return read_arrow_file(arrow_path)
+    if pickle_path.exists():
+        return pd.read_pickle(pickle_path)
+    return None
+
+
+class DataBundle:
+    """
+    离线数据包
+
+    目录结构：<数据包>/CURRENT 记录当前版本，<数据包>/<版本>/manifest.json
+    描述内容，<版本>/<接口名称>/<股票代码>.arrow 保存接口结果。
+    读取时内存映射 Arrow 文件；数据包中没有的数据抛出 LookupError。
+    """
+
+    def __init__(self, path: str):
+        """
+        加载数据包
+
+        Args:
+            path: 数据包目录（含 CURRENT），或某个版本目录（含 manifest.json）
+        """
+        path = Path(path)
+        if not (path / "manifest.json").exists() and (path / "CURRENT").exists():
+            path = path / (path / "CURRENT").read_text(encoding="utf-8").strip()
+
+        manifest_path = path / "manifest.json"
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"离线数据包不存在或不完整: {path}")
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != BUNDLE_FORMAT:
+            raise ValueError(f"不支持的离线数据包格式: {self.manifest.get('format')}")
+        self.root = path
+
+    @property
+    def version(self) -> str:
+        return self.manifest.get("version", self.root.name)
+
+    def call(self, name: str, **kwargs) -> pd.DataFrame:
+        """
+        以 AKShare 接口的调用方式读取数据包
+
+        Args:
+            name: AKShare 接口名称
+            **kwargs: 接口参数
+
+        Returns:
+            接口结果（日K线按 start_date/end_date 筛选）
+        """
+        df = read_bundle_frame(bundle_file(self.root, name, **kwargs))
+        if df is None:
+            raise LookupError(f"离线数据包（版本 {self.version}）中没有 {name}({kwargs.get('symbol', kwargs.get('date', ''))}) 的数据")
+
+        if name == HISTORY_FUNCTION and not df.empty:
+            dates = pd.to_datetime(df["日期"])
+            mask = pd.Series(True, index=df.index)
+            if kwargs.get("start_date"):
+                mask &= dates >= pd.Timestamp(kwargs["start_date"])
+            if kwargs.get("end_date"):
+                mask &= dates <= pd.Timestamp(kwargs["end_date"])
+            df = df[mask].reset_index(drop=True)
+        return df
+
+
+_bundle: Optional[DataBundle] = None
+_bundle_lock = threading.Lock()
+
+
+def get_offline_bundle() -> Optional[DataBundle]:
+    """获取离线数据包，未启用离线模式（AKSHARE_MCP_OFFLINE_BUNDLE 为空）时返回None"""
+    global _bundle
+    if not OFFLINE_BUNDLE_PATH:
+        return None
+    if _bundle is None:
+        with _bundle_lock:
+            if _bundle is None:
+                _bundle = DataBundle(OFFLINE_BUNDLE_PATH)
+    return _bundle
@@ -0,0 +1,691 @@
+"""数据缓存（内存 + 磁盘两级）"""
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from .arrow_io import read_arrow_file, write_arrow_file
+from .tracing import span
+
+
+# 磁盘层文件格式：优先Arrow IPC，无法转换时使用pickle
+ARROW_SUFFIX = ".arrow"
+PICKLE_SUFFIX = ".pkl"
+DISK_SUFFIXES = (ARROW_SUFFIX, PICKLE_SUFFIX)
+
+# 失败/无数据结果（负缓存）的类别
+NEGATIVE_EMPTY = "empty"
+NEGATIVE_ERROR = "error"
+NEGATIVE_TRANSIENT = "transient"
+
+# 负缓存条目数上限（只保存在内存中）
+MAX_NEGATIVE_ENTRIES = 10000
+
+# invalidate 时更新的标记文件（其他进程据此丢弃更早记录的负缓存）
+INVALIDATION_MARKER = ".invalidated"
+
+
+def key_digest(key: str) -> str:
+    """
+    查询标识（工具名称和查询参数）的短摘要
+
+    分页结果ID和ETag以此开头，用于确认游标或ETag属于当前查询
+
+    Args:
+        key: 查询标识
+
+    Returns:
+        8位十六进制摘要
+    """
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    区分上游异常：网络错误、超时、HTTP 429/5xx 为暂时性错误（NEGATIVE_TRANSIENT），
+    解析失败（接口对不存在的代码返回异常结构时常见的 KeyError/IndexError/
+    ValueError/TypeError 等）和 HTTP 4xx 为确定性错误（NEGATIVE_ERROR）
+
+    requests 的异常均为 OSError 的子类，无需导入 requests。
+    """
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if isinstance(status, int):
+        return NEGATIVE_ERROR if 400 <= status < 500 and status != 429 else NEGATIVE_TRANSIENT
+    if isinstance(error, (OSError, TimeoutError)):
+        return NEGATIVE_TRANSIENT
+    if isinstance(error, (KeyError, IndexError, ValueError, TypeError, AttributeError, LookupError)):
+        return NEGATIVE_ERROR
+    return NEGATIVE_TRANSIENT
+
+
+class CachedFetchError(Exception):
+    """负缓存命中：同一数据最近获取失败，在有效期内不再请求上游"""
+
+
+class _CacheEntry:
+    """内存层条目"""
+
+    __slots__ = ("df", "stored_at", "cost", "size", "on_disk", "priority")
+
+    def __init__(self, df: pd.DataFrame, stored_at: float, cost: float, on_disk: bool):
+        self.df = df
+        self.stored_at = stored_at
+        self.cost = cost
+        self.size = int(df.memory_usage(deep=True).sum())
+        self.on_disk = on_disk
+        self.priority = 0.0
+
+
+class DataCache:
+    """
+    按 (数据集, 股票代码) 缓存 DataFrame
+
+    内存层保存最近使用的数据，磁盘层（data/cache/<数据集>/，Arrow IPC文件，
+    内存映射读取）在进程重启后仍然可用，多进程模式下各进程共享。内存层受字节上限约束（按 DataFrame.memory_usage(deep=True) 计算），
+    超出时按 GreedyDual-Size 策略（重新获取代价 / 占用字节，叠加访问时间）淘汰，
+    被淘汰的数据仍可从磁盘层读回。每个数据集维护一个版本号，写入新数据时
+    递增，供派生数据判断是否需要重新计算。
+
+    磁盘层是多进程共享的数据来源：内存层命中时检查磁盘文件是否仍是载入时
+    的版本（一次stat），其他进程（多进程模式下的工作进程）写入或删除的文件
+    读取时计入版本号；invalidate、enforce_quota 和占用统计重新扫描目录，
+    不只依赖本进程的磁盘层索引。
+
+    获取结果为空或获取失败时在内存中记录负缓存，有效期按类别区分（无数据、
+    确定性错误、暂时性错误），有效期内相同请求直接返回空结果或抛出
+    CachedFetchError，不再请求上游。
+
+    返回的 DataFrame 为缓存中的同一对象，调用方不应原地修改。
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl_seconds: int = 6 * 3600,
+        max_memory_bytes: int = 512 * 1024 * 1024,
+        negative_ttls: Optional[Dict[str, int]] = None
+    ):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 磁盘缓存目录
+            ttl_seconds: 数据有效期（秒）
+            max_memory_bytes: 内存层容量上限（字节），超出时按代价淘汰到磁盘层
+            negative_ttls: 各类负缓存的有效期（秒，{类别: 秒数}，0 表示不缓存该类结果）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self._memory: Dict[Tuple[str, str], _CacheEntry] = {}
+        self._versions: Dict[str, int] = {}
+        self._fetch_costs: Dict[str, float] = {}
+        self._memory_bytes = 0
+        self._inflation = 0.0
+        self._evictions = 0
+        self._evicted_bytes = 0
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._disk_index: Optional[Dict[Tuple[str, str], Tuple[int, float]]] = None
+        self.negative_ttls = {NEGATIVE_EMPTY: 600, NEGATIVE_ERROR: 300, NEGATIVE_TRANSIENT: 10}
+        self.negative_ttls.update(negative_ttls or {})
+        # (数据集, 股票代码) -> (过期时间, 类别, 错误信息, 记录时间)
+        self._negative: Dict[Tuple[str, str], Tuple[float, str, Optional[str], float]] = {}
+        self._negative_hits: Dict[str, int] = {}
+        self._marker_path = self.cache_dir / INVALIDATION_MARKER
+        # (数据集, 股票代码) -> 写入/删除次数，供响应缓存判断数据是否变化
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.RLock()
+
+    def _disk_path(self, dataset: str, symbol: str, suffix: str = ARROW_SUFFIX) -> Path:
+        return self.cache_dir / dataset / f"{symbol}{suffix}"
+
+    def _find_disk_file(self, dataset: str, symbol: str) -> Optional[Tuple[Path, os.stat_result]]:
+        """查找磁盘层文件（优先Arrow格式），返回 (路径, stat)"""
+        for suffix in DISK_SUFFIXES:
+            path = self._disk_path(dataset, symbol, suffix)
+            try:
+                return path, path.stat()
+            except OSError:
+                continue
+        return None
+
+    @staticmethod
+    def _read_disk(path: Path) -> pd.DataFrame:
+        if path.suffix == ARROW_SUFFIX:
+            return read_arrow_file(path)
+        return pd.read_pickle(path)
+
+    def _is_fresh(self, stored_at: float) -> bool:
+        return time.time() - stored_at < self.ttl_seconds
+
+    def _scan_disk(self, dataset: Optional[str] = None) -> Dict[Tuple[str, str], Tuple[int, float]]:
+        """扫描磁盘层目录，返回 {(数据集, 股票代码): (字节数, 写入时间)}"""
+        if dataset is not None:
+            dataset_dirs = [self.cache_dir / dataset]
+        elif self.cache_dir.exists():
+            dataset_dirs = [path for path in self.cache_dir.iterdir() if path.is_dir()]
+        else:
+            dataset_dirs = []
+
+        found = {}
+        for dataset_dir in dataset_dirs:
+            try:
+                paths = list(dataset_dir.iterdir())
+            except OSError:
+                continue
+            # 同一数据同时存在两种格式时（写入过程中）以Arrow文件为准，与读取一致
+            for path in sorted(paths, key=lambda path: path.suffix != ARROW_SUFFIX):
+                key = (dataset_dir.name, path.stem)
+                if path.suffix not in DISK_SUFFIXES or key in found:
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                found[key] = (stat.st_size, stat.st_mtime)
+        return found
+
+    def _disk_entries(self) -> Dict[Tuple[str, str], Tuple[int, float]]:
+        """
+        磁盘层索引 {(数据集, 股票代码): (字节数, 写入时间)}
+
+        首次使用时扫描一次目录，之后随本进程的写入和删除同步维护，其他进程的
+        修改由 _observe_disk / _sync_disk 同步（调用方需持有锁）
+        """
+        if self._disk_index is None:
+            self._disk_index = self._scan_disk()
+        return self._disk_index
+
+    def _bump(self, key: Tuple[str, str]):
+        """递增单条数据和所属数据集的版本号（调用方需持有锁）"""
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._versions[key[0]] = self._versions.get(key[0], 0) + 1
+
+    def _observe_disk(self, key: Tuple[str, str], stat: Optional[Tuple[int, float]]) -> bool:
+        """
+        把磁盘文件的当前状态同步到索引（调用方需持有锁）
+
+        与索引不一致说明文件由其他进程写入或删除，递增版本号并丢弃内存层中的
+        旧数据
+
+        Args:
+            key: (数据集, 股票代码)
+            stat: 当前的 (字节数, 写入时间)，文件不存在时为None
+
+        Returns:
+            是否有变化
+        """
+        index = self._disk_entries()
+        if index.get(key) == stat:
+            return False
+        if stat is None:
+            index.pop(key, None)
+        else:
+            index[key] = stat
+        self._forget(key)
+        self._bump(key)
+        return True
+
+    def _sync_disk(self, dataset: Optional[str] = None):
+        """重新扫描磁盘层目录并同步索引（调用方需持有锁）"""
+        found = self._scan_disk(dataset)
+        index = self._disk_entries()
+        for key in [key for key in index if (dataset is None or key[0] == dataset) and key not in found]:
+            self._observe_disk(key, None)
+        for key, stat in found.items():
+            self._observe_disk(key, stat)
+
+    def _disk_stat(self, dataset: str, symbol: str) -> Optional[Tuple[int, float]]:
+        found = self._find_disk_file(dataset, symbol)
+        return None if found is None else (found[1].st_size, found[1].st_mtime)
+
+    def _delete_disk(self, key: Tuple[str, str]):
+        """删除磁盘层条目（调用方需持有锁）"""
+        for suffix in DISK_SUFFIXES:
+            self._disk_path(key[0], key[1], suffix).unlink(missing_ok=True)
+        self._disk_entries().pop(key, None)
+
+    def _write_disk(self, dataset: str, symbol: str, df: pd.DataFrame) -> bool:
+        """
+        原子写入磁盘层，失败时返回False
+
+        优先写为Arrow IPC文件（读取时内存映射），未安装pyarrow或数据含
+        无法统一类型的列时写为pickle
+        """
+        path = self._disk_path(dataset, symbol, ARROW_SUFFIX)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if not write_arrow_file(df, tmp_path):
+                path = self._disk_path(dataset, symbol, PICKLE_SUFFIX)
+                df.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+            for suffix in DISK_SUFFIXES:
+                if suffix != path.suffix:
+                    self._disk_path(dataset, symbol, suffix).unlink(missing_ok=True)
+            stat = path.stat()
+            with self._lock:
+                self._disk_entries()[(dataset, symbol)] = (stat.st_size, stat.st_mtime)
+            return True
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            return False
+
+    def _priority(self, entry: "_CacheEntry") -> float:
+        """淘汰优先级（GreedyDual-Size）：重新获取代价越低、占用越大越先淘汰"""
+        return self._inflation + entry.cost / max(entry.size, 1)
+
+    def _touch(self, entry: "_CacheEntry"):
+        entry.priority = self._priority(entry)
+
+    def _remember(self, key: Tuple[str, str], entry: "_CacheEntry"):
+        """放入内存层并按容量上限淘汰（调用方需持有锁）"""
+        self._forget(key)
+        if entry.size > self.max_memory_bytes:
+            # 单条数据超过内存上限，只保留在磁盘层
+            if not entry.on_disk:
+                entry.on_disk = self._write_disk(key[0], key[1], entry.df)
+            return
+
+        self._touch(entry)
+        self._memory[key] = entry
+        self._memory_bytes += entry.size
+        if self._memory_bytes > self.max_memory_bytes:
+            self._evict(exclude=key)
+
+    def _forget(self, key: Tuple[str, str]) -> Optional["_CacheEntry"]:
+        """从内存层移除（调用方需持有锁）"""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry.size
+        return entry
+
+    def _evict(self, exclude: Tuple[str, str]):
+        """淘汰优先级最低的条目直到低于容量上限，未落盘的条目先写入磁盘层"""
+        candidates = sorted(
+            (item for item in self._memory.items() if item[0] != exclude),
+            key=lambda item: item[1].priority
+        )
+        for key, entry in candidates:
+            if self._memory_bytes <= self.max_memory_bytes:
+                break
+            if not entry.on_disk:
+                entry.on_disk = self._write_disk(key[0], key[1], entry.df)
+            self._forget(key)
+            self._inflation = entry.priority
+            self._evictions += 1
+            self._evicted_bytes += entry.size
+
+    def _fetch_cost(self, dataset: str) -> float:
+        return self._fetch_costs.get(dataset, 1.0)
+
+    def _record(self, dataset: str, hit: bool):
+        counter = self._hits if hit else self._misses
+        with self._lock:
+            counter[dataset] = counter.get(dataset, 0) + 1
+
+    def get(self, dataset: str, symbol: str) -> Optional[pd.DataFrame]:
+        """
+        读取缓存数据
+
+        Args:
+            dataset: 数据集名称
+            symbol: 股票代码
+
+        Returns:
+            缓存的DataFrame，不存在或已过期时返回None
+        """
+        key = (dataset, symbol)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                # 磁盘文件被其他进程删除或覆盖时内存中的数据已失效
+                if entry.on_disk and self._observe_disk(key, self._disk_stat(dataset, symbol)):
+                    entry = None
+                elif self._is_fresh(entry.stored_at):
+                    self._touch(entry)
+                    self._hits[dataset] = self._hits.get(dataset, 0) + 1
+                    return entry.df
+                else:
+                    self._forget(key)
+
+        found = self._find_disk_file(dataset, symbol)
+        if found is None:
+            with self._lock:
+                self._observe_disk(key, None)
+            self._record(dataset, hit=False)
+            return None
+
+        path, stat = found
+        stored_at = stat.st_mtime
+        if not self._is_fresh(stored_at):
+            self._record(dataset, hit=False)
+            return None
+
+        try:
+            df = self._read_disk(path)
+        except Exception:
+            self._record(dataset, hit=False)
+            return None
+
+        with self._lock:
+            # 其他进程写入的文件第一次读取时计入版本号
+            self._observe_disk(key, (stat.st_size, stat.st_mtime))
+            self._hits[dataset] = self._hits.get(dataset, 0) + 1
+            self._remember(key, _CacheEntry(
+                df, stored_at, self._fetch_cost(dataset), on_disk=True
+            ))
+        return df
+
+    def put(self, dataset: str, symbol: str, df: pd.DataFrame, cost: Optional[float] = None):
+        """
+        写入缓存数据（同时写入磁盘）
+
+        Args:
+            dataset: 数据集名称
+            symbol: 股票代码
+            df: 数据
+            cost: 重新获取该数据的代价（秒），为空时使用该数据集的平均获取耗时
+        """
+        on_disk = self._write_disk(dataset, symbol, df)
+
+        with self._lock:
+            self._negative.pop((dataset, symbol), None)
+            self._bump((dataset, symbol))
+            self._remember((dataset, symbol), _CacheEntry(
+                df, time.time(), cost or self._fetch_cost(dataset), on_disk=on_disk
+            ))
+
+    def get_or_fetch(
+        self,
+        dataset: str,
+        symbol: str,
+        fetcher: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """
+        优先读取缓存，未命中时调用fetcher获取并缓存非空结果
+
+        Args:
+            dataset: 数据集名称
+            symbol: 股票代码
+            fetcher: 数据获取函数
+
+        Returns:
+            DataFrame（可能为None或空）
+        """
+        with span("cache_lookup", dataset=dataset, symbol=symbol) as lookup:
+            df = self.get(dataset, symbol)
+            lookup.set(hit=df is not None)
+        if df is not None:
+            return df
+
+        negative = self._negative_lookup(dataset, symbol)
+        if negative is not None:
+            kind, message = negative
+            if kind == NEGATIVE_EMPTY:
+                return pd.DataFrame()
+            raise CachedFetchError(message)
+
+        start = time.perf_counter()
+        try:
+            df = fetcher()
+        except Exception as e:
+            self._remember_negative(dataset, symbol, classify_error(e), str(e) or type(e).__name__)
+            raise
+        cost = time.perf_counter() - start
+
+        with self._lock:
+            previous = self._fetch_costs.get(dataset)
+            self._fetch_costs[dataset] = cost if previous is None else previous * 0.8 + cost * 0.2
+
+        if df is not None and not df.empty:
+            self.put(dataset, symbol, df, cost=cost)
+        else:
+            self._remember_negative(dataset, symbol, NEGATIVE_EMPTY, None)
+        return df
+
+    def _invalidated_at(self) -> float:
+        """最近一次 invalidate（任一进程）的时间"""
+        try:
+            return self._marker_path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def _negative_lookup(self, dataset: str, symbol: str) -> Optional[Tuple[str, Optional[str]]]:
+        """查询未过期的负缓存，返回 (类别, 错误信息)"""
+        key = (dataset, symbol)
+        with self._lock:
+            entry = self._negative.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time() or entry[3] <= self._invalidated_at():
+                del self._negative[key]
+                return None
+            self._negative_hits[dataset] = self._negative_hits.get(dataset, 0) + 1
+            return entry[1], entry[2]
+
+    def _remember_negative(self, dataset: str, symbol: str, kind: str, message: Optional[str]):
+        """记录负缓存（有效期为0的类别不记录）"""
+        ttl = self.negative_ttls.get(kind, 0)
+        if ttl <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            if len(self._negative) >= MAX_NEGATIVE_ENTRIES:
+                for key in [key for key, entry in self._negative.items() if entry[0] <= now]:
+                    del self._negative[key]
+                if len(self._negative) >= MAX_NEGATIVE_ENTRIES:
+                    # 都未过期时丢弃最早过期的一半
+                    for key, _ in sorted(self._negative.items(), key=lambda item: item[1][0])[:MAX_NEGATIVE_ENTRIES // 2]:
+                        del self._negative[key]
+            self._negative[(dataset, symbol)] = (now + ttl, kind, message, now)
+
+    def version(self, dataset: str) -> int:
+        """获取数据集版本号（每次写入递增）"""
+        with self._lock:
+            return self._versions.get(dataset, 0)
+
+    def generation(self, dataset: str, symbol: str) -> int:
+        """获取单条数据的版本号（该数据每次写入或删除时递增）"""
+        with self._lock:
+            return self._generations.get((dataset, symbol), 0)
+
+    def generations(self, dataset: str) -> Dict[str, int]:
+        """
+        获取数据集中所有已缓存数据（包括仅存在于磁盘上的数据）的版本号
+
+        Args:
+            dataset: 数据集名称
+
+        Returns:
+            {股票代码: 版本号}
+        """
+        with self._lock:
+            self._sync_disk(dataset)
+            symbols = {symbol for (name, symbol) in self._memory if name == dataset}
+            symbols.update(symbol for (name, symbol) in self._disk_entries() if name == dataset)
+            return {symbol: self._generations.get((dataset, symbol), 0) for symbol in symbols}
+
+    def items(self, dataset: str, symbols: Optional[Iterable[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        获取数据集中已缓存的数据（包括仅存在于磁盘上的数据，不检查有效期）
+
+        Args:
+            dataset: 数据集名称
+            symbols: 只读取这些股票（为空表示全部）
+
+        Returns:
+            {股票代码: DataFrame}
+        """
+        wanted = None if symbols is None else set(symbols)
+        with self._lock:
+            frames = {
+                symbol: entry.df
+                for (name, symbol), entry in self._memory.items()
+                if name == dataset and (wanted is None or symbol in wanted)
+            }
+
+            disk_symbols = [
+                symbol for (name, symbol) in self._disk_entries()
+                if name == dataset and symbol not in frames and (wanted is None or symbol in wanted)
+            ]
+
+        for symbol in disk_symbols:
+            found = self._find_disk_file(dataset, symbol)
+            if found is None:
+                continue
+            try:
+                frames[symbol] = self._read_disk(found[0])
+            except Exception:
+                continue
+
+        return frames
+
+    def invalidate(self, dataset: Optional[str] = None, symbol: Optional[str] = None) -> int:
+        """
+        删除缓存数据
+
+        Args:
+            dataset: 数据集名称（为空表示所有数据集）
+            symbol: 股票代码（为空表示所有股票）
+
+        Returns:
+            删除的条目数
+        """
+        removed = set()
+        with self._lock:
+            # 其他进程写入的文件也要删除
+            if dataset is not None and symbol is not None:
+                self._observe_disk((dataset, symbol), self._disk_stat(dataset, symbol))
+            else:
+                self._sync_disk(dataset)
+            for key in list(self._negative):
+                if (dataset is None or key[0] == dataset) and (symbol is None or key[1] == symbol):
+                    del self._negative[key]
+
+            for key in list(self._memory):
+                if (dataset is None or key[0] == dataset) and (symbol is None or key[1] == symbol):
+                    self._forget(key)
+                    removed.add(key)
+
+            for key in list(self._disk_entries()):
+                if (dataset is None or key[0] == dataset) and (symbol is None or key[1] == symbol):
+                    self._delete_disk(key)
+                    removed.add(key)
+
+            for key in removed:
+                self._bump(key)
+
+        # 通知其他进程丢弃更早记录的负缓存（内存层中的数据在下次读取时发现文件已删除）
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._marker_path.touch()
+        except OSError:
+            pass
+        return len(removed)
+
+    def stats(self) -> dict:
+        """
+        获取内存层统计信息
+
+        Returns:
+            包含内存占用、条目数、淘汰次数等信息的字典
+        """
+        with self._lock:
+            return {
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "memory_entries": len(self._memory),
+                "evictions": self._evictions,
+                "evicted_bytes": self._evicted_bytes,
+                "negative_entries": len(self._negative),
+            }
+
+    def disk_bytes(self) -> int:
+        """磁盘层文件总大小（字节，重新扫描目录，包括其他进程写入的文件）"""
+        with self._lock:
+            self._sync_disk()
+            return sum(size for size, _ in self._disk_entries().values())
+
+    def dataset_stats(self) -> Dict[str, dict]:
+        """
+        按数据集统计缓存占用和命中率
+
+        Returns:
+            {数据集: 统计信息}
+        """
+        result: Dict[str, dict] = {}
+
+        def bucket(dataset: str) -> dict:
+            return result.setdefault(dataset, {
+                "memory_entries": 0,
+                "memory_bytes": 0,
+                "disk_entries": 0,
+                "disk_bytes": 0,
+            })
+
+        with self._lock:
+            for (dataset, _), entry in self._memory.items():
+                info = bucket(dataset)
+                info["memory_entries"] += 1
+                info["memory_bytes"] += entry.size
+            self._sync_disk()
+            for (dataset, _), (size, _) in self._disk_entries().items():
+                info = bucket(dataset)
+                info["disk_entries"] += 1
+                info["disk_bytes"] += size
+            for dataset in set(self._hits) | set(self._misses):
+                info = bucket(dataset)
+                hits = self._hits.get(dataset, 0)
+                misses = self._misses.get(dataset, 0)
+                info["hits"] = hits
+                info["misses"] = misses
+                info["hit_rate"] = round(hits / (hits + misses), 4) if hits + misses else None
+            for dataset, count in self._negative_hits.items():
+                bucket(dataset)["negative_hits"] = count
+
+        return result
+
+    def enforce_quota(self, max_disk_bytes: Optional[int] = None, max_age_seconds: Optional[int] = None) -> int:
+        """
+        按容量和时间限制清理磁盘层（先重新扫描目录，包括其他进程写入的文件）
+
+        先删除超过max_age_seconds的条目，再按写入时间从旧到新删除直到
+        总大小不超过max_disk_bytes。
+
+        Args:
+            max_disk_bytes: 磁盘层容量上限（字节），为空表示不限制
+            max_age_seconds: 最长保留时间（秒），为空表示不限制
+
+        Returns:
+            删除的条目数
+        """
+        removed = 0
+        with self._lock:
+            self._sync_disk()
+            index = self._disk_entries()
+            if max_age_seconds is not None:
+                cutoff = time.time() - max_age_seconds
+                for key, (_, mtime) in list(index.items()):
+                    if mtime < cutoff:
+                        self._forget(key)
+                        self._delete_disk(key)
+                        removed += 1
+
+            if max_disk_bytes is not None:
+                total = sum(size for size, _ in index.values())
+                for key, (size, _) in sorted(index.items(), key=lambda item: item[1][1]):
+                    if total <= max_disk_bytes:
+                        break
+                    self._forget(key)
+                    self._delete_disk(key)
+                    total -= size
+                    removed += 1
+
+        return removed
@@ -1,22 +1,255 @@
 """数据格式化工具"""
+import numpy as np
 import pandas as pd
 import json
-from typing import Dict, Any, List
+import textwrap
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+from .delta import PERIOD_COLUMNS, delivered_etag
+from .file_manager import FileManager
+from .indicator_groups import ID_COLUMNS, get_indicator_groups
+from .settings import BASE_PATH, MAX_RESPONSE_BYTES
+from .tracing import span, traced
 
-def format_dataframe_to_json(df: pd.DataFrame) -> str:
+
+# 估算每行JSON大小时抽样的行数
+_SAMPLE_ROWS = 20
+
+# 缩减后重新估算大小的最多次数
+_REFINE_ROUNDS = 3
+
+# 为数据以外的字段（计数、时间戳、分页信息等）预留的字节数
+_ENVELOPE_BYTES = 512
+
+
+def _json_bytes(obj: Any) -> int:
+    return len(json.dumps(obj, ensure_ascii=False, indent=2, default=str).encode("utf-8"))
+
+
+def _row_bytes(records: List[Dict[str, Any]], batch: bool = False) -> float:
+    """按均匀抽样的记录估算每条记录序列化后的字节数（batch 表示位于批量结果的 results[].data 中）"""
+    if not records:
+        return 0.0
+    index = np.unique(np.linspace(0, len(records) - 1, min(len(records), _SAMPLE_ROWS)).astype(int))
+    sample = [records[i] for i in index]
+    # 与响应中相同的缩进层级
+    wrapped = {"results": [{"data": sample}]} if batch else {"data": sample}
+    return _json_bytes(wrapped) / len(sample)
+
+
+def _frame_row_bytes(df: pd.DataFrame) -> float:
+    index = np.unique(np.linspace(0, len(df) - 1, min(len(df), _SAMPLE_ROWS)).astype(int))
+    return _row_bytes(df.iloc[index].fillna("").to_dict(orient="records"))
+
+
+def _latest_periods(periods: pd.Series, count: int) -> pd.Series:
+    """最近 count 个报告期对应的行（无法解析为日期的报告期视为最早）"""
+    dates = pd.to_datetime(periods.astype(str), errors="coerce")
+    latest = dates.dropna().drop_duplicates().nlargest(count)
+    return dates.isin(latest)
+
+
+def _spill(df: pd.DataFrame) -> Optional[str]:
+    """把完整数据写入文件（data/batch/，文件名带随机后缀，同一秒内的多个响应不会互相覆盖），返回文件路径"""
+    try:
+        file_manager = FileManager(str(BASE_PATH))
+        name = f"response_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}.csv"
+        return file_manager.save_dataframe(
+            df, file_type="response", format="csv", output_path=str(file_manager.batch_dir / name)
+        )
+    except Exception:
+        return None
+
+
+def rows_within_budget(df: pd.DataFrame, max_bytes: Optional[int] = None) -> int:
+    """
+    估算 df 的前多少行可以在响应大小上限内完整返回（分页时据此缩小当前页）
+
+    Args:
+        df: 当前页数据
+        max_bytes: 响应大小上限（字节），默认使用 AKSHARE_MCP_MAX_RESPONSE_BYTES
+
+    Returns:
+        行数（至少1行）
+    """
+    max_bytes = MAX_RESPONSE_BYTES if max_bytes is None else max_bytes
+    if max_bytes <= 0 or df is None or df.empty:
+        return 0 if df is None else len(df)
+
+    df = df.dropna(axis=1, how="all")
+    budget = max_bytes - _ENVELOPE_BYTES - _json_bytes([str(column) for column in df.columns])
+    rows = len(df)
+    for _ in range(_REFINE_ROUNDS):
+        head = df.head(rows)
+        row_bytes = _frame_row_bytes(head)
+        if row_bytes * rows <= budget:
+            break
+        rows = max(1, min(rows - 1, int(max(budget, 0) // row_bytes)))
+    return rows
+
+
+def _fit_frame(df: pd.DataFrame, max_bytes: int, paged: bool) -> Tuple[pd.DataFrame, Optional[Dict[str, Any]]]:
+    """
+    把 DataFrame 缩减到响应大小上限以内
+
+    依次：去掉全空列 → 只保留最近的报告期（没有报告期列时保留前若干行）
+    → 只保留标识列和前若干列；有数据被去掉时完整数据写入文件并返回路径。
+    分页结果不去掉行（每页条数已由分页按 rows_within_budget 缩小，
+    去掉行会使 next_cursor 跳过这些行），只会去掉列。
+    """
+    if max_bytes <= 0:
+        return df, None
+    row_bytes = _frame_row_bytes(df)
+    budget = max_bytes - _ENVELOPE_BYTES - _json_bytes([str(column) for column in df.columns])
+    if row_bytes * len(df) <= budget:
+        return df, None
+
+    original = df
+    strategies = []
+
+    non_empty = df.dropna(axis=1, how="all")
+    if len(non_empty.columns) < len(df.columns):
+        df = non_empty
+        strategies.append("drop_empty_columns")
+        row_bytes = _frame_row_bytes(df)
+        budget = max_bytes - _ENVELOPE_BYTES - _json_bytes([str(column) for column in df.columns])
+
+    period_column = next((column for column in PERIOD_COLUMNS if column in df.columns), None)
+    periods = None
+    # 保留下来的行（最近的报告期）通常比抽样的平均行更大，缩减后重新估算再收紧
+    for _ in range(0 if paged else _REFINE_ROUNDS):
+        rows_allowed = max(1, int(budget // row_bytes))
+        if len(df) <= rows_allowed:
+            break
+        if period_column is not None:
+            rows_per_period = len(df) / max(1, df[period_column].nunique())
+            periods = max(1, int(rows_allowed // rows_per_period))
+            mask = _latest_periods(df[period_column], periods)
+            df = df[mask] if mask.any() else df.head(rows_allowed)
+            strategy = "latest_periods"
+        if period_column is None or len(df) > rows_allowed:
+            df = df.head(rows_allowed)
+            strategy = "head_rows"
+        if strategy not in strategies:
+            strategies.append(strategy)
+        row_bytes = _frame_row_bytes(df)
+
+    if row_bytes * len(df) > budget:
+        # 单行仍超出上限：保留标识列和前若干列
+        ids = [column for column in df.columns if column in ID_COLUMNS]
+        others = [column for column in df.columns if column not in ID_COLUMNS]
+        keep = max(1, int(len(others) * max(budget, 0) / (row_bytes * len(df))))
+        df = df[ids + others[:keep]]
+        strategies.append("key_columns")
+
+    truncated = {
+        "reason": "response_size",
+        "max_bytes": max_bytes,
+        "strategies": strategies,
+        "original_rows": len(original),
+        "returned_rows": len(df),
+        "original_columns": len(original.columns),
+        "returned_columns": len(df.columns),
+    }
+    if periods is not None:
+        truncated["latest_periods"] = periods
+    if strategies != ["drop_empty_columns"]:
+        truncated["file_path"] = _spill(original)
+    return df, truncated
+
+
+def _fit_batch(results: List[Dict[str, Any]], max_bytes: int) -> Optional[Dict[str, Any]]:
+    """
+    把批量结果缩减到响应大小上限以内（每只股票只保留最近的报告期，就地修改）
+
+    Returns:
+        截断信息，未超出上限时返回None
+    """
+    if max_bytes <= 0:
+        return None
+    records = [record for result in results for record in (result.get("data") or [])]
+    row_bytes = _row_bytes(records, batch=True)
+    # 每只股票的结果另有股票代码、计数等字段
+    budget = max_bytes - _ENVELOPE_BYTES * 2 - 128 * len(results)
+    if row_bytes * len(records) <= budget:
+        return None
+
+    with_data = [result for result in results if result.get("data")]
+    full = pd.DataFrame([
+        {**record, "股票代码": result.get("symbol")} for result in with_data for record in result["data"]
+    ])
+
+    per_symbol = None
+    for _ in range(_REFINE_ROUNDS):
+        allowed = max(1, int(max(budget, 0) // row_bytes) // max(1, len(with_data)))
+        if per_symbol is not None and allowed >= per_symbol:
+            break
+        per_symbol = allowed
+        for result in with_data:
+            data = result["data"]
+            if len(data) <= per_symbol:
+                continue
+            period_column = next((column for column in PERIOD_COLUMNS if column in data[0]), None)
+            if period_column is not None:
+                mask = _latest_periods(pd.Series([record.get(period_column) for record in data]), per_symbol)
+                kept = [record for record, keep in zip(data, mask) if keep] or data[:per_symbol]
+            else:
+                kept = data[:per_symbol]
+            result["data"] = kept[:per_symbol]
+            result["count"] = len(result["data"])
+        row_bytes = _row_bytes([record for result in with_data for record in result["data"]], batch=True)
+
+    return {
+        "reason": "response_size",
+        "max_bytes": max_bytes,
+        "strategies": ["latest_periods"],
+        "latest_periods": per_symbol,
+        "original_rows": len(records),
+        "returned_rows": sum(len(result["data"]) for result in with_data),
+        "file_path": _spill(full),
+    }
+
+
+@traced("serialize")
+def format_dataframe_to_json(
+    df: pd.DataFrame,
+    page: Optional[Dict[str, Any]] = None,
+    delta: Optional[Dict[str, Any]] = None,
+    max_bytes: Optional[int] = None
+) -> str:
     """
     将DataFrame转换为JSON字符串
     
+    序列化前按抽样估算大小，超出上限时缩减数据（见 _fit_frame），
+    响应中的 truncated 说明缩减方式和完整数据文件路径。
+    
     Args:
         df: pandas DataFrame
+        page: 分页信息（total/offset/page_size/next_cursor），为空时不输出
+        delta: 增量信息（etag等），为空时不输出
+        max_bytes: 响应大小上限（字节），默认使用 AKSHARE_MCP_MAX_RESPONSE_BYTES
     
     Returns:
         格式化的JSON字符串
     """
     if df is None or df.empty:
-        return json.dumps({"data": [], "message": "无数据"}, ensure_ascii=False, indent=2)
+        result = {"data": [], "message": "无数据"}
+        if delta is not None:
+            result["message"] = "数据未变化" if delta.get("not_modified") else "无新增或修订数据"
+            result["delta"] = delta
+        return json.dumps(result, ensure_ascii=False, indent=2)
+    
+    with span("response_budget"):
+        original = df
+        df, truncated = _fit_frame(
+            df, MAX_RESPONSE_BYTES if max_bytes is None else max_bytes, paged=page is not None
+        )
+        if delta is not None and truncated is not None and "file_path" in truncated:
+            # 客户端只收到部分数据，ETag 按实际返回的数据计算，下次增量查询时补发其余报告期
+            delivered = df if "key_columns" in truncated["strategies"] else original.loc[df.index]
+            delta = {**delta, "etag": delivered_etag(delivered, delta), "partial": True}
     
     # 处理NaN值
     df = df.fillna("")
@@ -30,10 +263,17 @@ def format_dataframe_to_json(df: pd.DataFrame) -> str:
         "columns": list(df.columns),
         "timestamp": datetime.now().isoformat()
     }
+    if page is not None:
+        result["pagination"] = page
+    if delta is not None:
+        result["delta"] = delta
+    if truncated is not None:
+        result["truncated"] = truncated
     
-    return json.dumps(result, ensure_ascii=False, indent=2)
+    return json.dumps(result, ensure_ascii=False, indent=2, default=str)
 
 
+@traced("serialize")
 def format_dict_to_json(data: Dict[str, Any]) -> str:
     """
     将字典转换为JSON字符串
@@ -44,19 +284,25 @@ def format_dict_to_json(data: Dict[str, Any]) -> str:
     Returns:
         格式化的JSON字符串
     """
-    return json.dumps(data, ensure_ascii=False, indent=2)
+    return json.dumps(data, ensure_ascii=False, indent=2, default=str)
 
 
-def format_batch_results(results: List[Dict[str, Any]]) -> str:
+@traced("serialize")
+def format_batch_results(results: List[Dict[str, Any]], max_bytes: Optional[int] = None) -> str:
     """
-    格式化批量查询结果
+    格式化批量查询结果（超出响应大小上限时每只股票只保留最近的报告期）
     
     Args:
         results: 查询结果列表
+        max_bytes: 响应大小上限（字节），默认使用 AKSHARE_MCP_MAX_RESPONSE_BYTES
     
     Returns:
         格式化的JSON字符串
     """
+    results = [dict(result) for result in results]
+    with span("response_budget"):
+        truncated = _fit_batch(results, MAX_RESPONSE_BYTES if max_bytes is None else max_bytes)
+    
     success_count = sum(1 for r in results if 'error' not in r)
     failed_count = len(results) - success_count
     
@@ -67,8 +313,42 @@ def format_batch_results(results: List[Dict[str, Any]]) -> str:
         "results": results,
         "timestamp": datetime.now().isoformat()
     }
+    if truncated is not None:
+        formatted["truncated"] = truncated
+    
+    return json.dumps(formatted, ensure_ascii=False, indent=2, default=str)
+
+
+@traced("serialize")
+def format_batch_fragments(fragments: List[str], success_count: int) -> str:
+    """
+    用已序列化的单个结果拼接批量查询结果（结构与format_batch_results相同）
+    
+    Args:
+        fragments: 每个股票的结果JSON文本
+        success_count: 成功数量
+    
+    Returns:
+        格式化的JSON字符串
+    """
+    # 超出响应大小上限时才解析各结果并缩减
+    if MAX_RESPONSE_BYTES > 0 and sum(len(f.encode("utf-8")) for f in fragments) > MAX_RESPONSE_BYTES:
+        return format_batch_results([json.loads(f) for f in fragments])
+    
+    formatted = {
+        "total": len(fragments),
+        "success": success_count,
+        "failed": len(fragments) - success_count,
+        "results": "__RESULTS__",
+        "timestamp": datetime.now().isoformat()
+    }
     
-    return json.dumps(formatted, ensure_ascii=False, indent=2)
+    results = "[\n" + ",\n".join(textwrap.indent(f, "    ") for f in fragments) + "\n  ]" if fragments else "[]"
+    return json.dumps(formatted, ensure_ascii=False, indent=2).replace('"__RESULTS__"', results, 1)
+
+
+class ErrorResponse(str):
+    """format_error 返回的错误响应文本（str 子类，调用方据此判断是否出错，不需要解析文本）"""
 
 
 def format_error(error_message: str, symbol: str = None) -> str:
@@ -80,7 +360,7 @@ def format_error(error_message: str, symbol: str = None) -> str:
         symbol: 股票代码（可选）
     
     Returns:
-        格式化的错误JSON字符串
+        格式化的错误JSON字符串（ErrorResponse）
     """
     error_data = {
         "error": True,
@@ -91,9 +371,10 @@ def format_error(error_message: str, symbol: str = None) -> str:
     if symbol:
         error_data["symbol"] = symbol
     
-    return json.dumps(error_data, ensure_ascii=False, indent=2)
+    return ErrorResponse(json.dumps(error_data, ensure_ascii=False, indent=2))
 
 
+@traced("simplify")
 def simplify_financial_data(df: pd.DataFrame, indicator_type: str = "all") -> pd.DataFrame:
     """
     根据指标类型简化财务数据
@@ -108,22 +389,8 @@ def simplify_financial_data(df: pd.DataFrame, indicator_type: str = "all") -> pd
     if df is None or df.empty:
         return df
     
-    # 根据不同类型选择关键列
-    key_columns = {
-        "basic": ["股票代码", "股票名称", "市盈率", "市净率", "市销率", "总市值"],
-        "profit": ["股票代码", "股票名称", "净利润", "净利润同比", "营业收入", "营业收入同比", "毛利率", "净利率"],
-        "growth": ["股票代码", "股票名称", "营业收入同比", "净利润同比", "营业收入环比", "净利润环比"],
-        "debt": ["股票代码", "股票名称", "资产负债率", "流动比率", "速动比率"],
-        "operation": ["股票代码", "股票名称", "总资产周转率", "存货周转率", "应收账款周转率"]
-    }
-    
-    if indicator_type != "all" and indicator_type in key_columns:
-        # 选择存在的列
-        available_columns = [col for col in key_columns[indicator_type] if col in df.columns]
-        if available_columns:
-            return df[available_columns]
-    
-    return df
+    # 列分组按列结构预先解析并缓存，这里只是一次查表
+    return get_indicator_groups().select(df, indicator_type)
 
 
 def format_file_info(file_path: str, record_count: int, file_size: int = None) -> str:
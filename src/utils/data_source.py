@@ -0,0 +1,103 @@
+"""上游数据源访问（统一经过缓存）"""
+import threading
+from typing import Optional
+
+import akshare as ak
+import pandas as pd
+
+from .data_bundle import get_offline_bundle
+from .data_cache import NEGATIVE_EMPTY, NEGATIVE_ERROR, NEGATIVE_TRANSIENT, DataCache
+from .settings import (
+    BASE_PATH,
+    CACHE_TTL_SECONDS,
+    CACHE_MAX_MEMORY_BYTES,
+    ERROR_TTL_SECONDS,
+    NEGATIVE_TTL_SECONDS,
+    TRANSIENT_ERROR_TTL_SECONDS
+)
+from .tracing import span
+from .upstream_scheduler import current_workload, get_upstream_scheduler
+
+
+# 数据集名称 -> AKShare 接口名称
+DATASETS = {
+    "indicators": "stock_financial_analysis_indicator",
+    "balance_sheet": "stock_balance_sheet_by_report_em",
+    "income": "stock_profit_sheet_by_report_em",
+    "cash_flow": "stock_cash_flow_sheet_by_report_em",
+    "profile": "stock_individual_info_em",
+}
+
+_data_cache: Optional[DataCache] = None
+_data_cache_lock = threading.Lock()
+
+
+def get_data_cache() -> DataCache:
+    """获取进程内共享的数据缓存"""
+    global _data_cache
+    if _data_cache is None:
+        with _data_cache_lock:
+            if _data_cache is None:
+                _data_cache = DataCache(
+                    cache_dir=str(BASE_PATH / "data" / "cache"),
+                    ttl_seconds=CACHE_TTL_SECONDS,
+                    max_memory_bytes=CACHE_MAX_MEMORY_BYTES,
+                    negative_ttls={
+                        NEGATIVE_EMPTY: NEGATIVE_TTL_SECONDS,
+                        NEGATIVE_ERROR: ERROR_TTL_SECONDS,
+                        NEGATIVE_TRANSIENT: TRANSIENT_ERROR_TTL_SECONDS,
+                    }
+                )
+    return _data_cache
+
+
+def call_upstream(name: str, **kwargs) -> pd.DataFrame:
+    """
+    调用 AKShare 接口（离线模式下改为读取离线数据包）
+
+    在线模式下经过上游请求调度：名额不足时排队，交互查询优先于批量请求。
+
+    Args:
+        name: AKShare 接口名称
+        **kwargs: 接口参数
+
+    Returns:
+        接口结果
+    """
+    bundle = get_offline_bundle()
+    scheduler = None if bundle is not None else get_upstream_scheduler()
+    workload = current_workload()
+    with span(
+        "upstream_fetch", endpoint=name, symbol=kwargs.get("symbol"), offline=bundle is not None, workload=workload
+    ) as fetch:
+        if bundle is not None:
+            df = bundle.call(name, **kwargs)
+        elif scheduler is None:
+            df = getattr(ak, name)(**kwargs)
+        else:
+            with scheduler.slot(workload) as waited:
+                fetch.set(queued_ms=round(waited * 1000, 3))
+                df = getattr(ak, name)(**kwargs)
+        fetch.set(rows=0 if df is None else len(df))
+    return df
+
+
+def fetch_dataset(dataset: str, symbol: str) -> pd.DataFrame:
+    """
+    获取单个股票的数据集（优先读取缓存）
+
+    Args:
+        dataset: 数据集名称（见 DATASETS）
+        symbol: 股票代码
+
+    Returns:
+        DataFrame（可能为None或空）
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"未知数据集: {dataset}")
+
+    return get_data_cache().get_or_fetch(
+        dataset,
+        symbol,
+        lambda: call_upstream(DATASETS[dataset], symbol=symbol)
+    )
@@ -0,0 +1,112 @@
+"""增量响应（ETag，只返回自上次获取以来新增或修订的报告期）"""
+import hashlib
+import re
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .data_cache import key_digest
+from .data_source import get_data_cache
+
+
+# 每个ETag对应的各报告期行哈希快照在 DataCache 中的数据集名称
+ETAGS_DATASET = "etags"
+
+# 用于识别报告期的列（按顺序取第一个存在的列，都不存在时按行号）
+PERIOD_COLUMNS = ("日期", "报告期", "REPORT_DATE")
+
+_ETAG_PATTERN = re.compile(r"^[0-9a-f]{24}$")
+
+
+def _snapshot(df: pd.DataFrame) -> pd.DataFrame:
+    """计算每个报告期的行哈希"""
+    period_column = next((column for column in PERIOD_COLUMNS if column in df.columns), None)
+    periods = df[period_column].astype(str) if period_column else pd.Series(range(len(df))).astype(str)
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return pd.DataFrame({"period": periods.to_numpy(), "hash": hashes.to_numpy()})
+
+
+def _etag(key_digest: str, snapshot: pd.DataFrame) -> str:
+    """ETag = 查询标识摘要 + 内容摘要（其他查询的ETag不会被误用）"""
+    digest = hashlib.sha1(snapshot["period"].str.cat(sep="\x00").encode("utf-8"))
+    digest.update(snapshot["hash"].to_numpy().tobytes())
+    return key_digest + digest.hexdigest()[:16]
+
+
+def diff_since(
+    key: str,
+    df: pd.DataFrame,
+    if_changed_since: Optional[str] = None
+) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+    """
+    与客户端上次获取的版本比较
+
+    Args:
+        key: 查询标识（工具名称和查询参数）
+        df: 当前完整结果
+        if_changed_since: 客户端上次收到的 etag
+
+    Returns:
+        (需要返回的数据, 增量信息)；数据未变化时数据为None，
+        etag未知或已过期时返回完整数据
+    """
+    cache = get_data_cache()
+    snapshot = _snapshot(df)
+    etag = _etag(key_digest(key), snapshot)
+    if cache.get(ETAGS_DATASET, etag) is None:
+        cache.put(ETAGS_DATASET, etag, snapshot)
+
+    if not if_changed_since:
+        return df, {"etag": etag}
+
+    if if_changed_since == etag:
+        return None, {"etag": etag, "not_modified": True}
+
+    previous = None
+    if _ETAG_PATTERN.match(if_changed_since) and if_changed_since[:8] == etag[:8]:
+        previous = cache.get(ETAGS_DATASET, if_changed_since)
+    if previous is None:
+        return df, {"etag": etag, "since": if_changed_since, "full": True}
+
+    previous_hashes = previous.drop_duplicates("period").set_index("period")["hash"]
+    changed = (snapshot["period"].map(previous_hashes) != snapshot["hash"]).to_numpy()
+    removed = sorted(set(previous["period"]) - set(snapshot["period"]))
+
+    return df[changed], {
+        "etag": etag,
+        "since": if_changed_since,
+        "full": False,
+        "changed": int(changed.sum()),
+        "removed": removed
+    }
+
+
+def delivered_etag(delivered: pd.DataFrame, delta: Dict[str, Any]) -> str:
+    """
+    响应因大小上限被截断时，按客户端实际收到的数据重新计算ETag
+
+    客户端持有的版本 = 上次的版本（增量响应时）中本次没有返回、也没有被删除的
+    报告期 + 本次返回的数据。之后用这个ETag查询时，没有返回的报告期（以及只
+    返回了部分列的报告期）都会作为新增或修订的数据返回。
+
+    Args:
+        delivered: 实际返回的数据（完整列的原始行，只返回了部分列时为缩减后的行）
+        delta: diff_since 返回的增量信息
+
+    Returns:
+        新的ETag
+    """
+    cache = get_data_cache()
+    snapshot = _snapshot(delivered)
+    if delta.get("full") is False:
+        previous = cache.get(ETAGS_DATASET, delta["since"])
+        if previous is not None:
+            replaced = set(snapshot["period"]) | set(delta.get("removed") or [])
+            snapshot = pd.concat(
+                [previous[~previous["period"].isin(replaced)], snapshot], ignore_index=True
+            )
+
+    etag = _etag(delta["etag"][:8], snapshot)
+    if cache.get(ETAGS_DATASET, etag) is None:
+        cache.put(ETAGS_DATASET, etag, snapshot)
+    return etag
@@ -0,0 +1,202 @@
+"""派生财务指标（TTM、同比/环比、利润率）"""
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_cache import DataCache
+from .data_source import get_data_cache
+
+
+# 利润表（东方财富按报告期）原始列 -> 中文名称
+# 利润表数值为年初至报告期末的累计值
+SOURCE_COLUMNS = {
+    "营业总收入": "TOTAL_OPERATE_INCOME",
+    "营业收入": "OPERATE_INCOME",
+    "营业成本": "OPERATE_COST",
+    "营业利润": "OPERATE_PROFIT",
+    "净利润": "NETPROFIT",
+    "归母净利润": "PARENT_NETPROFIT",
+}
+
+# 需要计算增长率的指标
+GROWTH_METRICS = ["营业总收入", "归母净利润", "净利润"]
+
+OUTPUT_COLUMNS = ["股票代码", "报告期"] + [
+    column
+    for name in GROWTH_METRICS
+    for column in [name, f"{name}(单季)", f"{name}TTM", f"{name}同比(%)", f"{name}单季环比(%)"]
+] + ["毛利率(%)", "毛利率TTM(%)", "营业利润率(%)", "净利率(%)", "净利率TTM(%)"]
+
+# 派生数据在缓存中的数据集名称（按股票代码保存）
+DERIVED_DATASET = "derived"
+
+
+def _lookup(data: pd.DataFrame, period_index: pd.Series, columns: list) -> pd.DataFrame:
+    """按 (股票代码, 期序) 查找其他报告期的数据，缺失时为NaN"""
+    keyed = data.set_index(["股票代码", "_期序"])[columns]
+    target = pd.MultiIndex.from_arrays([data["股票代码"], period_index])
+    return keyed.reindex(target).set_axis(data.index)
+
+
+def _growth(current: pd.Series, previous: pd.Series) -> pd.Series:
+    """增长率（%），基数为0时为NaN"""
+    growth = (current - previous) / previous.abs() * 100
+    return growth.replace([np.inf, -np.inf], np.nan)
+
+
+def _ratio(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    """比率（%），分母为0时为NaN"""
+    ratio = numerator / denominator * 100
+    return ratio.replace([np.inf, -np.inf], np.nan)
+
+
+def compute_derived_metrics(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    基于多只股票的利润表计算派生指标（按股票分组向量化计算）
+
+    Args:
+        frames: {股票代码: 利润表DataFrame}
+
+    Returns:
+        派生指标DataFrame，每行对应一只股票的一个报告期
+    """
+    parts = []
+    for symbol, df in frames.items():
+        if df is None or df.empty or "REPORT_DATE" not in df.columns:
+            continue
+        part = df.reindex(columns=["REPORT_DATE"] + list(SOURCE_COLUMNS.values()))
+        part.insert(0, "股票代码", symbol)
+        parts.append(part)
+
+    if not parts:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    data = pd.concat(parts, ignore_index=True)
+    data = data.rename(columns={value: key for key, value in SOURCE_COLUMNS.items()})
+    data["报告期"] = pd.to_datetime(data["REPORT_DATE"], errors="coerce")
+    data = data[data["报告期"].dt.month.isin([3, 6, 9, 12])]
+    data = data.drop_duplicates(["股票代码", "报告期"]).sort_values(
+        ["股票代码", "报告期"], ignore_index=True
+    )
+
+    metrics = list(SOURCE_COLUMNS)
+    for name in metrics:
+        data[name] = pd.to_numeric(data[name], errors="coerce")
+
+    quarter = data["报告期"].dt.month // 3
+    data["_期序"] = data["报告期"].dt.year * 4 + quarter - 1
+
+    previous_quarter = _lookup(data, data["_期序"] - 1, metrics)
+    same_quarter_last_year = _lookup(data, data["_期序"] - 4, metrics)
+    last_annual = _lookup(data, data["报告期"].dt.year * 4 - 1, metrics)
+
+    is_first_quarter = quarter.eq(1)
+    is_annual = quarter.eq(4)
+    for name in metrics:
+        # 单季值：一季度即累计值，其余为本期累计减上期累计
+        data[f"{name}(单季)"] = data[name].where(is_first_quarter, data[name] - previous_quarter[name])
+        # TTM：本期累计 + 上年年报 - 上年同期累计；年报即为TTM
+        data[f"{name}TTM"] = data[name].where(
+            is_annual,
+            data[name] + last_annual[name] - same_quarter_last_year[name]
+        )
+
+    previous_single = _lookup(data, data["_期序"] - 1, [f"{name}(单季)" for name in GROWTH_METRICS])
+    for name in GROWTH_METRICS:
+        data[f"{name}同比(%)"] = _growth(data[name], same_quarter_last_year[name])
+        data[f"{name}单季环比(%)"] = _growth(data[f"{name}(单季)"], previous_single[f"{name}(单季)"])
+
+    data["毛利率(%)"] = _ratio(data["营业收入"] - data["营业成本"], data["营业收入"])
+    data["毛利率TTM(%)"] = _ratio(data["营业收入TTM"] - data["营业成本TTM"], data["营业收入TTM"])
+    data["营业利润率(%)"] = _ratio(data["营业利润"], data["营业总收入"])
+    data["净利率(%)"] = _ratio(data["净利润"], data["营业总收入"])
+    data["净利率TTM(%)"] = _ratio(data["净利润TTM"], data["营业总收入TTM"])
+
+    data["报告期"] = data["报告期"].dt.strftime("%Y-%m-%d")
+    result = data[OUTPUT_COLUMNS].copy()
+    ratio_columns = [column for column in OUTPUT_COLUMNS if column.endswith("(%)")]
+    result[ratio_columns] = result[ratio_columns].round(4)
+    return result
+
+
+class DerivedMetricsStore:
+    """
+    派生指标表
+
+    利润表缓存版本变化后，下一次查询时只对版本号变化的股票重新计算
+    （各股票的派生指标互不依赖），结果按股票写回缓存并建立索引，
+    单只股票查询为字典查找。
+    """
+
+    def __init__(self, cache: DataCache, source_dataset: str = "income"):
+        """
+        初始化派生指标表
+
+        Args:
+            cache: 数据缓存
+            source_dataset: 利润表数据集名称
+        """
+        self.cache = cache
+        self.source_dataset = source_dataset
+        self._version: Optional[int] = None
+        # 股票代码 -> 计算时利润表的版本号
+        self._generations: Dict[str, int] = {}
+        self._by_symbol: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False):
+        """利润表缓存有更新时重新计算有变化的股票"""
+        with self._lock:
+            version = self.cache.version(self.source_dataset)
+            if not force and self._version == version:
+                return
+
+            current = self.cache.generations(self.source_dataset)
+            changed = [
+                symbol for symbol, generation in current.items()
+                if force or self._generations.get(symbol) != generation
+            ]
+            for symbol in set(self._generations) - set(current):
+                self._by_symbol.pop(symbol, None)
+
+            table = compute_derived_metrics(self.cache.items(self.source_dataset, changed))
+            groups = dict(tuple(table.groupby("股票代码", sort=False)))
+            for symbol in changed:
+                group = groups.get(symbol)
+                if group is None:
+                    self._by_symbol.pop(symbol, None)
+                    continue
+                self._by_symbol[symbol] = group.iloc[::-1].reset_index(drop=True)
+                self.cache.put(DERIVED_DATASET, symbol, group.reset_index(drop=True))
+
+            self._generations = current
+            self._version = version
+
+    def lookup(self, symbol: str) -> Optional[pd.DataFrame]:
+        """
+        查询单只股票的派生指标（按报告期倒序）
+
+        Args:
+            symbol: 股票代码
+
+        Returns:
+            派生指标DataFrame，无数据时返回None
+        """
+        self.refresh()
+        return self._by_symbol.get(symbol)
+
+
+_store: Optional[DerivedMetricsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_derived_metrics_store() -> DerivedMetricsStore:
+    """获取进程内共享的派生指标表"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DerivedMetricsStore(get_data_cache())
+    return _store
@@ -0,0 +1,149 @@
+"""文件目录索引（SQLite）"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_directory_mtime ON files (directory, mtime);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# 每个数据库文件只需初始化一次
+_initialized: Dict[str, bool] = {}
+_initialized_lock = threading.Lock()
+
+
+class FileCatalog:
+    """
+    记录 FileManager 写出的文件（路径、所属目录、大小、修改时间）
+
+    列表、容量统计和过期清理均通过 (directory, mtime) 索引查询完成，
+    不再遍历目录和逐个 stat。首次创建时扫描一次已有文件作为初始数据。
+    """
+
+    def __init__(self, db_path: str, directories: Dict[str, Path]):
+        """
+        初始化文件目录索引
+
+        Args:
+            db_path: SQLite数据库路径
+            directories: {目录类型: 目录路径}，用于初始扫描和归类
+        """
+        self.db_path = Path(db_path)
+        self.directories = directories
+        self._initialize()
+
+    @contextmanager
+    def _connect(self):
+        """打开连接，退出时提交并关闭"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _initialize(self):
+        key = str(self.db_path)
+        if _initialized.get(key):
+            return
+
+        with _initialized_lock:
+            if _initialized.get(key):
+                return
+
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                scanned = conn.execute("SELECT value FROM meta WHERE key = 'scanned'").fetchone()
+                if scanned is None:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO files (path, directory, name, size, mtime) VALUES (?, ?, ?, ?, ?)",
+                        self._scan()
+                    )
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('scanned', ?)", (str(time.time()),))
+            _initialized[key] = True
+
+    def _scan(self) -> List[Tuple[str, str, str, int, float]]:
+        """扫描已有文件（仅在索引首次创建时执行）"""
+        rows = []
+        for directory, dir_path in self.directories.items():
+            if not dir_path.exists():
+                continue
+            for file_path in dir_path.iterdir():
+                if file_path.is_file():
+                    stat = file_path.stat()
+                    rows.append((str(file_path), directory, file_path.name, stat.st_size, stat.st_mtime))
+        return rows
+
+    def classify(self, file_path: Path) -> str:
+        """根据文件所在目录确定目录类型，不在受管目录下的文件归为 external"""
+        parent = file_path.resolve().parent
+        for directory, dir_path in self.directories.items():
+            if parent == dir_path.resolve():
+                return directory
+        return "external"
+
+    def record(self, file_path: str):
+        """
+        记录（或更新）一个已写入的文件
+
+        Args:
+            file_path: 文件路径
+        """
+        path = Path(file_path)
+        stat = path.stat()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO files (path, directory, name, size, mtime) VALUES (?, ?, ?, ?, ?)",
+                (str(path), self.classify(path), path.name, stat.st_size, stat.st_mtime)
+            )
+
+    def total_size(self, directories: List[str]) -> int:
+        """统计若干目录类型的文件总大小（字节）"""
+        placeholders = ",".join("?" for _ in directories)
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM files WHERE directory IN ({placeholders})",
+                directories
+            ).fetchone()
+        return int(row[0])
+
+    def latest(self, directory: str, limit: int) -> List[Tuple[str, str, int, float]]:
+        """按修改时间倒序列出文件 (path, name, size, mtime)"""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT path, name, size, mtime FROM files WHERE directory = ? ORDER BY mtime DESC LIMIT ?",
+                (directory, limit)
+            ).fetchall()
+
+    def older_than(self, directory: str, cutoff: float) -> List[str]:
+        """列出修改时间早于cutoff的文件路径"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT path FROM files WHERE directory = ? AND mtime < ?",
+                (directory, cutoff)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def remove(self, paths: List[str]):
+        """从索引中删除文件记录"""
+        if not paths:
+            return
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in paths])
@@ -1,10 +1,18 @@
 """文件管理工具"""
+import asyncio
+import io
 import os
+import uuid
 import pandas as pd
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Optional
 import json
+import aiofiles
+import aiofiles.os
+from .arrow_io import TableLike, is_arrow_table, to_dataframe, write_csv
+from .file_catalog import FileCatalog
+from .tracing import span, traced
 
 
 class FileManager:
@@ -25,6 +33,16 @@ class FileManager:
         
         # 确保目录存在
         self.setup_directories()
+        
+        # 文件索引（列表、容量统计和过期清理不再遍历目录）
+        self.catalog = FileCatalog(
+            str(self.base_path / "data" / "catalog.sqlite3"),
+            {
+                "exports": self.exports_dir,
+                "cache": self.cache_dir,
+                "batch": self.batch_dir
+            }
+        )
     
     def setup_directories(self):
         """创建必要的目录"""
@@ -64,9 +82,80 @@ class FileManager:
         
         return filename
     
+    def _dataframe_path(
+        self,
+        file_type: str,
+        symbols: Optional[List[str]],
+        format: str,
+        output_path: Optional[str]
+    ) -> Path:
+        """确定DataFrame的保存路径（并创建父目录）"""
+        if output_path:
+            file_path = Path(output_path)
+        else:
+            if file_type == "export":
+                save_dir = self.exports_dir
+            elif file_type in ("batch", "response"):
+                save_dir = self.batch_dir
+            else:
+                save_dir = self.cache_dir
+            
+            filename = self.generate_filename(file_type, symbols, format)
+            file_path = save_dir / filename
+        
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        return file_path
+    
+    def _json_path(self, file_type: str, symbols: Optional[List[str]], output_path: Optional[str]) -> Path:
+        """确定JSON数据的保存路径（并创建父目录）"""
+        if output_path:
+            file_path = Path(output_path)
+        else:
+            save_dir = self.cache_dir if file_type == "cache" else self.exports_dir
+            filename = self.generate_filename(file_type, symbols, "json")
+            file_path = save_dir / filename
+        
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        return file_path
+    
+    @staticmethod
+    def _serialize_dataframe(df: TableLike, format: str) -> bytes:
+        """将数据序列化为文件内容（格式与 save_dataframe 写出的文件一致）"""
+        buffer = io.BytesIO()
+        if is_arrow_table(df):
+            if format == "csv":
+                write_csv(df, buffer)
+                return buffer.getvalue()
+            df = to_dataframe(df)
+        
+        if format == "csv":
+            return df.to_csv(index=False).encode("utf-8-sig")
+        elif format == "excel":
+            df.to_excel(buffer, index=False, engine='openpyxl')
+            return buffer.getvalue()
+        elif format == "json":
+            return df.to_json(orient='records', force_ascii=False, indent=2).encode("utf-8")
+        else:
+            raise ValueError(f"不支持的文件格式: {format}")
+    
+    async def _write_atomic(self, file_path: Path, content: bytes):
+        """非阻塞写入临时文件后重命名，读取方不会看到写了一半的文件"""
+        tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(content)
+            await aiofiles.os.replace(tmp_path, file_path)
+        except BaseException:
+            try:
+                await aiofiles.os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    @traced("file_write")
     def save_dataframe(
         self,
-        df: pd.DataFrame,
+        df: TableLike,
         file_type: str,
         symbols: List[str] = None,
         format: str = "csv",
@@ -76,7 +165,7 @@ class FileManager:
         保存DataFrame到文件
         
         Args:
-            df: 数据
+            df: 数据（DataFrame，或多进程批量查询返回的Arrow表）
             file_type: 文件类型
             symbols: 股票代码列表
             format: 文件格式
@@ -85,28 +174,21 @@ class FileManager:
         Returns:
             文件路径
         """
-        if df is None or df.empty:
+        if df is None or len(df) == 0:
             raise ValueError("数据为空，无法保存")
         
-        # 确定保存目录
-        if output_path:
-            file_path = Path(output_path)
-        else:
-            if file_type == "export":
-                save_dir = self.exports_dir
-            elif file_type == "batch":
-                save_dir = self.batch_dir
-            else:
-                save_dir = self.cache_dir
-            
-            filename = self.generate_filename(file_type, symbols, format)
-            file_path = save_dir / filename
-        
-        # 确保父目录存在
-        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path = self._dataframe_path(file_type, symbols, format, output_path)
         
         # 保存文件
         try:
+            if is_arrow_table(df):
+                # Arrow表直接写CSV；其他格式才转换为DataFrame
+                if format == "csv":
+                    write_csv(df, file_path)
+                    self.catalog.record(str(file_path))
+                    return str(file_path)
+                df = to_dataframe(df)
+            
             if format == "csv":
                 df.to_csv(file_path, index=False, encoding='utf-8-sig')
             elif format == "excel":
@@ -116,10 +198,50 @@ class FileManager:
             else:
                 raise ValueError(f"不支持的文件格式: {format}")
             
+            self.catalog.record(str(file_path))
+            return str(file_path)
+        except Exception as e:
+            raise Exception(f"保存文件失败: {str(e)}")
+    
+    async def save_dataframe_async(
+        self,
+        df: TableLike,
+        file_type: str,
+        symbols: List[str] = None,
+        format: str = "csv",
+        output_path: str = None
+    ) -> str:
+        """
+        保存DataFrame到文件（异步版本，供事件循环中调用）
+        
+        序列化在线程池中完成，文件通过 aiofiles 写入临时文件后原子重命名，
+        大文件导出不会阻塞其他请求。
+        
+        Args:
+            df: 数据（DataFrame，或多进程批量查询返回的Arrow表）
+            file_type: 文件类型
+            symbols: 股票代码列表
+            format: 文件格式
+            output_path: 自定义输出路径
+        
+        Returns:
+            文件路径
+        """
+        if df is None or len(df) == 0:
+            raise ValueError("数据为空，无法保存")
+        
+        loop = asyncio.get_running_loop()
+        try:
+            with span("file_write", format=format, rows=len(df)):
+                file_path = self._dataframe_path(file_type, symbols, format, output_path)
+                content = await loop.run_in_executor(None, self._serialize_dataframe, df, format)
+                await self._write_atomic(file_path, content)
+                await loop.run_in_executor(None, self.catalog.record, str(file_path))
             return str(file_path)
         except Exception as e:
             raise Exception(f"保存文件失败: {str(e)}")
     
+    @traced("file_write")
     def save_json(self, data: dict, file_type: str, symbols: List[str] = None, output_path: str = None) -> str:
         """
         保存JSON数据到文件
@@ -133,18 +255,45 @@ class FileManager:
         Returns:
             文件路径
         """
-        if output_path:
-            file_path = Path(output_path)
-        else:
-            save_dir = self.cache_dir if file_type == "cache" else self.exports_dir
-            filename = self.generate_filename(file_type, symbols, "json")
-            file_path = save_dir / filename
-        
-        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path = self._json_path(file_type, symbols, output_path)
         
         try:
             with open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            self.catalog.record(str(file_path))
+            return str(file_path)
+        except Exception as e:
+            raise Exception(f"保存JSON文件失败: {str(e)}")
+    
+    async def save_json_async(
+        self,
+        data: dict,
+        file_type: str,
+        symbols: List[str] = None,
+        output_path: str = None
+    ) -> str:
+        """
+        保存JSON数据到文件（异步版本，序列化在线程池中完成，写入临时文件后原子重命名）
+        
+        Args:
+            data: 字典数据
+            file_type: 文件类型
+            symbols: 股票代码列表
+            output_path: 自定义输出路径
+        
+        Returns:
+            文件路径
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            with span("file_write", format="json"):
+                file_path = self._json_path(file_type, symbols, output_path)
+                content = await loop.run_in_executor(
+                    None,
+                    lambda: json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+                )
+                await self._write_atomic(file_path, content)
+                await loop.run_in_executor(None, self.catalog.record, str(file_path))
             return str(file_path)
         except Exception as e:
             raise Exception(f"保存JSON文件失败: {str(e)}")
@@ -155,28 +304,20 @@ class FileManager:
         
         Args:
             max_age_days: 最大保留天数
-            directory: 目录类型（cache, batch）
+            directory: 目录类型（cache, batch, exports）
         """
-        if directory == "cache":
-            target_dir = self.cache_dir
-        elif directory == "batch":
-            target_dir = self.batch_dir
-        else:
-            return
-        
-        if not target_dir.exists():
+        if directory not in ("cache", "batch", "exports"):
             return
         
         cutoff_time = datetime.now() - timedelta(days=max_age_days)
         deleted_count = 0
         
         try:
-            for file_path in target_dir.iterdir():
-                if file_path.is_file():
-                    file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                    if file_mtime < cutoff_time:
-                        file_path.unlink()
-                        deleted_count += 1
+            expired = self.catalog.older_than(directory, cutoff_time.timestamp())
+            for file_path in expired:
+                Path(file_path).unlink(missing_ok=True)
+                deleted_count += 1
+            self.catalog.remove(expired)
             
             return deleted_count
         except Exception as e:
@@ -185,7 +326,10 @@ class FileManager:
     
     def get_directory_size(self, directory: str = "all") -> int:
         """
-        获取目录大小（字节）
+        获取目录大小（字节），按文件索引统计
+        
+        文件索引只记录 FileManager 写出的文件，cache 目录下按数据集划分的
+        子目录（数据缓存的磁盘层）另外按数据缓存的磁盘层索引统计。
         
         Args:
             directory: 目录类型（cache, batch, exports, all）
@@ -194,28 +338,37 @@ class FileManager:
             目录大小（字节）
         """
         if directory == "all":
-            dirs = [self.cache_dir, self.batch_dir, self.exports_dir]
-        elif directory == "cache":
-            dirs = [self.cache_dir]
-        elif directory == "batch":
-            dirs = [self.batch_dir]
-        elif directory == "exports":
-            dirs = [self.exports_dir]
+            dirs = ["cache", "batch", "exports"]
+        elif directory in ("cache", "batch", "exports"):
+            dirs = [directory]
         else:
             return 0
         
+        total_size = self.catalog.total_size(dirs)
+        if "cache" in dirs:
+            total_size += self._cache_tier_size()
+        return total_size
+    
+    def _cache_tier_size(self) -> int:
+        """cache 目录下各数据集子目录的文件总大小"""
+        from .data_source import get_data_cache
+        
+        data_cache = get_data_cache()
+        if Path(data_cache.cache_dir).resolve() == self.cache_dir.resolve():
+            return data_cache.disk_bytes()
+        
+        # 不是进程内数据缓存使用的目录时直接遍历子目录
         total_size = 0
-        for dir_path in dirs:
-            if dir_path.exists():
-                for file_path in dir_path.rglob('*'):
+        for dataset_dir in self.cache_dir.iterdir():
+            if dataset_dir.is_dir():
+                for file_path in dataset_dir.rglob('*'):
                     if file_path.is_file():
                         total_size += file_path.stat().st_size
-        
         return total_size
     
     def list_files(self, directory: str = "exports", limit: int = 10) -> List[dict]:
         """
-        列出目录中的文件
+        列出目录中的文件（按修改时间倒序），按文件索引查询
         
         Args:
             directory: 目录类型
@@ -224,28 +377,17 @@ class FileManager:
         Returns:
             文件信息列表
         """
-        if directory == "exports":
-            target_dir = self.exports_dir
-        elif directory == "batch":
-            target_dir = self.batch_dir
-        elif directory == "cache":
-            target_dir = self.cache_dir
-        else:
-            return []
-        
-        if not target_dir.exists():
+        if directory not in ("exports", "batch", "cache"):
             return []
         
         files = []
-        for file_path in sorted(target_dir.iterdir(), key=lambda x: x.stat().st_mtime, reverse=True)[:limit]:
-            if file_path.is_file():
-                stat = file_path.stat()
-                files.append({
-                    "name": file_path.name,
-                    "path": str(file_path),
-                    "size_bytes": stat.st_size,
-                    "size_mb": round(stat.st_size / (1024 * 1024), 2),
-                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
-                })
+        for path, name, size, mtime in self.catalog.latest(directory, limit):
+            files.append({
+                "name": name,
+                "path": path,
+                "size_bytes": size,
+                "size_mb": round(size / (1024 * 1024), 2),
+                "modified": datetime.fromtimestamp(mtime).isoformat()
+            })
         
         return files
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""财务指标列分组（按指标类型筛选列）"""
+import json
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+import pandas as pd
+
+from .settings import INDICATOR_SETS_PATH
+
+
+# 各指标类型对应的列名规则（正则，匹配标准化后的列名）
+GROUP_PATTERNS: Dict[str, Tuple[str, ...]] = {
+    "basic": (
+        r"每股", r"市盈率", r"市净率", r"市销率", r"总市值", r"^总资产$"
+    ),
+    "profit": (
+        r"利润率", r"净利率", r"毛利率", r"收益率", r"报酬率", r"成本率", r"费用",
+        r"^(三项费用|非主营|主营利润)比重$", r"股息发放率",
+        r"^(主营业务|扣除非经常性损益后的)?净?利润$", r"^净利润", r"^营业收入"
+    ),
+    "growth": (
+        r"增长率", r"同比", r"环比"
+    ),
+    "debt": (
+        r"流动比率", r"速动比率", r"现金比率", r"利息支付倍数", r"负债", r"股东权益比率",
+        r"产权比率", r"资本化比率", r"固定资产净值率", r"资本固定化比率", r"清算价值比率",
+        r"固定资产比重", r"长期资产与长期资金比率", r"股东权益与固定资产比率"
+    ),
+    "operation": (
+        r"周转率", r"周转天数"
+    ),
+}
+
+# 不同AKShare版本/数据源的列名别名（标准化后）-> 统一名称
+COLUMN_ALIASES = {
+    "ROE": "净资产收益率",
+    "ROA": "总资产净利润率",
+    "EPS": "每股收益",
+    "BPS": "每股净资产",
+    "毛利率": "销售毛利率",
+    "净利率": "销售净利率",
+    "营业总收入同比增长率": "营业收入增长率",
+    "归母净利润同比增长率": "净利润增长率",
+}
+
+# 任何指标类型都保留的标识列
+ID_COLUMNS = ("日期", "报告期", "股票代码", "股票名称", "REPORT_DATE", "SECURITY_CODE")
+
+_UNIT_PATTERN = re.compile(r"\(.*?\)|（.*?）|[\s_]")
+
+
+def normalize_column(column: str) -> str:
+    """标准化列名：去掉单位和空白/下划线，统一异体字并应用别名"""
+    name = _UNIT_PATTERN.sub("", str(column)).replace("帐", "账")
+    return COLUMN_ALIASES.get(name.upper(), COLUMN_ALIASES.get(name, name))
+
+
+class IndicatorGroups:
+    """
+    指标列分组注册表
+
+    每组规则预编译为一个正则；每种列结构（列名元组）只解析一次，
+    结果缓存后按指标类型筛选列只需一次字典查找。
+    """
+
+    def __init__(self, groups: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        初始化分组注册表
+
+        Args:
+            groups: {指标类型: 列名正则列表}，为空时使用 GROUP_PATTERNS
+        """
+        self._patterns: Dict[str, Pattern] = {}
+        self._resolved: Dict[Tuple[str, ...], Dict[str, List[str]]] = {}
+        self._lock = threading.Lock()
+        for name, patterns in (groups or GROUP_PATTERNS).items():
+            self._patterns[name] = re.compile("|".join(f"(?:{p})" for p in patterns))
+
+    @property
+    def names(self) -> List[str]:
+        """已注册的指标类型"""
+        return list(self._patterns)
+
+    def register(self, name: str, columns: Iterable[str]):
+        """
+        注册自定义指标集
+
+        Args:
+            name: 指标类型名称
+            columns: 列名或列名关键字（按标准化后的包含关系匹配）
+        """
+        pattern = "|".join(re.escape(normalize_column(column)) for column in columns)
+        if not pattern:
+            raise ValueError(f"指标集 {name} 不能为空")
+        with self._lock:
+            self._patterns[name] = re.compile(pattern)
+            self._resolved.clear()
+
+    def resolve(self, columns: Tuple[str, ...]) -> Dict[str, List[str]]:
+        """
+        解析列结构，返回 {指标类型: 该类型包含的列（标识列在前）}
+
+        Args:
+            columns: 列名元组
+        """
+        resolved = self._resolved.get(columns)
+        if resolved is not None:
+            return resolved
+
+        ids = [column for column in columns if column in ID_COLUMNS]
+        normalized = [(column, normalize_column(column)) for column in columns if column not in ID_COLUMNS]
+        resolved = {}
+        for name, pattern in self._patterns.items():
+            matched = [column for column, norm in normalized if pattern.search(norm)]
+            resolved[name] = ids + matched if matched else []
+
+        with self._lock:
+            self._resolved[columns] = resolved
+        return resolved
+
+    def select(self, df: pd.DataFrame, indicator_type: str) -> pd.DataFrame:
+        """
+        按指标类型筛选列（未匹配到任何列时返回原数据）
+
+        Args:
+            df: 原始数据
+            indicator_type: 指标类型
+        """
+        if indicator_type == "all":
+            return df
+        columns = self.resolve(tuple(df.columns)).get(indicator_type)
+        return df[columns] if columns else df
+
+
+def _load_indicator_sets(groups: IndicatorGroups, path: str):
+    """从JSON文件加载自定义指标集：{"名称": ["列名或关键字", ...]}"""
+    with open(path, "r", encoding="utf-8") as f:
+        for name, columns in json.load(f).items():
+            groups.register(name, columns)
+
+
+_groups: Optional[IndicatorGroups] = None
+_groups_lock = threading.Lock()
+
+
+def get_indicator_groups() -> IndicatorGroups:
+    """获取进程内共享的指标分组注册表（含 AKSHARE_MCP_INDICATOR_SETS 中的自定义指标集）"""
+    global _groups
+    if _groups is None:
+        with _groups_lock:
+            if _groups is None:
+                groups = IndicatorGroups()
+                if INDICATOR_SETS_PATH:
+                    _load_indicator_sets(groups, INDICATOR_SETS_PATH)
+                _groups = groups
+    return _groups
+
+
+def indicator_types() -> List[str]:
+    """所有可用的指标类型（含 all）"""
+    return get_indicator_groups().names + ["all"]
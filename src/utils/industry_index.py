@@ -0,0 +1,136 @@
+"""行业分类索引（行业 -> 成分股）"""
+import threading
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+
+from .data_cache import DataCache
+from .data_source import call_upstream, fetch_dataset, get_data_cache
+
+
+# 行业板块成分股在缓存中的数据集名称（按行业名称缓存）
+INDUSTRY_MEMBERS_DATASET = "industry_members"
+
+
+def profile_value(profile: Optional[pd.DataFrame], item: str) -> Optional[str]:
+    """从个股信息（item/value 两列）中读取某一项"""
+    if profile is None or profile.empty or "item" not in profile.columns:
+        return None
+    values = profile.loc[profile["item"] == item, "value"]
+    return None if values.empty else str(values.iloc[0])
+
+
+class IndustryIndex:
+    """
+    行业分类索引
+
+    由已缓存的个股信息（stock_individual_info_em 的"行业"）建立，
+    个股信息缓存版本变化后只重新读取版本号变化的股票；查询同业时再合并
+    东方财富行业板块成分股（stock_board_industry_cons_em，按行业缓存），
+    板块接口不可用时只使用索引中的股票。
+    """
+
+    def __init__(self, cache: DataCache, source_dataset: str = "profile"):
+        """
+        初始化行业索引
+
+        Args:
+            cache: 数据缓存
+            source_dataset: 个股信息数据集名称
+        """
+        self.cache = cache
+        self.source_dataset = source_dataset
+        self._version: Optional[int] = None
+        # 股票代码 -> 读取时个股信息的版本号
+        self._generations: Dict[str, int] = {}
+        self._industry_of: Dict[str, str] = {}
+        self._members: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, symbol: str):
+        """从索引中移除股票（调用方需持有锁）"""
+        industry = self._industry_of.pop(symbol, None)
+        if industry is not None:
+            members = self._members.get(industry)
+            members.discard(symbol)
+            if not members:
+                del self._members[industry]
+
+    def refresh(self, force: bool = False):
+        """个股信息缓存有更新时更新有变化的股票"""
+        with self._lock:
+            version = self.cache.version(self.source_dataset)
+            if not force and self._version == version:
+                return
+
+            current = self.cache.generations(self.source_dataset)
+            changed = [
+                symbol for symbol, generation in current.items()
+                if force or self._generations.get(symbol) != generation
+            ]
+            for symbol in set(self._generations) - set(current):
+                self._remove(symbol)
+
+            profiles = self.cache.items(self.source_dataset, changed)
+            for symbol in changed:
+                self._remove(symbol)
+                industry = profile_value(profiles.get(symbol), "行业")
+                if industry:
+                    self._industry_of[symbol] = industry
+                    self._members.setdefault(industry, set()).add(symbol)
+
+            self._generations = current
+            self._version = version
+
+    def industry(self, symbol: str) -> Optional[str]:
+        """
+        查询股票所属行业（未缓存时获取个股信息）
+
+        Args:
+            symbol: 股票代码
+        """
+        self.refresh()
+        industry = self._industry_of.get(symbol)
+        if industry is None:
+            industry = profile_value(fetch_dataset(self.source_dataset, symbol), "行业")
+        return industry
+
+    def members(self, industry: str) -> List[str]:
+        """
+        查询行业成分股（板块成分股与索引中已知股票的并集）
+
+        Args:
+            industry: 行业名称
+        """
+        self.refresh()
+        symbols = set(self._members.get(industry, ()))
+        try:
+            board = self.cache.get_or_fetch(
+                INDUSTRY_MEMBERS_DATASET,
+                industry,
+                lambda: call_upstream("stock_board_industry_cons_em", symbol=industry)
+            )
+            if board is not None and "代码" in board.columns:
+                symbols.update(board["代码"].astype(str))
+        except Exception:
+            pass
+        return sorted(symbols)
+
+    def industries(self) -> Dict[str, int]:
+        """索引中的行业及已知股票数"""
+        self.refresh()
+        return {industry: len(symbols) for industry, symbols in self._members.items()}
+
+
+_index: Optional[IndustryIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_industry_index() -> IndustryIndex:
+    """获取进程内共享的行业索引"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = IndustryIndex(get_data_cache())
+    return _index
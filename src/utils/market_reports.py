@@ -0,0 +1,282 @@
+"""全市场报告期数据（按报告期一次获取所有股票的业绩报表和三张报表摘要）"""
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .arrow_io import write_arrow_file
+from .data_bundle import read_bundle_frame
+from .data_source import call_upstream
+from .settings import BASE_PATH
+from .upstream_scheduler import BULK, workload
+from .valuation import DISCLOSURE_DEADLINES
+
+
+# 报表类型 -> AKShare 按报告期获取全市场数据的接口
+REPORT_KINDS = {
+    "performance": "stock_yjbb_em",
+    "balance_sheet": "stock_zcfz_em",
+    "income": "stock_lrb_em",
+    "cash_flow": "stock_xjll_em",
+}
+
+# 法定披露截止日之后再过这么多天，视为该报告期数据不再变化（更正公告多在此前）
+FINAL_AFTER_DAYS = 30
+
+
+def quarter_end(day: date) -> date:
+    """day 所在季度之前（含当天为季末时）最近的季末日"""
+    month = (day.month - 1) // 3 * 3 + 3
+    end = (date(day.year, month, 1) + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    if end <= day:
+        return end
+    start = date(day.year, month - 2, 1)
+    return start - timedelta(days=1)
+
+
+def recent_periods(count: int, today: Optional[date] = None) -> List[date]:
+    """最近 count 个已结束的报告期（新的在前）"""
+    period = quarter_end(today or date.today())
+    periods = []
+    for _ in range(count):
+        periods.append(period)
+        period = quarter_end(period.replace(day=1) - timedelta(days=1))
+    return periods
+
+
+def parse_report_period(value: str) -> date:
+    """
+    解析报告期（YYYYMMDD 或 YYYY-MM-DD，必须是季末日）
+
+    Raises:
+        ValueError: 格式不正确或不是季末日
+    """
+    day = pd.Timestamp(str(value).strip()).date()
+    if quarter_end(day) != day:
+        raise ValueError(f"报告期必须是季末日（03-31、06-30、09-30、12-31）: {value}")
+    return day
+
+
+def is_final(period: date, today: Optional[date] = None) -> bool:
+    """报告期数据是否已不再变化（法定披露截止日后 FINAL_AFTER_DAYS 天）"""
+    year_offset, month, day = DISCLOSURE_DEADLINES[period.month]
+    deadline = date(period.year + year_offset, month, day)
+    return (today or date.today()) > deadline + timedelta(days=FINAL_AFTER_DAYS)
+
+
+class MarketReportStore:
+    """
+    全市场报告期数据存储
+
+    每种报表、每个报告期一个文件（data/market_reports/<类型>/<YYYYMMDD>.arrow），
+    manifest.json 记录各报告期的行数、获取时间和是否已定稿。一次接口调用
+    得到一个报告期内所有股票的数据，刷新全市场只需"报表类型 × 报告期数"次调用，
+    不再逐只股票请求。已定稿的报告期不重复获取；按股票查询时把各报告期合并为
+    一张表并缓存在内存中，有新数据写入后重建。
+    """
+
+    def __init__(self, base_dir: str):
+        """
+        初始化存储
+
+        Args:
+            base_dir: 存储根目录
+        """
+        self.base_dir = Path(base_dir)
+        self._lock = threading.Lock()
+        self._manifest = self._read_manifest()
+        self._version = 0
+        self._merged: Dict[str, Tuple[int, pd.DataFrame]] = {}
+
+    def _read_manifest(self) -> Dict[str, Dict[str, dict]]:
+        try:
+            with open(self.base_dir / "manifest.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self):
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.base_dir / f"manifest.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.base_dir / "manifest.json")
+
+    def _path(self, kind: str, period: date) -> Path:
+        return self.base_dir / kind / period.strftime("%Y%m%d")
+
+    def _write_period(self, kind: str, period: date, df: pd.DataFrame):
+        """写入一个报告期（先写临时文件再重命名）"""
+        path = self._path(kind, period)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = Path(f"{path}.{os.getpid()}.{threading.get_ident()}.tmp")
+        if write_arrow_file(df, tmp_path):
+            os.replace(tmp_path, Path(f"{path}.arrow"))
+            Path(f"{path}.pkl").unlink(missing_ok=True)
+        else:
+            df.to_pickle(tmp_path)
+            os.replace(tmp_path, Path(f"{path}.pkl"))
+            Path(f"{path}.arrow").unlink(missing_ok=True)
+
+    @staticmethod
+    def _fetch(kind: str, period: date) -> pd.DataFrame:
+        """获取一个报告期的全市场数据，统一股票代码格式并添加报告期列"""
+        df = call_upstream(REPORT_KINDS[kind], date=period.strftime("%Y%m%d"))
+        if df is None or df.empty:
+            return pd.DataFrame()
+        df = df.drop(columns=["序号"], errors="ignore")
+        df["股票代码"] = df["股票代码"].astype(str).str.zfill(6)
+        for column in ("最新公告日期", "公告日期"):
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column], errors="coerce").dt.strftime("%Y-%m-%d")
+        df.insert(0, "报告期", period.isoformat())
+        return df.reset_index(drop=True)
+
+    def stored_periods(self, kind: str) -> List[str]:
+        """已存储的报告期（YYYY-MM-DD，新的在前）"""
+        with self._lock:
+            return sorted(self._manifest.get(kind, {}), reverse=True)
+
+    def ingest(
+        self,
+        kinds: List[str],
+        periods: List[date],
+        refresh: bool = False,
+        workers: int = 4
+    ) -> dict:
+        """
+        获取并保存多个报告期的全市场数据
+
+        Args:
+            kinds: 报表类型（REPORT_KINDS 中的名称）
+            periods: 报告期
+            refresh: 是否重新获取已定稿的报告期
+            workers: 并发请求数
+
+        Returns:
+            获取结果统计（调用次数、各报告期行数、跳过和失败的报告期）
+        """
+        today = date.today()
+        tasks = []
+        skipped = []
+        with self._lock:
+            for kind in kinds:
+                for period in periods:
+                    entry = self._manifest.get(kind, {}).get(period.isoformat())
+                    if entry is not None and entry.get("final") and not refresh:
+                        skipped.append(f"{kind}:{period.isoformat()}")
+                    else:
+                        tasks.append((kind, period))
+
+        def run(task: Tuple[str, date]):
+            kind, period = task
+            start = time.perf_counter()
+            try:
+                df = self._fetch(kind, period)
+            except Exception as e:
+                return kind, period, None, str(e), time.perf_counter() - start
+            if not df.empty:
+                self._write_period(kind, period, df)
+            return kind, period, df, None, time.perf_counter() - start
+
+        # 全市场获取按批量类别调度，不影响同时进行的交互查询
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor, workload(BULK):
+            futures = [executor.submit(contextvars.copy_context().run, run, task) for task in tasks]
+            results = [future.result() for future in futures]
+
+        rows: Dict[str, Dict[str, int]] = {}
+        errors: Dict[str, str] = {}
+        with self._lock:
+            for kind, period, df, error, _ in results:
+                key = period.isoformat()
+                if error is not None:
+                    errors[f"{kind}:{key}"] = error
+                    continue
+                rows.setdefault(kind, {})[key] = len(df)
+                if df.empty:
+                    continue
+                self._manifest.setdefault(kind, {})[key] = {
+                    "rows": len(df),
+                    "fetched_at": datetime.now().isoformat(timespec="seconds"),
+                    "final": is_final(period, today),
+                }
+            self._write_manifest()
+            self._version += 1
+
+        return {
+            "upstream_calls": len(tasks),
+            "seconds": round(sum(result[4] for result in results), 2),
+            "rows": rows,
+            "skipped_final": skipped,
+            "errors": errors,
+        }
+
+    def market(self, kind: str, period: Optional[date] = None) -> Tuple[Optional[str], pd.DataFrame]:
+        """
+        读取一个报告期的全市场数据
+
+        Args:
+            kind: 报表类型
+            period: 报告期（为空表示最近已存储的报告期）
+
+        Returns:
+            (报告期, DataFrame)；没有数据时DataFrame为空
+        """
+        stored = self.stored_periods(kind)
+        key = period.isoformat() if period else (stored[0] if stored else None)
+        if key is None or key not in stored:
+            return key, pd.DataFrame()
+        df = read_bundle_frame(self._path(kind, date.fromisoformat(key)))
+        return key, pd.DataFrame() if df is None else df
+
+    def history(self, kind: str, symbols: List[str]) -> pd.DataFrame:
+        """
+        读取多只股票在所有已存储报告期的数据
+
+        Args:
+            kind: 报表类型
+            symbols: 股票代码列表
+
+        Returns:
+            按股票代码、报告期（新的在前）排序的DataFrame
+        """
+        with self._lock:
+            version = self._version
+            cached = self._merged.get(kind)
+        if cached is None or cached[0] != version:
+            frames = []
+            for key in self.stored_periods(kind):
+                df = read_bundle_frame(self._path(kind, date.fromisoformat(key)))
+                if df is not None and not df.empty:
+                    frames.append(df)
+            merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            with self._lock:
+                self._merged[kind] = (version, merged)
+        else:
+            merged = cached[1]
+
+        if merged.empty:
+            return merged
+        df = merged[merged["股票代码"].isin(symbols)]
+        return df.sort_values(["股票代码", "报告期"], ascending=[True, False], ignore_index=True)
+
+
+_store: Optional[MarketReportStore] = None
+_store_lock = threading.Lock()
+
+
+def get_market_report_store() -> MarketReportStore:
+    """获取进程内共享的全市场报告期数据存储"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MarketReportStore(str(BASE_PATH / "data" / "market_reports"))
+    return _store
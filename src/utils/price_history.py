@@ -0,0 +1,286 @@
+"""历史日K线存储（按股票追加写入列式文件，只向上游请求缺失的日期区间）"""
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .arrow_io import HAS_ARROW, filter_range, read_arrow_table, to_dataframe, write_arrow_file
+from .data_bundle import get_offline_bundle
+from .data_source import call_upstream
+from .settings import BASE_PATH
+
+
+# 复权方式 -> 存储子目录
+ADJUST_MODES = {"": "none", "qfq": "qfq", "hfq": "hfq"}
+
+# 数据块超过该数量时合并为一个文件
+MAX_CHUNKS = 16
+
+_CHUNK_SUFFIXES = (".arrow", ".pkl")
+
+
+def _shift(day: str, days: int) -> str:
+    return (date.fromisoformat(day) + timedelta(days=days)).isoformat()
+
+
+class PriceHistoryStore:
+    """
+    历史日K线存储
+
+    每个股票、每种复权方式一个目录（data/history/<复权方式>/<代码>/），
+    每次从上游获取的新区间写成一个只追加的 Arrow IPC 数据块，
+    coverage.json 记录已获取的日期范围。查询时只请求范围之外的日期，
+    读取时内存映射各数据块并在 Arrow 层按日期过滤后再转换为 DataFrame。
+
+    当日K线在收盘前会变化，不写入存储；除权除息导致已存储的复权价格变化时
+    （向后或向前扩展时分别检查最后一根或第一根已存储K线），该股票的存储全部重建。
+    """
+
+    def __init__(self, base_dir: str):
+        """
+        初始化K线存储
+
+        Args:
+            base_dir: 存储根目录
+        """
+        self.base_dir = Path(base_dir)
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _directory(self, symbol: str, adjust: str) -> Path:
+        return self.base_dir / ADJUST_MODES[adjust] / symbol
+
+    def _lock(self, symbol: str, adjust: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, adjust), threading.Lock())
+
+    @staticmethod
+    def _read_coverage(directory: Path) -> Optional[dict]:
+        try:
+            with open(directory / "coverage.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_coverage(directory: Path, coverage: dict):
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = directory / f"coverage.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(coverage, f, ensure_ascii=False)
+        os.replace(tmp_path, directory / "coverage.json")
+
+    @staticmethod
+    def _chunks(directory: Path) -> List[Path]:
+        if not directory.exists():
+            return []
+        return sorted(path for path in directory.iterdir() if path.suffix in _CHUNK_SUFFIXES)
+
+    @staticmethod
+    def _write_chunk(directory: Path, df: pd.DataFrame):
+        """写入一个新数据块（优先Arrow IPC，无法转换时使用pickle）"""
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time.time_ns():020d}"
+        tmp_path = directory / f"{name}.{os.getpid()}.tmp"
+        df = df.reset_index(drop=True)
+        if write_arrow_file(df, tmp_path):
+            os.replace(tmp_path, directory / f"{name}.arrow")
+        else:
+            df.to_pickle(tmp_path)
+            os.replace(tmp_path, directory / f"{name}.pkl")
+
+    def _read_chunks(self, directory: Path, start: str, end: str) -> List[pd.DataFrame]:
+        """读取各数据块中日期在 [start, end] 内的K线"""
+        frames = []
+        for path in self._chunks(directory):
+            if path.suffix == ".arrow" and HAS_ARROW:
+                table = filter_range(read_arrow_table(path), "日期", start, end)
+                frames.append(to_dataframe(table))
+            else:
+                df = pd.read_pickle(path)
+                frames.append(df[(df["日期"] >= start) & (df["日期"] <= end)])
+        return frames
+
+    def _compact(self, directory: Path):
+        """数据块过多时合并为一个"""
+        chunks = self._chunks(directory)
+        if len(chunks) <= MAX_CHUNKS:
+            return
+        frames = self._read_chunks(directory, "0000-00-00", "9999-99-99")
+        self._write_chunk(directory, pd.concat(frames, ignore_index=True).drop_duplicates("日期", keep="last"))
+        for path in chunks:
+            path.unlink(missing_ok=True)
+
+    def _reset(self, directory: Path):
+        for path in self._chunks(directory):
+            path.unlink(missing_ok=True)
+        (directory / "coverage.json").unlink(missing_ok=True)
+
+    @staticmethod
+    def _fetch(symbol: str, start: str, end: str, adjust: str) -> pd.DataFrame:
+        """从上游获取 [start, end] 的日K线，日期统一为 YYYY-MM-DD 字符串"""
+        if start > end:
+            return pd.DataFrame()
+        df = call_upstream(
+            "stock_zh_a_hist",
+            symbol=symbol,
+            period="daily",
+            start_date=start.replace("-", ""),
+            end_date=end.replace("-", ""),
+            adjust=adjust
+        )
+        if df is None or df.empty:
+            return pd.DataFrame()
+        df = df.copy()
+        df["日期"] = pd.to_datetime(df["日期"]).dt.strftime("%Y-%m-%d")
+        return df
+
+    @staticmethod
+    def _unchanged(bars: pd.DataFrame, day: Optional[str], close: Optional[float]) -> bool:
+        """已存储K线（day 当日）的收盘价与上游是否一致（不一致说明复权价格已调整）"""
+        if bars.empty or day is None:
+            return True
+        row = bars[bars["日期"] == day]
+        return row.empty or abs(float(row["收盘"].iloc[0]) - close) < 1e-6
+
+    def _first_bar(self, directory: Path, coverage: dict) -> Tuple[Optional[str], Optional[float]]:
+        """从数据块读取第一根已存储K线的 (日期, 收盘价)（旧的 coverage.json 没有记录）"""
+        frames = [df for df in self._read_chunks(directory, coverage["start"], coverage["end"]) if not df.empty]
+        if not frames:
+            return None, None
+        bars = pd.concat(frames, ignore_index=True)
+        first = bars.loc[bars["日期"].idxmin()]
+        return first["日期"], float(first["收盘"])
+
+    @staticmethod
+    def _covered_end(end: str, today: str, bars: pd.DataFrame, previous: str) -> str:
+        """
+        获取后的已覆盖结束日期
+
+        在线时上游对过去的日期是完整的，覆盖到 min(end, 昨天)；离线数据包只
+        包含打包时已有的K线，只覆盖到实际返回的最后一根K线，恢复在线后
+        再从上游补齐之后的日期。
+        """
+        covered = min(end, _shift(today, -1))
+        if get_offline_bundle() is not None:
+            last = bars["日期"].max() if not bars.empty else previous
+            covered = min(covered, max(last, previous))
+        return covered
+
+    def _sync(self, directory: Path, symbol: str, start: str, end: str, adjust: str) -> List[pd.DataFrame]:
+        """
+        获取存储范围之外的K线并写入存储
+
+        Returns:
+            不写入存储的当日K线
+        """
+        today = date.today().isoformat()
+        coverage = self._read_coverage(directory)
+        fetched = []
+        extended = False
+
+        if coverage is not None and "first_date" not in coverage:
+            coverage["first_date"], coverage["first_close"] = self._first_bar(directory, coverage)
+
+        if coverage is not None and start < coverage["start"]:
+            # 获取到第一根已存储K线为止，用于检查复权价格是否变化
+            first_date, first_close = coverage["first_date"], coverage["first_close"]
+            earlier = self._fetch(symbol, start, first_date or _shift(coverage["start"], -1), adjust)
+            if self._unchanged(earlier, first_date, first_close):
+                if not earlier.empty:
+                    fetched.append(earlier[earlier["日期"] < coverage["start"]])
+                coverage["start"] = start
+                extended = True
+            else:
+                end = max(end, coverage["end"])
+                self._reset(directory)
+                coverage = None
+
+        if coverage is not None and end > coverage["end"]:
+            # 从最后一根已存储K线开始获取，用于检查复权价格是否变化
+            since = coverage.get("last_date") or _shift(coverage["end"], 1)
+            recent = self._fetch(symbol, since, end, adjust)
+            if self._unchanged(recent, coverage.get("last_date"), coverage.get("last_close")):
+                if not recent.empty:
+                    fetched.append(recent[recent["日期"] > coverage["end"]])
+                coverage["end"] = self._covered_end(end, today, recent, coverage["end"])
+                extended = True
+            else:
+                start = min(start, coverage["start"])
+                self._reset(directory)
+                coverage = None
+                fetched = []
+
+        if coverage is None:
+            fetched.append(self._fetch(symbol, start, end, adjust))
+            coverage = {"start": start, "end": self._covered_end(end, today, fetched[-1], _shift(start, -1))}
+        elif not extended:
+            return []
+
+        fetched = [df for df in fetched if not df.empty]
+        new_bars = pd.concat(fetched, ignore_index=True) if fetched else pd.DataFrame()
+        live = []
+        if not new_bars.empty:
+            live = [new_bars[new_bars["日期"] >= today]]
+            stored = new_bars[new_bars["日期"] < today]
+            if not stored.empty:
+                self._write_chunk(directory, stored)
+                last = stored.loc[stored["日期"].idxmax()]
+                if last["日期"] >= coverage.get("last_date", ""):
+                    coverage["last_date"] = last["日期"]
+                    coverage["last_close"] = float(last["收盘"])
+                first = stored.loc[stored["日期"].idxmin()]
+                if coverage.get("first_date") is None or first["日期"] <= coverage["first_date"]:
+                    coverage["first_date"] = first["日期"]
+                    coverage["first_close"] = float(first["收盘"])
+
+        self._write_coverage(directory, coverage)
+        self._compact(directory)
+        return live
+
+    def get(self, symbol: str, start: str, end: str, adjust: str = "") -> pd.DataFrame:
+        """
+        获取日K线
+
+        Args:
+            symbol: 股票代码
+            start: 开始日期（YYYY-MM-DD）
+            end: 结束日期（YYYY-MM-DD）
+            adjust: 复权方式（""不复权、"qfq"前复权、"hfq"后复权）
+
+        Returns:
+            按日期升序排列的K线
+        """
+        if adjust not in ADJUST_MODES:
+            raise ValueError(f"复权方式不正确: {adjust}")
+
+        directory = self._directory(symbol, adjust)
+        with self._lock(symbol, adjust):
+            live = self._sync(directory, symbol, start, end, adjust)
+            frames = self._read_chunks(directory, start, end) + live
+
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        df = df[(df["日期"] >= start) & (df["日期"] <= end)]
+        return df.drop_duplicates("日期", keep="last").sort_values("日期").reset_index(drop=True)
+
+
+_store: Optional[PriceHistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_price_history_store() -> PriceHistoryStore:
+    """获取进程内共享的K线存储"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PriceHistoryStore(str(BASE_PATH / "data" / "history"))
+    return _store
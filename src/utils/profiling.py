@@ -0,0 +1,245 @@
+"""工具调用性能剖析（按需开启，未开启时只做一次集合查找）"""
+import cProfile
+import io
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .settings import BASE_PATH, PROFILE_SAMPLE_PERCENT, PROFILE_TOOLS
+
+
+# 调用参数中的调试开关（true 表示剖析本次调用）
+PROFILE_ARGUMENT = "_profile"
+
+# 以字符串传入调试开关时视为开启的值（不区分大小写），其他字符串（"false"、"0" 等）视为关闭
+_TRUE_STRINGS = frozenset({"true", "1", "yes", "on"})
+
+# 摘要中列出的热点函数数量
+TOP_FUNCTIONS = 25
+
+# 采样模式的采样间隔（秒）
+SAMPLE_INTERVAL = 0.005
+
+# 按文件路径归类耗时：(类别, 路径片段)，按顺序匹配第一个
+_CATEGORIES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("upstream_http", ("requests", "urllib3", "http/client", "socket", "ssl", "aiohttp")),
+    ("parsing", ("json/decoder", "lxml", "bs4", "html5lib", "pandas/io")),
+    ("akshare", ("akshare",)),
+    ("serialization", ("json/encoder", "src/utils/data_formatter")),
+    ("pandas", ("pandas", "numpy")),
+    ("project", ("src/",)),
+]
+
+# 栈顶位于这些文件时视为空闲等待（线程池空闲线程阻塞在 _worker 中的 C 层队列上）
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+_IDLE_FUNCTIONS = ("_worker",)
+
+
+def _category(filename: str) -> str:
+    path = filename.replace("\\", "/")
+    for category, fragments in _CATEGORIES:
+        if any(fragment in path for fragment in fragments):
+            return category
+    return "other"
+
+
+def _label(filename: str, lineno: int, function: str) -> str:
+    return f"{filename}:{lineno}({function})"
+
+
+class ProfileSession:
+    """
+    一次工具调用的剖析
+
+    同步工具在执行线程中用 cProfile 记录（确定性，包含调用次数）；
+    异步工具（内部再分发到线程池）使用采样方式，定时读取所有线程的调用栈，
+    类似 py-spy，同时段内其他请求的线程也会被采到。
+    结果写入 logs/profiles/：.prof（pstats 格式，可用 snakeviz 等查看）或
+    .folded（折叠栈，可生成火焰图），以及 .txt 热点函数摘要。
+    """
+
+    def __init__(self, tool: str, output_dir: Path):
+        """
+        创建剖析会话
+
+        Args:
+            tool: 工具名称
+            output_dir: 输出目录
+        """
+        self.tool = tool
+        self.output_dir = output_dir
+        self.started_at = datetime.now()
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional["_StackSampler"] = None
+        self._start = time.perf_counter()
+
+    def run(self, func: Callable, **kwargs):
+        """在当前线程中用 cProfile 执行同步函数"""
+        self._profile = cProfile.Profile()
+        return self._profile.runcall(func, **kwargs)
+
+    def start_sampling(self):
+        """开始采样（异步工具）"""
+        self._sampler = _StackSampler(SAMPLE_INTERVAL)
+        self._sampler.start()
+
+    def finish(self) -> Optional[Path]:
+        """
+        结束剖析并写出结果
+
+        Returns:
+            摘要文件路径，没有记录到数据时返回None
+        """
+        elapsed = time.perf_counter() - self._start
+        if self._sampler is not None:
+            self._sampler.stop()
+
+        if self._profile is None and self._sampler is None:
+            return None
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = self.output_dir / f"{self.started_at.strftime('%Y%m%d_%H%M%S_%f')}_{self.tool}"
+        header = [
+            f"tool: {self.tool}",
+            f"started: {self.started_at.isoformat()}",
+            f"elapsed: {elapsed * 1000:.1f} ms",
+        ]
+
+        if self._profile is not None:
+            self._profile.dump_stats(f"{stem}.prof")
+            lines = header + ["mode: cprofile", ""] + self._cprofile_summary()
+        else:
+            self._sampler.write_folded(Path(f"{stem}.folded"))
+            lines = header + [f"mode: sampling ({SAMPLE_INTERVAL * 1000:.0f} ms)", ""] + self._sampler.summary()
+
+        summary_path = Path(f"{stem}.txt")
+        summary_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return summary_path
+
+    def _cprofile_summary(self) -> List[str]:
+        stats = pstats.Stats(self._profile)
+        total = stats.total_tt or 1e-9
+
+        by_category: Counter = Counter()
+        for (filename, _, _), (_, _, tottime, _, _) in stats.stats.items():
+            by_category[_category(filename)] += tottime
+
+        lines = ["耗时分类（自身耗时）:"]
+        for category, seconds in by_category.most_common():
+            lines.append(f"  {category:<14} {seconds * 1000:10.1f} ms  {seconds / total:6.1%}")
+
+        for sort_key, title in (("tottime", "自身耗时"), ("cumulative", "累计耗时")):
+            stream = io.StringIO()
+            pstats.Stats(self._profile, stream=stream).sort_stats(sort_key).print_stats(TOP_FUNCTIONS)
+            lines += ["", f"热点函数（按{title}）:", stream.getvalue().strip()]
+        return lines
+
+
+class _StackSampler(threading.Thread):
+    """定时采集所有线程调用栈的采样器"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.samples = 0
+        self.self_counts: Counter = Counter()
+        self.total_counts: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._record(frame)
+
+    def _record(self, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, frame.f_lineno, code.co_name))
+            frame = frame.f_back
+        if not stack:
+            return
+
+        leaf = stack[0]
+        # 线程池和事件循环中空闲等待的线程不计入
+        if leaf[0].endswith(_IDLE_FILES) or leaf[2] in _IDLE_FUNCTIONS:
+            return
+
+        self.samples += 1
+        self.self_counts[_label(*leaf)] += 1
+        self.categories[_category(leaf[0])] += 1
+        for label in {f"{filename}({function})" for filename, _, function in stack}:
+            self.total_counts[label] += 1
+        self.stacks[";".join(f"{function} ({filename})" for filename, _, function in reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write_folded(self, path: Path):
+        """写出折叠栈（每行 "栈;栈 次数"，可直接用于 flamegraph.pl / speedscope）"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def summary(self) -> List[str]:
+        total = self.samples or 1
+        lines = [f"samples: {self.samples}", "", "耗时分类（栈顶函数）:"]
+        for category, count in self.categories.most_common():
+            lines.append(f"  {category:<14} {count:8d}  {count / total:6.1%}")
+        for title, counts in (("栈顶", self.self_counts), ("栈中出现", self.total_counts)):
+            lines += ["", f"热点函数（按{title}采样数）:"]
+            for label, count in counts.most_common(TOP_FUNCTIONS):
+                lines.append(f"  {count:8d}  {count / total:6.1%}  {label}")
+        return lines
+
+
+def _parse_tools(value: str) -> Tuple[bool, frozenset]:
+    names = frozenset(name.strip() for name in value.split(",") if name.strip())
+    return "*" in names, names
+
+
+_ALL_TOOLS, _TOOLS = _parse_tools(PROFILE_TOOLS)
+
+
+def _is_requested(value) -> bool:
+    """调试开关的值：只接受 true 或表示开启的字符串"""
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE_STRINGS
+    return value is True
+
+
+def start_profile(tool: str, arguments: Dict) -> Optional[ProfileSession]:
+    """
+    决定是否剖析本次调用（会从参数中移除调试开关）
+
+    以下任一条件满足时剖析：参数 _profile 为 true（或字符串 "true"/"1"/"yes"/"on"）；工具在
+    AKSHARE_MCP_PROFILE_TOOLS 中（"*" 表示所有工具）；按
+    AKSHARE_MCP_PROFILE_SAMPLE 的百分比随机抽中。
+
+    Args:
+        tool: 工具名称
+        arguments: 调用参数
+
+    Returns:
+        剖析会话，不剖析时返回None
+    """
+    requested = _is_requested(arguments.pop(PROFILE_ARGUMENT, False))
+    if not (
+        requested
+        or _ALL_TOOLS
+        or tool in _TOOLS
+        or (PROFILE_SAMPLE_PERCENT > 0 and random.random() * 100 < PROFILE_SAMPLE_PERCENT)
+    ):
+        return None
+    return ProfileSession(tool, BASE_PATH / "logs" / "profiles")
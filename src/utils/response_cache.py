@@ -0,0 +1,157 @@
+"""工具响应缓存（保存序列化后的响应文本，重复查询跳过获取和序列化）"""
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .settings import (
+    CACHE_TTL_SECONDS,
+    RESPONSE_CACHE_COMPRESS_BYTES,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_TTL
+)
+
+
+def response_key(tool: str, arguments: Dict[str, Any]) -> str:
+    """工具名称和参数的规范化表示（参数按名称排序，去掉值为None的参数）"""
+    normalized = {name: value for name, value in arguments.items() if value is not None}
+    return tool + ":" + json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class _ResponseEntry:
+    """缓存条目"""
+
+    __slots__ = ("payload", "compressed", "stamps", "stored_at")
+
+    def __init__(self, payload: bytes, compressed: bool, stamps: Tuple, stored_at: float):
+        self.payload = payload
+        self.compressed = compressed
+        self.stamps = stamps
+        self.stored_at = stored_at
+
+
+class ResponseCache:
+    """
+    按 (工具, 规范化参数) 缓存最终的响应文本
+
+    每个条目记录生成响应时所依赖数据的版本号（数据缓存中单条数据的写入
+    次数），读取时版本号不一致或超过有效期即视为失效。超过 compress_bytes
+    的响应以 zlib 压缩保存。按字节上限做 LRU 淘汰。
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: int, compress_bytes: int):
+        """
+        初始化响应缓存
+
+        Args:
+            max_bytes: 缓存容量上限（字节，按保存的数据大小计算）
+            ttl_seconds: 响应有效期（秒）
+            compress_bytes: 超过该大小的响应压缩保存（0 表示不压缩）
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.compress_bytes = compress_bytes
+        self._entries: "OrderedDict[str, _ResponseEntry]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def _drop(self, key: str):
+        """删除条目（调用方需持有锁）"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.payload)
+
+    def get(self, key: str, stamps: Tuple) -> Optional[str]:
+        """
+        读取响应
+
+        Args:
+            key: response_key 生成的键
+            stamps: 所依赖数据的当前版本号
+
+        Returns:
+            响应文本，不存在、已过期或数据已变化时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.stamps != stamps or time.time() - entry.stored_at >= self.ttl_seconds:
+                if entry is not None:
+                    self._drop(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            payload, compressed = entry.payload, entry.compressed
+
+        data = zlib.decompress(payload) if compressed else payload
+        return data.decode("utf-8")
+
+    def put(self, key: str, stamps: Tuple, text: str):
+        """
+        保存响应
+
+        Args:
+            key: response_key 生成的键
+            stamps: 生成响应时所依赖数据的版本号
+            text: 响应文本
+        """
+        payload = text.encode("utf-8")
+        compressed = bool(self.compress_bytes) and len(payload) > self.compress_bytes
+        if compressed:
+            payload = zlib.compress(payload, 1)
+        if len(payload) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = _ResponseEntry(payload, compressed, stamps, time.time())
+            self._bytes += len(payload)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self) -> int:
+        """清空缓存，返回删除的条目数"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return count
+
+    def stats(self) -> Dict[str, Any]:
+        """条目数、占用字节和命中率"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else None,
+            }
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """获取进程内共享的响应缓存，AKSHARE_MCP_RESPONSE_CACHE_MAX_BYTES 为 0 时返回None"""
+    global _response_cache
+    if RESPONSE_CACHE_MAX_BYTES <= 0 or RESPONSE_CACHE_TTL <= 0:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                # 依赖的数据过期后只有重新获取才会更新版本号，响应有效期不能超过数据有效期
+                _response_cache = ResponseCache(
+                    RESPONSE_CACHE_MAX_BYTES,
+                    min(RESPONSE_CACHE_TTL, CACHE_TTL_SECONDS),
+                    RESPONSE_CACHE_COMPRESS_BYTES
+                )
+    return _response_cache
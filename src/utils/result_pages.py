@@ -0,0 +1,83 @@
+"""分页查询结果（完整结果缓存在服务端，后续页直接切片返回）"""
+import re
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .data_cache import key_digest
+from .data_formatter import rows_within_budget
+from .data_source import get_data_cache
+
+
+# 分页结果在 DataCache 中的数据集名称（磁盘层在多进程模式下各进程共享）
+PAGES_DATASET = "pages"
+
+# 只传游标未指定每页条数时使用
+DEFAULT_PAGE_SIZE = 100
+
+_RESULT_ID_PATTERN = re.compile(r"^[0-9a-f]{24}$")
+
+
+def _page(df: pd.DataFrame, result_id: str, offset: int, page_size: int) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """切出一页；超出响应大小上限时缩小本页，next_cursor 从实际返回的最后一行之后继续"""
+    total = len(df)
+    end = offset + rows_within_budget(df.iloc[offset:offset + page_size])
+    next_cursor = f"{result_id}.{end}" if end < total else None
+    return df.iloc[offset:end], {
+        "total": total,
+        "offset": offset,
+        "page_size": page_size,
+        "next_cursor": next_cursor
+    }
+
+
+def paginate(key: str, df: pd.DataFrame, page_size: int) -> Tuple[pd.DataFrame, Optional[Dict[str, Any]]]:
+    """
+    返回第一页数据，结果超过一页时缓存完整结果供后续翻页
+
+    Args:
+        key: 查询标识（工具名称和查询参数），游标只能用于相同的查询
+        df: 完整结果
+        page_size: 每页条数（0 表示不分页）
+
+    Returns:
+        (当前页数据, 分页信息)；不分页时分页信息为None
+    """
+    if not page_size or df is None:
+        return df, None
+
+    if len(df) <= page_size and rows_within_budget(df) == len(df):
+        return _page(df, "", 0, page_size)
+
+    result_id = key_digest(key) + uuid.uuid4().hex[:16]
+    get_data_cache().put(PAGES_DATASET, result_id, df.reset_index(drop=True))
+    return _page(df, result_id, 0, page_size)
+
+
+def resume_page(key: str, cursor: str, page_size: int) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    根据游标读取后续页（不重新获取和处理数据）
+
+    Args:
+        key: 查询标识（须与生成游标时一致）
+        cursor: 上一页返回的 next_cursor
+        page_size: 每页条数（0 表示使用 DEFAULT_PAGE_SIZE）
+
+    Returns:
+        (当前页数据, 分页信息)
+
+    Raises:
+        ValueError: 游标无效、与查询不匹配或已过期
+    """
+    result_id, _, offset = cursor.partition(".")
+    if not offset.isdigit() or not _RESULT_ID_PATTERN.match(result_id):
+        raise ValueError(f"游标格式不正确: {cursor}")
+    if result_id[:8] != key_digest(key):
+        raise ValueError("游标与当前查询参数不匹配")
+
+    df = get_data_cache().get(PAGES_DATASET, result_id)
+    if df is None:
+        raise ValueError("游标已过期，请重新查询")
+
+    return _page(df, result_id, int(offset), page_size or DEFAULT_PAGE_SIZE)
@@ -0,0 +1,91 @@
+"""运行配置（通过环境变量覆盖默认值）"""
+import os
+from pathlib import Path
+
+
+def _env_float(name: str, default: float) -> float:
+    """读取浮点型环境变量，无效值回退到默认值"""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    """读取整数型环境变量，无效值回退到默认值"""
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+# 项目根目录（data/、logs/ 均位于此目录下）
+BASE_PATH = Path(os.environ.get(
+    "AKSHARE_MCP_BASE_PATH",
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+))
+
+# 缓存数据有效期（秒）
+CACHE_TTL_SECONDS = _env_int("AKSHARE_MCP_CACHE_TTL", 6 * 3600)
+
+# 内存缓存容量上限（字节）
+CACHE_MAX_MEMORY_BYTES = _env_int("AKSHARE_MCP_CACHE_MAX_MEMORY", 512 * 1024 * 1024)
+
+# 负缓存有效期（秒，0 表示不缓存）：上游返回空数据、确定性错误（如代码不存在导致的解析失败）、
+# 暂时性错误（网络错误、超时、HTTP 429/5xx）
+NEGATIVE_TTL_SECONDS = _env_int("AKSHARE_MCP_NEGATIVE_TTL", 600)
+ERROR_TTL_SECONDS = _env_int("AKSHARE_MCP_ERROR_TTL", 300)
+TRANSIENT_ERROR_TTL_SECONDS = _env_int("AKSHARE_MCP_TRANSIENT_ERROR_TTL", 10)
+
+# 磁盘缓存容量上限（字节）和最长保留天数
+CACHE_MAX_DISK_BYTES = _env_int("AKSHARE_MCP_CACHE_MAX_DISK", 2 * 1024 * 1024 * 1024)
+CACHE_MAX_AGE_DAYS = _env_int("AKSHARE_MCP_CACHE_MAX_AGE_DAYS", 7)
+
+# 批量查询结果 / 导出文件最长保留天数（0 表示不自动清理）
+BATCH_MAX_AGE_DAYS = _env_int("AKSHARE_MCP_BATCH_MAX_AGE_DAYS", 7)
+EXPORTS_MAX_AGE_DAYS = _env_int("AKSHARE_MCP_EXPORTS_MAX_AGE_DAYS", 0)
+
+# 后台缓存维护间隔（秒，0 表示不启动后台任务）
+CACHE_MAINTENANCE_INTERVAL = _env_int("AKSHARE_MCP_MAINTENANCE_INTERVAL", 3600)
+
+# 离线数据包目录（设置后所有上游请求改为读取该数据包，为空表示在线模式）
+OFFLINE_BUNDLE_PATH = os.environ.get("AKSHARE_MCP_OFFLINE_BUNDLE", "")
+
+# 单次响应的JSON大小上限（字节，0 表示不限制）；超出时只返回最近的报告期，完整数据写入文件
+MAX_RESPONSE_BYTES = _env_int("AKSHARE_MCP_MAX_RESPONSE_BYTES", 1024 * 1024)
+
+# 同时进行的上游请求上限（0 表示不限制）和批量/后台请求可占用的比例，其余名额留给交互查询
+UPSTREAM_CONCURRENCY = _env_int("AKSHARE_MCP_UPSTREAM_CONCURRENCY", 8)
+BULK_UPSTREAM_SHARE = _env_float("AKSHARE_MCP_BULK_SHARE", 0.5)
+
+# 校验股票代码所用A股列表的有效期（秒）
+UNIVERSE_TTL_SECONDS = _env_int("AKSHARE_MCP_UNIVERSE_TTL", 24 * 3600)
+
+# 工具响应缓存：容量上限（字节，0 表示不启用）、有效期（秒，不超过缓存数据有效期）、
+# 超过多少字节的响应压缩保存（0 表示不压缩）
+RESPONSE_CACHE_MAX_BYTES = _env_int("AKSHARE_MCP_RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+RESPONSE_CACHE_TTL = _env_int("AKSHARE_MCP_RESPONSE_CACHE_TTL", 300)
+RESPONSE_CACHE_COMPRESS_BYTES = _env_int("AKSHARE_MCP_RESPONSE_CACHE_COMPRESS", 4096)
+
+# 全市场实时行情快照有效期（秒）
+SPOT_TTL_SECONDS = _env_int("AKSHARE_MCP_SPOT_TTL", 15)
+
+# 自定义指标集JSON文件路径（{"名称": ["列名或关键字", ...]}，为空表示不加载）
+INDICATOR_SETS_PATH = os.environ.get("AKSHARE_MCP_INDICATOR_SETS", "")
+
+# 始终剖析的工具（逗号分隔，"*" 表示所有工具）和随机剖析的调用百分比，结果写入 logs/profiles/
+PROFILE_TOOLS = os.environ.get("AKSHARE_MCP_PROFILE_TOOLS", "")
+PROFILE_SAMPLE_PERCENT = _env_float("AKSHARE_MCP_PROFILE_SAMPLE", 0.0)
+
+# 请求追踪日志（每次工具调用一行JSON，为空表示不记录）；AKSHARE_MCP_OTEL=1 时同时发送 OpenTelemetry span
+TRACE_LOG_PATH = os.environ.get("AKSHARE_MCP_TRACE_LOG", str(BASE_PATH / "logs" / "traces.jsonl"))
+OTEL_EXPORT = _env_int("AKSHARE_MCP_OTEL", 0)
+
+# 多进程工作池的进程数（0 表示不启用，获取/解析/序列化在主进程的线程池中执行）
+WORKER_PROCESSES = _env_int("AKSHARE_MCP_WORKERS", 0)
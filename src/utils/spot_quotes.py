@@ -0,0 +1,100 @@
+"""全市场实时行情快照（一次上游请求服务所有股票的行情查询）"""
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from .data_source import call_upstream
+from .settings import SPOT_TTL_SECONDS
+
+
+class SpotQuotes:
+    """
+    全市场行情表（stock_zh_a_spot_em），按股票代码索引
+
+    快照过期后由第一个请求刷新，同时到达的其他请求等待这一次刷新完成，
+    不会各自请求上游。刷新失败时继续使用上一份快照，并在一个有效期内
+    不再重试（没有快照时直接返回上一次的错误），上游不可用期间不会
+    每次查询都串行请求一次全市场数据。
+    """
+
+    def __init__(self, ttl_seconds: int):
+        """
+        初始化行情表
+
+        Args:
+            ttl_seconds: 快照有效期（秒）
+        """
+        self.ttl_seconds = ttl_seconds
+        self._table: Optional[pd.DataFrame] = None
+        self._fetched_at = 0.0
+        self._failed_at = 0.0
+        self._last_error: Optional[str] = None
+        self._refresh_lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        """快照未过期，或上一次刷新失败后还未到重试时间"""
+        now = time.time()
+        if self._table is not None and now - self._fetched_at < self.ttl_seconds:
+            return True
+        return now - self._failed_at < self.ttl_seconds
+
+    def _refresh(self):
+        df = call_upstream("stock_zh_a_spot_em")
+        if df is None or df.empty:
+            raise ValueError("获取全市场行情失败")
+
+        df = df.drop(columns=["序号"], errors="ignore")
+        df["代码"] = df["代码"].astype(str)
+        self._table = df.set_index("代码", drop=False)
+        self._fetched_at = time.time()
+
+    def snapshot(self) -> Tuple[pd.DataFrame, datetime]:
+        """
+        获取当前快照（过期时刷新）
+
+        Returns:
+            (以股票代码为索引的行情表, 快照时间)
+        """
+        if not self._is_fresh():
+            with self._refresh_lock:
+                if not self._is_fresh():
+                    try:
+                        self._refresh()
+                    except Exception as e:
+                        self._failed_at = time.time()
+                        self._last_error = str(e) or type(e).__name__
+        if self._table is None:
+            raise ValueError(f"获取全市场行情失败: {self._last_error}")
+        return self._table, datetime.fromtimestamp(self._fetched_at)
+
+    def quotes(self, symbols: List[str]) -> Tuple[pd.DataFrame, List[str], datetime]:
+        """
+        查询多个股票的行情
+
+        Args:
+            symbols: 股票代码列表
+
+        Returns:
+            (行情数据, 未找到的股票代码, 快照时间)
+        """
+        table, fetched_at = self.snapshot()
+        found = [symbol for symbol in symbols if symbol in table.index]
+        missing = [symbol for symbol in symbols if symbol not in table.index]
+        return table.loc[found].reset_index(drop=True), missing, fetched_at
+
+
+_spot_quotes: Optional[SpotQuotes] = None
+_spot_quotes_lock = threading.Lock()
+
+
+def get_spot_quotes() -> SpotQuotes:
+    """获取进程内共享的全市场行情表"""
+    global _spot_quotes
+    if _spot_quotes is None:
+        with _spot_quotes_lock:
+            if _spot_quotes is None:
+                _spot_quotes = SpotQuotes(SPOT_TTL_SECONDS)
+    return _spot_quotes
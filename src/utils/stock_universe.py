@@ -0,0 +1,137 @@
+"""A股代码全集（校验股票代码、解析带交易所前后缀的代码和股票名称）"""
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import pandas as pd
+
+from .data_source import call_upstream, get_data_cache
+from .settings import UNIVERSE_TTL_SECONDS
+
+
+# 缓存中保存股票列表的数据集名称
+UNIVERSE_DATASET = "stock_list"
+
+# 加载失败后重试的间隔（秒），期间只校验代码格式
+RETRY_SECONDS = 60
+
+_CODE_COUNT = 1_000_000
+
+
+class StockUniverse:
+    """
+    A股代码全集（stock_info_a_code_name）
+
+    代码以位图保存（6位代码对应一位，共约122KB），名称以字典保存，
+    查询均为O(1)，不访问上游。完整列表（代码、名称）供搜索和列表工具使用。列表过期后由下一次查询重新加载，
+    加载失败时继续使用旧列表；从未加载成功时 contains 返回None，
+    由调用方退回到只校验格式。
+    """
+
+    def __init__(self, ttl_seconds: int):
+        """
+        初始化代码全集
+
+        Args:
+            ttl_seconds: 股票列表有效期（秒）
+        """
+        self.ttl_seconds = ttl_seconds
+        self._bitmap: Optional[bytearray] = None
+        self._names: Dict[str, str] = {}
+        self._frame: Optional[pd.DataFrame] = None
+        self._count = 0
+        self._loaded_at = 0.0
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        df = get_data_cache().get_or_fetch(
+            UNIVERSE_DATASET, "_all", lambda: call_upstream("stock_info_a_code_name")
+        )
+        if df is None or df.empty:
+            raise ValueError("获取股票列表失败")
+
+        codes = df["code"].astype(str).str.zfill(6)
+        bitmap = bytearray(_CODE_COUNT // 8 + 1)
+        for code in codes:
+            if code.isdigit() and len(code) == 6:
+                value = int(code)
+                bitmap[value >> 3] |= 1 << (value & 7)
+        names = {}
+        for code, name in zip(codes, df["name"].astype(str)):
+            names[name] = code
+            names[re.sub(r"\s+", "", name)] = code
+
+        self._bitmap, self._names, self._count = bitmap, names, len(codes)
+        self._frame = df
+        self._loaded_at = time.time()
+
+    def _ensure_loaded(self) -> bool:
+        """按需加载或刷新股票列表，返回是否有可用的列表"""
+        now = time.time()
+        if self._bitmap is not None and now - self._loaded_at < self.ttl_seconds:
+            return True
+        if now - self._failed_at < RETRY_SECONDS:
+            return self._bitmap is not None
+        with self._lock:
+            if self._bitmap is None or time.time() - self._loaded_at >= self.ttl_seconds:
+                try:
+                    self._load()
+                except Exception:
+                    self._failed_at = time.time()
+        return self._bitmap is not None
+
+    def contains(self, code: str) -> Optional[bool]:
+        """
+        代码是否在A股列表中
+
+        Args:
+            code: 6位数字代码
+
+        Returns:
+            是否存在；股票列表不可用时返回None
+        """
+        if not self._ensure_loaded():
+            return None
+        value = int(code)
+        return bool(self._bitmap[value >> 3] & (1 << (value & 7)))
+
+    def code_for_name(self, name: str) -> Optional[str]:
+        """按股票名称查找代码（忽略空白），找不到或列表不可用时返回None"""
+        if not self._ensure_loaded():
+            return None
+        return self._names.get(name) or self._names.get(re.sub(r"\s+", "", name))
+
+    def frame(self) -> Optional[pd.DataFrame]:
+        """
+        完整的股票列表（code、name 列，与缓存共用同一对象，调用方不应原地修改）
+
+        Returns:
+            股票列表，列表不可用时返回None
+        """
+        if not self._ensure_loaded():
+            return None
+        return self._frame
+
+    def stats(self) -> Dict[str, object]:
+        """股票数量和加载时间"""
+        return {
+            "stocks": self._count,
+            "loaded_at": datetime.fromtimestamp(self._loaded_at).isoformat() if self._loaded_at else None,
+        }
+
+
+_universe: Optional[StockUniverse] = None
+_universe_lock = threading.Lock()
+
+
+def get_stock_universe() -> StockUniverse:
+    """获取进程内共享的A股代码全集"""
+    global _universe
+    if _universe is None:
+        with _universe_lock:
+            if _universe is None:
+                _universe = StockUniverse(UNIVERSE_TTL_SECONDS)
+    return _universe
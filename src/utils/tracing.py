@@ -0,0 +1,236 @@
+"""请求追踪（每次工具调用按阶段记录耗时，以JSON行写入日志）"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from loguru import logger
+
+from .settings import OTEL_EXPORT, TRACE_LOG_PATH
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - opentelemetry为可选依赖
+    otel_trace = None
+
+
+class Span:
+    """一个阶段（validate / cache_lookup / upstream_fetch / simplify / serialize / file_write 等）"""
+
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set(self, **attributes):
+        """补充属性（如缓存是否命中、返回行数）"""
+        self.attributes.update(attributes)
+
+    def to_dict(self, trace_id: str) -> Dict[str, Any]:
+        # 字段与 OpenTelemetry span 的导出格式对应
+        return {
+            "trace_id": trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """未在追踪中时使用的空阶段"""
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """一次工具调用的追踪"""
+
+    def __init__(self, tool: str):
+        self.trace_id = os.urandom(16).hex()
+        self.tool = tool
+        self.spans: List[Span] = []
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def record_error(self, error: BaseException):
+        """记录异常及其调用栈（只写入日志，不返回给客户端）"""
+        self.error = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        root = next((s for s in spans if s.parent_id is None), None)
+        stages: Dict[str, float] = {}
+        upstream: Dict[str, float] = {}
+        for span in spans:
+            if span is root:
+                continue
+            duration = (span.end_ns - span.start_ns) / 1e6
+            stages[span.name] = round(stages.get(span.name, 0.0) + duration, 3)
+            if span.name == "upstream_fetch":
+                endpoint = span.attributes.get("endpoint", "")
+                upstream[endpoint] = round(upstream.get(endpoint, 0.0) + duration, 3)
+        return {
+            "trace_id": self.trace_id,
+            "tool": self.tool,
+            "status": root.status if root else "ok",
+            "duration_ms": round((root.end_ns - root.start_ns) / 1e6, 3) if root else 0.0,
+            "stages_ms": stages,
+            "upstream_ms": upstream,
+            "error": self.error,
+            "spans": [span.to_dict(self.trace_id) for span in spans],
+        }
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    """当前调用的追踪（不在工具调用中时为None）"""
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Any]:
+    """
+    记录一个阶段
+
+    不在工具调用中时不做任何记录；与外层阶段同名时并入外层
+    （如批量校验中逐个校验代码）。
+
+    Args:
+        name: 阶段名称
+        **attributes: 阶段属性（如 endpoint、dataset、symbol）
+    """
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    if trace is None or (parent is not None and parent.name == name):
+        yield _NOOP_SPAN
+        return
+
+    current = Span(name, parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        trace.add(current)
+
+
+def traced(name: str) -> Callable:
+    """将函数调用记录为一个阶段的装饰器"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def request_trace(tool: str) -> Iterator[Trace]:
+    """
+    追踪一次工具调用，结束后写出一行JSON
+
+    线程池中的阶段需要在复制的上下文中执行（contextvars.copy_context().run）
+    才能归入本次调用；多进程模式下工作进程中的阶段不记录，只记录整体耗时。
+
+    Args:
+        tool: 工具名称
+    """
+    trace = Trace(tool)
+    trace_token = _current_trace.set(trace)
+    try:
+        with span("tool", tool=tool) as root:
+            yield trace
+            if trace.error is not None:
+                root.status = "error"
+    finally:
+        _current_trace.reset(trace_token)
+        try:
+            _emit(trace)
+        except Exception:
+            pass
+
+
+_sink_lock = threading.Lock()
+_sink_added = False
+
+
+def _emit(trace: Trace):
+    """写出追踪记录（loguru 后台线程写文件，不阻塞调用方）"""
+    global _sink_added
+    if not TRACE_LOG_PATH:
+        return
+    if not _sink_added:
+        with _sink_lock:
+            if not _sink_added:
+                logger.add(
+                    TRACE_LOG_PATH,
+                    level="TRACE",
+                    format="{message}",
+                    filter=lambda record: "trace_record" in record["extra"],
+                    rotation="50 MB",
+                    retention=5,
+                    enqueue=True,
+                    encoding="utf-8"
+                )
+                _sink_added = True
+
+    record = trace.to_dict()
+    # TRACE 级别低于 loguru 默认输出的 DEBUG，不会出现在标准错误中
+    logger.bind(trace_record=True).log("TRACE", json.dumps(record, ensure_ascii=False, default=str))
+    if OTEL_EXPORT and otel_trace is not None:
+        _export_otel(trace)
+
+
+def _export_otel(trace: Trace):
+    """按记录的时间补发 OpenTelemetry span（需由调用方配置 SDK 和导出器）"""
+    tracer = otel_trace.get_tracer("akshare-mcp-server")
+    exported: Dict[str, Any] = {}
+    for item in sorted(trace.spans, key=lambda s: s.start_ns):
+        parent = exported.get(item.parent_id)
+        context = otel_trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = tracer.start_span(
+            item.name,
+            context=context,
+            start_time=item.start_ns,
+            attributes={k: v if isinstance(v, (bool, int, float, str)) else str(v) for k, v in item.attributes.items()}
+        )
+        if item.status == "error":
+            otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR))
+        otel_span.end(end_time=item.end_ns)
+        exported[item.span_id] = otel_span
@@ -0,0 +1,165 @@
+"""上游请求调度（交互查询优先于批量/后台任务）"""
+import contextvars
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from .settings import BULK_UPSTREAM_SHARE, UPSTREAM_CONCURRENCY
+
+
+# 请求类别：单只股票的交互查询 / 批量查询、预取、全市场获取等
+INTERACTIVE = "interactive"
+BULK = "bulk"
+WORKLOADS = (INTERACTIVE, BULK)
+
+_current_workload: contextvars.ContextVar[str] = contextvars.ContextVar("workload", default=INTERACTIVE)
+
+
+def current_workload() -> str:
+    """当前调用的请求类别（默认为交互查询）"""
+    return _current_workload.get()
+
+
+@contextmanager
+def workload(name: str) -> Iterator[None]:
+    """
+    将代码块中的上游请求标记为指定类别
+
+    线程池中的任务需要在复制的上下文中执行（contextvars.copy_context().run）才能继承类别。
+
+    Args:
+        name: 请求类别（INTERACTIVE / BULK）
+    """
+    if name not in WORKLOADS:
+        raise ValueError(f"未知的请求类别: {name}")
+    token = _current_workload.set(name)
+    try:
+        yield
+    finally:
+        _current_workload.reset(token)
+
+
+class UpstreamScheduler:
+    """
+    上游请求并发控制
+
+    同时进行的上游请求不超过 max_concurrency 个，其中批量请求最多占用
+    bulk_share 比例的名额，其余名额始终留给交互查询。有名额空出时先放行
+    排队的交互查询，批量请求只在没有交互查询等待时才开始；同一类别内按
+    到达顺序放行。已开始的请求不会被中断。
+
+    max_concurrency 为 1 时无法留出名额：批量请求仍可使用唯一的名额
+    （否则批量任务永远无法进行），交互查询最多等待一个进行中的批量请求。
+    """
+
+    def __init__(self, max_concurrency: int, bulk_share: float):
+        """
+        初始化调度器
+
+        Args:
+            max_concurrency: 上游请求并发上限
+            bulk_share: 批量请求可占用的名额比例（0-1，至少1个名额，并且至少留1个名额给交互查询）
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        # 只有1个名额时批量请求也只能使用它（见类说明）
+        reserved = 1 if self.max_concurrency > 1 else 0
+        self.bulk_limit = min(self.max_concurrency - reserved, max(1, int(self.max_concurrency * bulk_share)))
+        self._cond = threading.Condition()
+        self._active: Dict[str, int] = {name: 0 for name in WORKLOADS}
+        self._waiting: Dict[str, deque] = {name: deque() for name in WORKLOADS}
+        self._granted: Dict[str, int] = {name: 0 for name in WORKLOADS}
+        self._wait_total: Dict[str, float] = {name: 0.0 for name in WORKLOADS}
+        self._wait_max: Dict[str, float] = {name: 0.0 for name in WORKLOADS}
+
+    def _next_workload(self) -> Optional[str]:
+        """下一个可以放行的类别（没有空闲名额时为None）"""
+        if sum(self._active.values()) >= self.max_concurrency:
+            return None
+        if self._waiting[INTERACTIVE]:
+            return INTERACTIVE
+        if self._waiting[BULK] and self._active[BULK] < self.bulk_limit:
+            return BULK
+        return None
+
+    @contextmanager
+    def slot(self, name: str) -> Iterator[float]:
+        """
+        占用一个上游请求名额，名额不足时排队等待
+
+        Args:
+            name: 请求类别
+
+        Yields:
+            排队等待的秒数
+        """
+        ticket = object()
+        start = time.perf_counter()
+        with self._cond:
+            self._waiting[name].append(ticket)
+            while not (self._next_workload() == name and self._waiting[name][0] is ticket):
+                self._cond.wait()
+            self._waiting[name].popleft()
+            self._active[name] += 1
+            waited = time.perf_counter() - start
+            self._granted[name] += 1
+            self._wait_total[name] += waited
+            self._wait_max[name] = max(self._wait_max[name], waited)
+            # 可能还有空闲名额，让其他等待者重新检查
+            self._cond.notify_all()
+        try:
+            yield waited
+        finally:
+            with self._cond:
+                self._active[name] -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        """各类别的并发、排队和等待时间统计"""
+        with self._cond:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "bulk_limit": self.bulk_limit,
+                "workloads": {
+                    name: {
+                        "active": self._active[name],
+                        "queued": len(self._waiting[name]),
+                        "granted": self._granted[name],
+                        "avg_wait_ms": round(self._wait_total[name] / self._granted[name] * 1000, 2)
+                        if self._granted[name] else 0.0,
+                        "max_wait_ms": round(self._wait_max[name] * 1000, 2),
+                    }
+                    for name in WORKLOADS
+                },
+            }
+
+
+_scheduler: Optional[UpstreamScheduler] = None
+_scheduler_lock = threading.Lock()
+_disabled = False
+
+
+def disable_upstream_scheduler():
+    """关闭本进程的调度（多进程模式的工作进程中调用，由主进程在分派任务时调度）"""
+    global _disabled
+    _disabled = True
+
+
+def get_upstream_scheduler() -> Optional[UpstreamScheduler]:
+    """获取进程内共享的上游请求调度器，AKSHARE_MCP_UPSTREAM_CONCURRENCY 为 0 或已关闭时返回None"""
+    global _scheduler
+    if UPSTREAM_CONCURRENCY <= 0 or _disabled:
+        return None
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                if UPSTREAM_CONCURRENCY == 1:
+                    print(
+                        "AKSHARE_MCP_UPSTREAM_CONCURRENCY=1：无法为交互查询保留名额，"
+                        "批量任务运行时交互查询需要等待进行中的批量请求",
+                        file=sys.stderr
+                    )
+                _scheduler = UpstreamScheduler(UPSTREAM_CONCURRENCY, BULK_UPSTREAM_SHARE)
+    return _scheduler
@@ -2,11 +2,23 @@
 import re
 from typing import List, Optional
 
+from .indicator_groups import indicator_types
+from .stock_universe import get_stock_universe
+from .tracing import traced
 
+
+# A股代码：6位数字
+_SYMBOL_PATTERN = re.compile(r"^\d{6}$")
+
+# 带交易所前缀或后缀的代码：sh600519、SH.600519、600519.SH、000001.sz 等
+_EXCHANGE_PATTERN = re.compile(r"^(?:(?:sh|sz|bj)\.?)?(\d{6})(?:\.(?:sh|ss|sz|bj))?$", re.IGNORECASE)
+
+
+@traced("validate")
 def validate_stock_symbol(symbol: str) -> bool:
     """
-    验证股票代码格式
-    A股代码：6位数字
+    验证股票代码
+    A股代码：6位数字，且在A股列表中（列表不可用时只检查格式）
     """
     if not symbol:
         return False
@@ -15,10 +27,14 @@ def validate_stock_symbol(symbol: str) -> bool:
     symbol = symbol.strip()
     
     # 检查是否为6位数字
-    pattern = r'^\d{6}$'
-    return bool(re.match(pattern, symbol))
+    if not _SYMBOL_PATTERN.match(symbol):
+        return False
+    
+    # 不存在的代码在请求上游前拒绝
+    return get_stock_universe().contains(symbol) is not False
 
 
+@traced("validate")
 def validate_stock_symbols(symbols: List[str], max_count: int = 20) -> tuple[bool, Optional[str]]:
     """
     验证股票代码列表
@@ -37,13 +53,20 @@ def validate_stock_symbols(symbols: List[str], max_count: int = 20) -> tuple[boo
         return False, f"股票代码数量超过限制（最多{max_count}个）"
     
     invalid_symbols = []
+    unknown_symbols = []
+    universe = get_stock_universe()
     for symbol in symbols:
-        if not validate_stock_symbol(symbol):
+        if not symbol or not _SYMBOL_PATTERN.match(symbol.strip()):
             invalid_symbols.append(symbol)
+        elif universe.contains(symbol.strip()) is False:
+            unknown_symbols.append(symbol)
     
     if invalid_symbols:
         return False, f"以下股票代码格式不正确: {', '.join(invalid_symbols)}"
     
+    if unknown_symbols:
+        return False, f"以下股票代码不存在: {', '.join(unknown_symbols)}"
+    
     return True, None
 
 
@@ -54,9 +77,8 @@ def validate_period(period: str) -> bool:
 
 
 def validate_indicator_type(indicator_type: str) -> bool:
-    """验证指标类型"""
-    valid_types = ["basic", "profit", "growth", "debt", "operation", "all"]
-    return indicator_type in valid_types
+    """验证指标类型（内置类型、all 或已加载的自定义指标集）"""
+    return indicator_type in indicator_types()
 
 
 def validate_file_format(file_format: str) -> bool:
@@ -65,9 +87,28 @@ def validate_file_format(file_format: str) -> bool:
     return file_format in valid_formats
 
 
+def validate_adjust(adjust: str) -> bool:
+    """验证复权方式（""不复权、qfq前复权、hfq后复权）"""
+    return adjust in ["", "qfq", "hfq"]
+
+
+def validate_page_size(page_size: int, max_size: int = 10000) -> bool:
+    """验证每页条数（0 表示不分页）"""
+    return isinstance(page_size, int) and 0 <= page_size <= max_size
+
+
 def normalize_symbol(symbol: str) -> str:
-    """标准化股票代码（移除空格等）"""
-    return symbol.strip()
+    """
+    标准化股票代码：移除空格，去掉交易所前缀/后缀（sh600519、600519.SH），
+    股票名称（如"贵州茅台"）转换为代码；无法识别时原样返回（去掉空格）
+    """
+    symbol = str(symbol).strip()
+    match = _EXCHANGE_PATTERN.match(symbol)
+    if match:
+        return match.group(1)
+    if symbol and not symbol.isdigit():
+        return get_stock_universe().code_for_name(symbol) or symbol
+    return symbol
 
 
 def normalize_symbols(symbols: List[str]) -> List[str]:
@@ -0,0 +1,161 @@
+"""估值指标（日K线按财报披露日期与基本面对齐后计算PE/PB/PS）"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .data_source import fetch_dataset
+from .derived_metrics import get_derived_metrics_store
+from .price_history import get_price_history_store
+
+
+OUTPUT_COLUMNS = [
+    "股票代码", "日期", "收盘", "总市值", "市盈率TTM", "市净率", "市销率TTM", "对应报告期"
+]
+
+# 未提供公告日期时按法定披露截止日估计：报告期月份 -> (年份偏移, 截止月, 截止日)
+DISCLOSURE_DEADLINES = {3: (0, 4, 30), 6: (0, 8, 31), 9: (0, 10, 31), 12: (1, 4, 30)}
+
+
+def _disclosure_dates(report_dates: pd.Series, notice_dates: pd.Series) -> pd.Series:
+    """财报披露日期：优先使用公告日期，缺失时使用法定披露截止日"""
+    month = report_dates.dt.month
+    deadline = pd.to_datetime(pd.DataFrame({
+        "year": report_dates.dt.year + month.map({k: v[0] for k, v in DISCLOSURE_DEADLINES.items()}),
+        "month": month.map({k: v[1] for k, v in DISCLOSURE_DEADLINES.items()}),
+        "day": month.map({k: v[2] for k, v in DISCLOSURE_DEADLINES.items()}),
+    }), errors="coerce")
+    return pd.to_datetime(notice_dates, errors="coerce").fillna(deadline)
+
+
+def _statement_frame(symbol: str, dataset: str, columns: List[str]) -> pd.DataFrame:
+    """读取报表的报告期、公告日期和指定列"""
+    df = fetch_dataset(dataset, symbol)
+    if df is None or df.empty or "REPORT_DATE" not in df.columns:
+        return pd.DataFrame()
+    part = df.reindex(columns=["REPORT_DATE", "NOTICE_DATE"] + columns)
+    part["报告期"] = pd.to_datetime(part["REPORT_DATE"], errors="coerce")
+    for column in columns:
+        part[column] = pd.to_numeric(part[column], errors="coerce")
+    return part.drop(columns=["REPORT_DATE"])
+
+
+def build_fundamentals(symbols: List[str]) -> pd.DataFrame:
+    """
+    汇总多只股票估值所需的基本面数据（每行一个报告期）
+
+    Args:
+        symbols: 股票代码列表
+
+    Returns:
+        包含 股票代码、报告期、披露日期、归母净利润TTM、营业总收入TTM、
+        归母净资产、总股本 的DataFrame
+    """
+    # 先读取所有报表，派生指标表只需在之后重新计算一次
+    statements = {
+        symbol: (
+            _statement_frame(symbol, "income", []),
+            _statement_frame(symbol, "balance_sheet", ["TOTAL_PARENT_EQUITY", "SHARE_CAPITAL"])
+        )
+        for symbol in symbols
+    }
+
+    store = get_derived_metrics_store()
+    parts = []
+    for symbol, (income, balance) in statements.items():
+        derived = store.lookup(symbol)
+        if income.empty or derived is None:
+            continue
+
+        part = derived[["报告期", "归母净利润TTM", "营业总收入TTM"]].copy()
+        part["报告期"] = pd.to_datetime(part["报告期"])
+        part = part.merge(income[["报告期", "NOTICE_DATE"]], on="报告期", how="left")
+        if not balance.empty:
+            part = part.merge(
+                balance[["报告期", "TOTAL_PARENT_EQUITY", "SHARE_CAPITAL"]], on="报告期", how="left"
+            )
+        part.insert(0, "股票代码", symbol)
+        parts.append(part)
+
+    if not parts:
+        return pd.DataFrame()
+
+    data = pd.concat(parts, ignore_index=True).reindex(columns=[
+        "股票代码", "报告期", "NOTICE_DATE", "归母净利润TTM", "营业总收入TTM",
+        "TOTAL_PARENT_EQUITY", "SHARE_CAPITAL"
+    ])
+    data["披露日期"] = _disclosure_dates(data["报告期"], data["NOTICE_DATE"])
+    return data.rename(columns={"TOTAL_PARENT_EQUITY": "归母净资产", "SHARE_CAPITAL": "总股本"}).drop(
+        columns=["NOTICE_DATE"]
+    )
+
+
+def compute_valuation(prices: pd.DataFrame, fundamentals: pd.DataFrame) -> pd.DataFrame:
+    """
+    计算估值序列（所有股票一次 as-of 合并，向量化计算）
+
+    每个交易日使用前一日及之前已披露的最新一期财报：
+    总市值 = 收盘价 × 总股本，市盈率TTM = 总市值 / 归母净利润TTM，
+    市净率 = 总市值 / 归母净资产，市销率TTM = 总市值 / 营业总收入TTM。
+    亏损或净资产为负时对应比率为NaN。
+
+    Args:
+        prices: 日K线（股票代码、日期、收盘）
+        fundamentals: build_fundamentals 的结果
+
+    Returns:
+        估值DataFrame，每行对应一只股票的一个交易日
+    """
+    if prices.empty or fundamentals.empty:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    left = prices[["股票代码", "日期", "收盘"]].copy()
+    left["_日期"] = pd.to_datetime(left["日期"])
+    right = fundamentals.dropna(subset=["披露日期"]).copy()
+    # 同一天披露多期（如年报和一季报）时以较新的报告期为准
+    right = right.sort_values(["披露日期", "报告期"]).drop_duplicates(["股票代码", "披露日期"], keep="last")
+
+    data = pd.merge_asof(
+        left.sort_values("_日期"),
+        right,
+        left_on="_日期",
+        right_on="披露日期",
+        by="股票代码",
+        direction="backward",
+        # 财报多在收盘后公告，披露当日仍使用上一期数据
+        allow_exact_matches=False
+    )
+
+    market_cap = data["收盘"] * data["总股本"]
+    data["总市值"] = market_cap.round(2)
+    for column, denominator in [("市盈率TTM", "归母净利润TTM"), ("市净率", "归母净资产"), ("市销率TTM", "营业总收入TTM")]:
+        ratio = market_cap / data[denominator].where(data[denominator] > 0)
+        data[column] = ratio.replace([np.inf, -np.inf], np.nan).round(4)
+
+    data["对应报告期"] = data["报告期"].dt.strftime("%Y-%m-%d")
+    return data.sort_values(["股票代码", "_日期"], ignore_index=True)[OUTPUT_COLUMNS]
+
+
+def valuation_history(symbols: List[str], start: str, end: str) -> pd.DataFrame:
+    """
+    获取多只股票在 [start, end] 内每个交易日的估值
+
+    Args:
+        symbols: 股票代码列表
+        start: 开始日期（YYYY-MM-DD）
+        end: 结束日期（YYYY-MM-DD）
+
+    Returns:
+        估值DataFrame
+    """
+    store = get_price_history_store()
+    prices = []
+    for symbol in symbols:
+        bars = store.get(symbol, start, end)
+        if not bars.empty:
+            prices.append(bars.assign(股票代码=symbol)[["股票代码", "日期", "收盘"]])
+
+    if not prices:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    return compute_valuation(pd.concat(prices, ignore_index=True), build_fundamentals(symbols))
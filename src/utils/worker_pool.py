@@ -0,0 +1,281 @@
+"""多进程工作池（可选，用于CPU密集的解析和序列化）"""
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .arrow_io import HAS_ARROW, TableLike, concat_tables, is_arrow_table, pa, to_arrow_table, to_dataframe
+from .data_formatter import ErrorResponse
+from .settings import WORKER_PROCESSES
+from .upstream_scheduler import (
+    BULK,
+    INTERACTIVE,
+    current_workload,
+    disable_upstream_scheduler,
+    get_upstream_scheduler,
+    workload
+)
+
+
+# 工作进程返回给主进程的共享内存描述：(名称, JSON字节数, Arrow字节数)
+SharedPayload = Tuple[Optional[str], int, int]
+
+
+def _worker_initializer(project_root: str):
+    """
+    工作进程初始化：确保可以导入src包，并执行 AKSHARE_MCP_WORKER_INIT
+    指定的初始化函数（格式 "模块:函数"，例如压测时安装桩数据）
+    """
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+    # 上游并发由主进程在分派任务时统一控制
+    disable_upstream_scheduler()
+
+    hook = os.environ.get("AKSHARE_MCP_WORKER_INIT")
+    if hook:
+        module_name, _, func_name = hook.partition(":")
+        getattr(importlib.import_module(module_name), func_name)()
+
+
+def _write_shared(json_bytes: bytes, arrow_bytes: bytes = b"") -> SharedPayload:
+    """将结果写入共享内存，由主进程读取后释放"""
+    size = len(json_bytes) + len(arrow_bytes)
+    if size == 0:
+        return None, 0, 0
+    shm = shared_memory.SharedMemory(create=True, size=size)
+    try:
+        shm.buf[:len(json_bytes)] = json_bytes
+        shm.buf[len(json_bytes):size] = arrow_bytes
+    finally:
+        shm.close()
+    return shm.name, len(json_bytes), len(arrow_bytes)
+
+
+def _read_shared(payload: SharedPayload) -> Tuple[str, Optional[Any]]:
+    """
+    读取并释放共享内存
+
+    Returns:
+        (JSON文本, Arrow表或None)
+    """
+    name, json_size, arrow_size = payload
+    if name is None:
+        return "", None
+
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        text = bytes(shm.buf[:json_size]).decode("utf-8")
+        table = None
+        if arrow_size and HAS_ARROW:
+            buffer = pa.py_buffer(bytes(shm.buf[json_size:json_size + arrow_size]))
+            table = pa.ipc.open_stream(buffer).read_all()
+        return text, table
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _to_arrow_bytes(df: pd.DataFrame) -> bytes:
+    """DataFrame编码为Arrow IPC流"""
+    table = to_arrow_table(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _combine_parts(parts: List[TableLike]) -> TableLike:
+    """合并各股票的数据（都是Arrow表且类型可以统一时保持为Arrow表，否则合并为DataFrame）"""
+    if all(is_arrow_table(part) for part in parts):
+        try:
+            return concat_tables(parts)
+        except (pa.ArrowException, TypeError):
+            pass
+    return pd.concat(
+        [to_dataframe(part) if is_arrow_table(part) else part for part in parts],
+        ignore_index=True
+    )
+
+
+def _run_tool(module_name: str, func_name: str, kwargs: Dict[str, Any]) -> Tuple[bool, SharedPayload]:
+    """
+    在工作进程中执行返回JSON文本的工具函数
+
+    Returns:
+        (是否为错误响应, 共享内存描述)；str 子类无法经共享内存传回，单独返回标记
+    """
+    func = getattr(importlib.import_module(module_name), func_name)
+    text = func(**kwargs)
+    return isinstance(text, ErrorResponse), _write_shared(text.encode("utf-8"))
+
+
+def _run_batch_item(symbol: str, indicator_type: str, with_table: bool) -> Tuple[bool, SharedPayload]:
+    """
+    在工作进程中获取、简化并序列化单个股票的财务指标
+
+    Returns:
+        (是否成功, 共享内存描述)；JSON部分为单个股票的结果对象，
+        with_table时附带带股票代码列的Arrow IPC数据
+    """
+    from src.tools.batch_data import _fetch_single_stock_frame
+
+    with workload(BULK):
+        df, error = _fetch_single_stock_frame(symbol, indicator_type)
+    if df is None:
+        result = {"symbol": symbol, "error": error, "data": None}
+        arrow_bytes = b""
+    else:
+        data = df.to_dict(orient="records")
+        result = {"symbol": symbol, "data": data, "count": len(data)}
+        arrow_bytes = b""
+        if with_table and HAS_ARROW:
+            try:
+                arrow_bytes = _to_arrow_bytes(df.assign(股票代码=symbol))
+            except (pa.ArrowException, TypeError, ValueError):
+                # 列中混合了无法统一类型的值，由主进程从JSON结果还原
+                arrow_bytes = b""
+
+    json_bytes = json.dumps(result, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+    return df is not None, _write_shared(json_bytes, arrow_bytes)
+
+
+class WorkerPool:
+    """
+    进程池封装
+
+    工作进程完成获取、简化和JSON序列化后，把结果写入共享内存
+    （JSON文本 + 可选的Arrow IPC数据），主进程只接收共享内存名称和长度，
+    不通过pickle传递DataFrame。
+
+    工作进程内不做上游调度：主进程分派每个任务前先在本进程的调度器中
+    占用一个名额，因此上游并发上限和交互查询优先对工作进程同样有效。
+    批量任务最多同时分派 bulk_limit 个（多于一个工作进程时至少留出一个
+    工作进程），其余在主进程中排队，不会占满进程池的任务队列。
+    """
+
+    def __init__(self, processes: int):
+        """
+        初始化进程池
+
+        Args:
+            processes: 工作进程数
+        """
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.processes = processes
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_initializer,
+            initargs=(project_root,)
+        )
+        self._scheduler = get_upstream_scheduler()
+        self._dispatchers: Dict[str, ThreadPoolExecutor] = {}
+        if self._scheduler is not None:
+            bulk_dispatch = self._scheduler.bulk_limit
+            if processes > 1:
+                bulk_dispatch = min(bulk_dispatch, processes - 1)
+            self._dispatchers = {
+                INTERACTIVE: ThreadPoolExecutor(
+                    max_workers=self._scheduler.max_concurrency, thread_name_prefix="dispatch-interactive"
+                ),
+                BULK: ThreadPoolExecutor(max_workers=bulk_dispatch, thread_name_prefix="dispatch-bulk"),
+            }
+
+    def _dispatch(self, name: str, func, *args):
+        """占用调度名额后把任务交给进程池，等待结果（在分派线程中执行）"""
+        with self._scheduler.slot(name):
+            return self._executor.submit(func, *args).result()
+
+    async def _submit(self, name: str, func, *args):
+        """按请求类别分派任务到进程池"""
+        loop = asyncio.get_event_loop()
+        if not self._dispatchers:
+            return await loop.run_in_executor(self._executor, func, *args)
+        return await loop.run_in_executor(self._dispatchers[name], self._dispatch, name, func, *args)
+
+    async def run_tool(self, func, **kwargs) -> str:
+        """
+        在工作进程中执行工具函数
+
+        Args:
+            func: 模块级工具函数（返回JSON文本）
+            **kwargs: 工具参数
+
+        Returns:
+            工具返回的JSON文本（错误响应为 ErrorResponse）
+        """
+        is_error, payload = await self._submit(current_workload(), _run_tool, func.__module__, func.__name__, kwargs)
+        text = _read_shared(payload)[0]
+        return ErrorResponse(text) if is_error else text
+
+    async def run_batch(
+        self,
+        symbols: List[str],
+        indicator_type: str,
+        with_table: bool = False
+    ) -> Tuple[List[str], int, Optional[TableLike]]:
+        """
+        并行获取多个股票的财务指标
+
+        Args:
+            symbols: 股票代码列表
+            indicator_type: 指标类型
+            with_table: 是否同时返回合并后的数据表（用于保存文件）
+
+        Returns:
+            (每个股票已序列化的结果JSON, 成功数, 合并后的数据表或None)；
+            安装pyarrow时数据表为Arrow表（不转换为DataFrame），否则为DataFrame
+        """
+        outcomes = await asyncio.gather(*[
+            self._submit(BULK, _run_batch_item, symbol, indicator_type, with_table)
+            for symbol in symbols
+        ])
+
+        fragments = []
+        parts: List[TableLike] = []
+        success_count = 0
+        for ok, payload in outcomes:
+            text, table = _read_shared(payload)
+            fragments.append(text)
+            success_count += int(ok)
+            if not (with_table and ok):
+                continue
+            if table is not None:
+                parts.append(table)
+            else:
+                # 未安装pyarrow或该股票的数据无法转换为Arrow时从JSON结果还原
+                result = json.loads(text)
+                parts.append(pd.DataFrame(result["data"]).assign(股票代码=result["symbol"]))
+
+        combined = _combine_parts(parts) if parts else None
+        return fragments, success_count, combined
+
+    def shutdown(self):
+        for dispatcher in self._dispatchers.values():
+            dispatcher.shutdown(wait=False, cancel_futures=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> Optional[WorkerPool]:
+    """获取进程池，未启用多进程模式时返回None"""
+    global _pool
+    if WORKER_PROCESSES <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WorkerPool(WORKER_PROCESSES)
+    return _pool
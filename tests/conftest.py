@@ -0,0 +1,34 @@
+"""测试公共配置：数据目录指向临时目录，共享的数据缓存每个测试独立"""
+import os
+import sys
+import tempfile
+
+# settings 在导入时读取环境变量，必须在导入 src 之前设置
+os.environ["AKSHARE_MCP_BASE_PATH"] = tempfile.mkdtemp(prefix="akshare-mcp-test-")
+
+import pytest
+
+from src.utils import data_source
+from src.utils.data_cache import DataCache
+
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+
+
+@pytest.fixture(scope="session")
+def stub_upstream():
+    """以桩数据代替 AKShare 接口（多进程模式下工作进程同样生效）"""
+    os.environ.setdefault("AKSHARE_STUB_LATENCY", "0")
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    import stub_akshare
+    stub_akshare.install()
+    return stub_akshare
+
+
+@pytest.fixture
+def data_cache(tmp_path, monkeypatch):
+    """替换进程内共享的数据缓存（分页、增量响应等通过 get_data_cache 读写）"""
+    cache = DataCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(data_source, "_data_cache", cache)
+    return cache
@@ -0,0 +1,45 @@
+"""缓存查看与维护工具测试"""
+import asyncio
+import json
+
+from src.tools.cache_tools import cleanup_cache, get_cache_stats, invalidate_cache, prefetch_stock_data
+
+
+def _prefetch(symbols, datasets=None) -> dict:
+    return json.loads(asyncio.run(prefetch_stock_data(symbols, datasets)))
+
+
+def test_prefetch_then_stats(data_cache, stub_upstream):
+    result = _prefetch(["600519", "000001"], ["indicators", "income"])
+
+    assert result.get("error") is not True
+    stats = json.loads(get_cache_stats())
+    assert stats["datasets"]["indicators"]["disk_entries"] == 2
+    assert stats["datasets"]["income"]["disk_entries"] == 2
+    assert stats["memory"]["memory_entries"] >= 4
+
+
+def test_invalidate_by_dataset_and_symbol(data_cache, stub_upstream):
+    _prefetch(["600519", "000001"], ["indicators", "income"])
+
+    assert json.loads(invalidate_cache("indicators", "600519"))["removed"] == 1
+    assert data_cache.get("indicators", "600519") is None
+    assert data_cache.get("indicators", "000001") is not None
+    assert json.loads(invalidate_cache("income"))["removed"] == 2
+    assert json.loads(invalidate_cache("indicators"))["removed"] == 1
+
+
+def test_invalidate_rejects_unknown_dataset(data_cache):
+    result = json.loads(invalidate_cache("unknown"))
+
+    assert result["error"] is True
+    assert "数据集不正确" in result["message"]
+
+
+def test_cleanup_enforces_disk_quota(data_cache, stub_upstream):
+    _prefetch(["600519", "000001"], ["indicators"])
+
+    result = json.loads(cleanup_cache(max_size_mb=0))
+
+    assert result["removed"]["cache"] == 2
+    assert data_cache.disk_bytes() == 0
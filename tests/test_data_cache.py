@@ -0,0 +1,257 @@
+"""DataCache 测试"""
+import time
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import data_cache as data_cache_module
+from src.utils.data_cache import (
+    NEGATIVE_EMPTY,
+    NEGATIVE_ERROR,
+    NEGATIVE_TRANSIENT,
+    CachedFetchError,
+    DataCache,
+    classify_error
+)
+
+
+def _frame(value: float = 0.0) -> pd.DataFrame:
+    return pd.DataFrame({"v": np.full(1000, value)})
+
+
+FRAME_BYTES = int(_frame().memory_usage(deep=True).sum())
+
+
+def _in_memory(cache: DataCache, symbol: str) -> bool:
+    return ("ds", symbol) in cache._memory
+
+
+def test_evicts_lowest_cost_per_byte_not_oldest(tmp_path):
+    cache = DataCache(str(tmp_path), max_memory_bytes=int(FRAME_BYTES * 2.5))
+    cache.put("ds", "expensive", _frame(1), cost=10.0)
+    cache.put("ds", "cheap", _frame(2), cost=0.01)
+    cache.put("ds", "new", _frame(3), cost=1.0)
+
+    assert _in_memory(cache, "expensive")
+    assert not _in_memory(cache, "cheap")
+    assert _in_memory(cache, "new")
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["memory_bytes"] <= cache.max_memory_bytes
+    # 被淘汰的数据仍可从磁盘层读回
+    assert cache.get("ds", "cheap")["v"].iloc[0] == 2
+
+
+def test_inflation_ages_out_untouched_entries(tmp_path):
+    cache = DataCache(str(tmp_path), max_memory_bytes=int(FRAME_BYTES * 2.5))
+    cache.put("ds", "stale", _frame(), cost=3.0)
+
+    evicted_after = None
+    for i in range(20):
+        cache.put("ds", f"cheap{i}", _frame(), cost=1.0)
+        if not _in_memory(cache, "stale"):
+            evicted_after = i
+            break
+
+    # 代价较高的条目先于最初的几个低代价条目保留，但不再访问时终究会被淘汰
+    assert evicted_after is not None and evicted_after >= 3
+
+
+def test_touched_entry_outlives_untouched_entry_of_same_cost(tmp_path):
+    cache = DataCache(str(tmp_path), max_memory_bytes=int(FRAME_BYTES * 3.5))
+    cache.put("ds", "a", _frame(), cost=1.0)
+    cache.put("ds", "b", _frame(), cost=1.0)
+    cache.put("ds", "c", _frame(), cost=1.0)
+    cache.put("ds", "d", _frame(), cost=1.0)  # 淘汰 a，抬高基准
+
+    # 不访问时 b 最先被淘汰；访问后优先级叠加当前基准，改为淘汰 c
+    cache.get("ds", "b")
+    cache.put("ds", "e", _frame(), cost=1.0)
+
+    assert _in_memory(cache, "b")
+    assert not _in_memory(cache, "c")
+
+
+def test_entry_larger_than_memory_limit_stays_on_disk(tmp_path):
+    cache = DataCache(str(tmp_path), max_memory_bytes=FRAME_BYTES // 2)
+    cache.put("ds", "big", _frame(7), cost=100.0)
+
+    assert cache.stats()["memory_entries"] == 0
+    assert cache.get("ds", "big")["v"].iloc[0] == 7
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.response = types.SimpleNamespace(status_code=status_code)
+
+
+class _Fetcher:
+    """记录调用次数，依次返回或抛出给定结果"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def __call__(self):
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的时钟（只替换 data_cache 模块中的 time）"""
+    now = [time.time()]
+    monkeypatch.setattr(data_cache_module, "time", types.SimpleNamespace(
+        time=lambda: now[0], perf_counter=time.perf_counter
+    ))
+    return now
+
+
+@pytest.fixture
+def negative_cache(tmp_path):
+    return DataCache(str(tmp_path), negative_ttls={
+        NEGATIVE_EMPTY: 600, NEGATIVE_ERROR: 300, NEGATIVE_TRANSIENT: 10
+    })
+
+
+@pytest.mark.parametrize("error, kind", [
+    (ConnectionError("reset"), NEGATIVE_TRANSIENT),
+    (TimeoutError(), NEGATIVE_TRANSIENT),
+    (_HTTPError(429), NEGATIVE_TRANSIENT),
+    (_HTTPError(503), NEGATIVE_TRANSIENT),
+    (_HTTPError(404), NEGATIVE_ERROR),
+    (KeyError("data"), NEGATIVE_ERROR),
+    (ValueError("parse"), NEGATIVE_ERROR),
+    (RuntimeError("unknown"), NEGATIVE_TRANSIENT),
+])
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+
+
+def test_empty_result_is_cached_until_ttl(negative_cache, clock):
+    fetcher = _Fetcher(pd.DataFrame())
+
+    assert negative_cache.get_or_fetch("ds", "x", fetcher).empty
+    clock[0] += 599
+    assert negative_cache.get_or_fetch("ds", "x", fetcher).empty
+    assert fetcher.calls == 1
+
+    clock[0] += 2
+    negative_cache.get_or_fetch("ds", "x", fetcher)
+    assert fetcher.calls == 2
+
+
+def test_errors_are_cached_per_category(negative_cache, clock):
+    permanent = _Fetcher(KeyError("data"))
+    transient = _Fetcher(ConnectionError("reset"))
+    for symbol, fetcher in [("bad", permanent), ("flaky", transient)]:
+        with pytest.raises(Exception):
+            negative_cache.get_or_fetch("ds", symbol, fetcher)
+
+    clock[0] += 5
+    for symbol, fetcher in [("bad", permanent), ("flaky", transient)]:
+        with pytest.raises(CachedFetchError):
+            negative_cache.get_or_fetch("ds", symbol, fetcher)
+    assert (permanent.calls, transient.calls) == (1, 1)
+
+    # 暂时性错误的有效期较短，过期后重新请求上游
+    clock[0] += 10
+    with pytest.raises(CachedFetchError):
+        negative_cache.get_or_fetch("ds", "bad", permanent)
+    with pytest.raises(ConnectionError):
+        negative_cache.get_or_fetch("ds", "flaky", transient)
+    assert (permanent.calls, transient.calls) == (1, 2)
+
+
+def test_zero_ttl_disables_category(tmp_path):
+    cache = DataCache(str(tmp_path), negative_ttls={NEGATIVE_TRANSIENT: 0})
+    fetcher = _Fetcher(ConnectionError("reset"))
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            cache.get_or_fetch("ds", "x", fetcher)
+
+    assert fetcher.calls == 2
+    assert cache.stats()["negative_entries"] == 0
+
+
+def test_put_clears_negative_entry(negative_cache):
+    negative_cache.get_or_fetch("ds", "x", _Fetcher(pd.DataFrame()))
+    negative_cache.put("ds", "x", _frame(5))
+
+    assert negative_cache.get_or_fetch("ds", "x", _Fetcher(pd.DataFrame()))["v"].iloc[0] == 5
+
+
+@pytest.fixture
+def shared(tmp_path):
+    """共享同一磁盘目录的两个缓存（模拟主进程和工作进程）"""
+    main = DataCache(str(tmp_path))
+    worker = DataCache(str(tmp_path))
+    # 主进程先建立磁盘层索引，之后的写入来自工作进程
+    main.disk_bytes()
+    return main, worker
+
+
+def test_file_written_by_other_process_counts_as_new_generation(shared):
+    main, worker = shared
+    version = main.version("income")
+    worker.put("income", "000001", _frame(1))
+
+    assert main.get("income", "000001")["v"].iloc[0] == 1
+    assert main.version("income") > version
+    assert main.generation("income", "000001") > 0
+
+
+def test_derived_metrics_see_statements_written_by_other_process(shared):
+    from src.utils.derived_metrics import DerivedMetricsStore
+
+    main, worker = shared
+    store = DerivedMetricsStore(main)
+    assert store.lookup("000001") is None
+
+    income = pd.DataFrame({"REPORT_DATE": ["2023-12-31", "2024-03-31"], "PARENT_NETPROFIT": [70.0, 12.0]})
+    worker.put("income", "000001", income)
+    main.get("income", "000001")
+
+    assert store.lookup("000001") is not None
+
+
+def test_memory_entry_dropped_when_other_process_overwrites_or_deletes(shared):
+    main, worker = shared
+    worker.put("ds", "x", _frame(1))
+    assert main.get("ds", "x")["v"].iloc[0] == 1
+
+    time.sleep(0.01)
+    worker.put("ds", "x", _frame(2))
+    assert main.get("ds", "x")["v"].iloc[0] == 2
+
+    worker.invalidate("ds", "x")
+    assert main.get("ds", "x") is None
+    assert worker.get("ds", "x") is None
+
+
+def test_invalidate_and_quota_include_files_of_other_process(shared):
+    main, worker = shared
+    worker.put("indicators", "000002", _frame(1))
+    worker.put("indicators", "000003", _frame(1))
+
+    assert main.disk_bytes() > 0
+    assert main.invalidate("indicators", "000002") == 1
+    assert main.enforce_quota(max_disk_bytes=0) == 1
+    assert main.disk_bytes() == 0
+
+
+def test_invalidate_clears_negative_entries_of_other_process(shared):
+    main, worker = shared
+    fetcher = _Fetcher(pd.DataFrame(), _frame(3))
+    assert worker.get_or_fetch("ds", "x", fetcher).empty
+    assert worker.get_or_fetch("ds", "x", fetcher).empty
+    assert fetcher.calls == 1
+
+    time.sleep(0.01)
+    main.invalidate("ds")
+    assert worker.get_or_fetch("ds", "x", fetcher)["v"].iloc[0] == 3
@@ -0,0 +1,95 @@
+"""响应大小上限测试（截断与分页、增量响应的配合）"""
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from src.utils import data_formatter
+from src.utils.data_formatter import format_dataframe_to_json, rows_within_budget
+from src.utils.delta import diff_since
+from src.utils.result_pages import paginate, resume_page
+
+
+KEY = 'get_stock_income_statement:{"symbol": "600519"}'
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    quarter_ends = ["03-31", "06-30", "09-30", "12-31"]
+    periods = [f"{2000 + i // 4}-{quarter_ends[i % 4]}" for i in range(rows)]
+    return pd.DataFrame({
+        "报告期": periods[::-1],
+        "营业收入": [1000.0 + i for i in range(rows)],
+        "备注": ["x" * 40] * rows,
+    })
+
+
+def test_small_response_is_not_truncated():
+    result = json.loads(format_dataframe_to_json(_frame(5), max_bytes=100000))
+
+    assert result["count"] == 5
+    assert "truncated" not in result
+
+
+def test_large_response_keeps_latest_periods_and_spills_full_data():
+    df = _frame(200)
+    text = format_dataframe_to_json(df, max_bytes=4000)
+    result = json.loads(text)
+
+    truncated = result["truncated"]
+    assert len(text.encode("utf-8")) <= 4000 * 1.2
+    assert truncated["strategies"] == ["latest_periods"]
+    assert result["data"][0]["报告期"] == df["报告期"].iloc[0]
+    assert len(pd.read_csv(truncated["file_path"])) == 200
+
+
+def test_spill_files_are_unique():
+    first = json.loads(format_dataframe_to_json(_frame(200), max_bytes=4000))
+    second = json.loads(format_dataframe_to_json(_frame(200), max_bytes=4000))
+
+    assert first["truncated"]["file_path"] != second["truncated"]["file_path"]
+    assert Path(first["truncated"]["file_path"]).exists()
+
+
+def test_rows_within_budget_shrinks_to_fit():
+    df = _frame(200)
+
+    assert rows_within_budget(df, max_bytes=10 ** 7) == 200
+    assert 1 <= rows_within_budget(df, max_bytes=4000) < 200
+    assert rows_within_budget(df, max_bytes=0) == 200
+
+
+def test_pages_shrink_to_budget_without_skipping_rows(data_cache, monkeypatch):
+    monkeypatch.setattr(data_formatter, "MAX_RESPONSE_BYTES", 4000)
+    df = _frame(200)
+
+    page, info = paginate(KEY, df, 100)
+    pages = [page]
+    while True:
+        result = json.loads(format_dataframe_to_json(page, page=info))
+        # 每页条数已按上限缩小，格式化时不再去掉行
+        assert result["count"] == len(page)
+        if not info["next_cursor"]:
+            break
+        page, info = resume_page(KEY, info["next_cursor"], 100)
+        pages.append(page)
+
+    assert len(pages) > 2
+    pd.testing.assert_frame_equal(pd.concat(pages, ignore_index=True), df)
+
+
+def test_truncated_delta_etag_resends_undelivered_periods(data_cache):
+    df = _frame(200)
+    delivered = set()
+    etag = None
+    for _ in range(50):
+        data, delta = diff_since(KEY, df, etag)
+        if data is None:
+            break
+        result = json.loads(format_dataframe_to_json(data, delta=delta, max_bytes=4000))
+        delivered.update(row["报告期"] for row in result["data"])
+        etag = result["delta"]["etag"]
+        if result["delta"].get("partial"):
+            assert etag != delta["etag"]
+
+    assert data is None and delta["not_modified"]
+    assert delivered == set(df["报告期"])
@@ -0,0 +1,61 @@
+"""增量响应（ETag）测试"""
+import pandas as pd
+
+from src.utils.delta import diff_since
+
+
+KEY = 'get_stock_income_statement:{"symbol": "600519"}'
+
+
+def _frame(values: dict) -> pd.DataFrame:
+    return pd.DataFrame({"报告期": list(values), "净利润": list(values.values())})
+
+
+BASE = {"2024-03-31": 1.0, "2024-06-30": 2.0, "2024-09-30": 3.0}
+
+
+def test_etag_depends_only_on_content(data_cache):
+    _, first = diff_since(KEY, _frame(BASE))
+    _, second = diff_since(KEY, _frame(BASE))
+    _, changed = diff_since(KEY, _frame({**BASE, "2024-09-30": 3.5}))
+
+    assert first["etag"] == second["etag"]
+    assert changed["etag"] != first["etag"]
+    assert len(first["etag"]) == 24
+
+
+def test_unchanged_data_is_not_modified(data_cache):
+    _, info = diff_since(KEY, _frame(BASE))
+    data, delta = diff_since(KEY, _frame(BASE), info["etag"])
+
+    assert data is None
+    assert delta == {"etag": info["etag"], "not_modified": True}
+
+
+def test_returns_only_new_and_revised_periods(data_cache):
+    _, info = diff_since(KEY, _frame(BASE))
+    current = {"2024-06-30": 2.0, "2024-09-30": 3.5, "2024-12-31": 4.0}
+    data, delta = diff_since(KEY, _frame(current), info["etag"])
+
+    assert list(data["报告期"]) == ["2024-09-30", "2024-12-31"]
+    assert delta["full"] is False
+    assert delta["changed"] == 2
+    assert delta["removed"] == ["2024-03-31"]
+    assert delta["since"] == info["etag"]
+
+
+def test_unknown_etag_returns_full_data(data_cache):
+    df = _frame(BASE)
+    data, delta = diff_since(KEY, df, "0" * 24)
+
+    assert data is df
+    assert delta["full"] is True
+
+
+def test_etag_of_other_query_is_not_used(data_cache):
+    _, other = diff_since('get_stock_income_statement:{"symbol": "000001"}', _frame(BASE))
+    df = _frame({**BASE, "2024-12-31": 4.0})
+    data, delta = diff_since(KEY, df, other["etag"])
+
+    assert data is df
+    assert delta["full"] is True
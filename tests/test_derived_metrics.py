@@ -0,0 +1,68 @@
+"""派生指标测试"""
+import pandas as pd
+import pytest
+
+from src.utils import derived_metrics
+from src.utils.data_cache import DataCache
+from src.utils.derived_metrics import SOURCE_COLUMNS, DerivedMetricsStore, compute_derived_metrics
+
+
+def _income(cumulative: dict) -> pd.DataFrame:
+    """{报告期: 累计值}，所有原始列取相同的值"""
+    df = pd.DataFrame({"REPORT_DATE": list(cumulative)})
+    for column in SOURCE_COLUMNS.values():
+        df[column] = list(cumulative.values())
+    return df
+
+
+INCOME = {"2023-03-31": 10.0, "2023-06-30": 25.0, "2023-09-30": 45.0, "2023-12-31": 70.0, "2024-03-31": 12.0}
+
+
+def test_single_quarter_ttm_and_growth():
+    result = compute_derived_metrics({"600519": _income(INCOME)}).set_index("报告期")
+
+    assert list(result["归母净利润(单季)"]) == [10.0, 15.0, 20.0, 25.0, 12.0]
+    assert result.loc["2023-12-31", "归母净利润TTM"] == 70.0
+    # 本期累计 + 上年年报 - 上年同期累计
+    assert result.loc["2024-03-31", "归母净利润TTM"] == 12.0 + 70.0 - 10.0
+    assert result.loc["2024-03-31", "归母净利润同比(%)"] == pytest.approx(20.0)
+    assert pd.isna(result.loc["2023-03-31", "归母净利润TTM"])
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    calls = []
+
+    def recording(frames):
+        calls.append(sorted(frames))
+        return compute_derived_metrics(frames)
+
+    monkeypatch.setattr(derived_metrics, "compute_derived_metrics", recording)
+    store = DerivedMetricsStore(DataCache(str(tmp_path)))
+    store.calls = calls
+    return store
+
+
+def test_refresh_recomputes_only_changed_symbols(store):
+    store.cache.put("income", "600519", _income(INCOME))
+    store.cache.put("income", "000001", _income(INCOME))
+
+    assert store.lookup("600519")["报告期"].iloc[0] == "2024-03-31"
+    assert store.lookup("000001") is not None
+    assert store.calls == [["000001", "600519"]]
+
+    store.cache.put("income", "000001", _income({**INCOME, "2024-06-30": 30.0}))
+    assert store.lookup("000001")["报告期"].iloc[0] == "2024-06-30"
+    assert store.lookup("600519") is not None
+    assert store.calls[1:] == [["000001"]]
+
+
+def test_removed_symbol_is_dropped(store):
+    store.cache.put("income", "600519", _income(INCOME))
+    store.cache.put("income", "000001", _income(INCOME))
+    assert store.lookup("000001") is not None
+
+    store.cache.invalidate("income", "000001")
+
+    assert store.lookup("000001") is None
+    assert store.lookup("600519") is not None
@@ -0,0 +1,88 @@
+"""文件目录索引测试"""
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from src.utils.file_catalog import FileCatalog
+from src.utils.file_manager import FileManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return FileManager(str(tmp_path))
+
+
+def _age(path: str, days: float):
+    """把文件的修改时间往前调"""
+    mtime = time.time() - days * 86400
+    os.utime(path, (mtime, mtime))
+
+
+def test_initial_scan_indexes_existing_files(tmp_path):
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    (exports / "a.csv").write_text("x" * 10)
+    (exports / "b.csv").write_text("x" * 5)
+
+    catalog = FileCatalog(str(tmp_path / "catalog.sqlite3"), {"exports": exports})
+
+    assert catalog.total_size(["exports"]) == 15
+    assert sorted(row[1] for row in catalog.latest("exports", 10)) == ["a.csv", "b.csv"]
+
+
+def test_classify_unmanaged_path_as_external(tmp_path):
+    catalog = FileCatalog(str(tmp_path / "catalog.sqlite3"), {"exports": tmp_path / "exports"})
+
+    assert catalog.classify(tmp_path / "exports" / "a.csv") == "exports"
+    assert catalog.classify(tmp_path / "other" / "a.csv") == "external"
+
+
+def test_record_latest_older_than_and_remove(tmp_path):
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    catalog = FileCatalog(str(tmp_path / "catalog.sqlite3"), {"exports": exports})
+    old, new = exports / "old.csv", exports / "new.csv"
+    old.write_text("old")
+    new.write_text("newer")
+    _age(str(old), 10)
+    catalog.record(str(old))
+    catalog.record(str(new))
+
+    assert [row[1] for row in catalog.latest("exports", 10)] == ["new.csv", "old.csv"]
+    assert [row[1] for row in catalog.latest("exports", 1)] == ["new.csv"]
+    assert catalog.older_than("exports", time.time() - 86400) == [str(old)]
+
+    catalog.remove([str(old)])
+    assert catalog.total_size(["exports"]) == len("newer")
+
+    # 同一路径再次记录时覆盖原记录
+    new.write_text("rewritten")
+    catalog.record(str(new))
+    assert catalog.total_size(["exports"]) == len("rewritten")
+
+
+def test_file_manager_lists_and_sizes_from_catalog(manager):
+    df = pd.DataFrame({"code": ["600519", "000001"], "value": [1.0, 2.0]})
+    path = manager.save_dataframe(df, "export", ["600519"], "csv")
+
+    files = manager.list_files("exports")
+    assert [item["path"] for item in files] == [path]
+    assert files[0]["size_bytes"] == os.path.getsize(path)
+    assert manager.get_directory_size("exports") == os.path.getsize(path)
+    assert manager.list_files("unknown") == []
+    assert manager.get_directory_size("unknown") == 0
+
+
+def test_cleanup_old_files_removes_expired_entries(manager):
+    df = pd.DataFrame({"code": ["600519"]})
+    old = manager.save_dataframe(df, "old", output_path=str(manager.batch_dir / "old.csv"))
+    new = manager.save_dataframe(df, "new", output_path=str(manager.batch_dir / "new.csv"))
+    _age(old, 30)
+    manager.catalog.record(old)
+
+    assert manager.cleanup_old_files(max_age_days=7, directory="batch") == 1
+    assert not os.path.exists(old)
+    assert [item["path"] for item in manager.list_files("batch")] == [new]
+    assert manager.cleanup_old_files(directory="unknown") is None
@@ -0,0 +1,77 @@
+"""异步文件导出测试"""
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+from src.utils.arrow_io import HAS_ARROW, to_arrow_table
+from src.utils.file_manager import FileManager
+
+
+FRAME = pd.DataFrame({"股票代码": ["600519", "000001"], "净利润": [1.5, None]})
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return FileManager(str(tmp_path))
+
+
+@pytest.mark.parametrize("format", ["csv", "json", "excel"])
+def test_async_save_matches_sync_save(manager, format):
+    sync_path = manager.save_dataframe(FRAME, "export", output_path=str(manager.exports_dir / f"sync.{format}"), format=format)
+    async_path = asyncio.run(manager.save_dataframe_async(
+        FRAME, "export", output_path=str(manager.exports_dir / f"async.{format}"), format=format
+    ))
+
+    if format == "excel":
+        pd.testing.assert_frame_equal(pd.read_excel(async_path), pd.read_excel(sync_path))
+    else:
+        with open(sync_path, "rb") as sync_file, open(async_path, "rb") as async_file:
+            assert async_file.read() == sync_file.read()
+    assert {item["path"] for item in manager.list_files("exports")} == {sync_path, async_path}
+
+
+@pytest.mark.skipif(not HAS_ARROW, reason="需要pyarrow")
+def test_async_save_writes_arrow_tables(manager):
+    path = asyncio.run(manager.save_dataframe_async(to_arrow_table(FRAME), "export", ["600519"]))
+
+    saved = pd.read_csv(path, dtype={"股票代码": str}, encoding="utf-8-sig")
+    pd.testing.assert_frame_equal(saved, FRAME)
+
+
+def test_async_save_json(manager):
+    data = {"symbol": "600519", "data": [{"净利润": 1.5}]}
+
+    path = asyncio.run(manager.save_json_async(data, "export", ["600519"]))
+
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == data
+    assert [item["path"] for item in manager.list_files("exports")] == [path]
+
+
+def test_async_save_rejects_empty_data(manager):
+    with pytest.raises(ValueError):
+        asyncio.run(manager.save_dataframe_async(FRAME.head(0), "export"))
+
+
+def test_failed_async_save_leaves_no_partial_file(manager):
+    with pytest.raises(Exception, match="不支持的文件格式"):
+        asyncio.run(manager.save_dataframe_async(FRAME, "export", format="parquet"))
+
+    assert list(manager.exports_dir.iterdir()) == []
+    assert manager.list_files("exports") == []
+
+
+def test_concurrent_async_saves(manager):
+    async def run():
+        return await asyncio.gather(*(
+            manager.save_dataframe_async(FRAME, "export", output_path=str(manager.exports_dir / f"{i}.csv"))
+            for i in range(5)
+        ))
+
+    paths = asyncio.run(run())
+
+    assert len(set(paths)) == 5
+    assert len(manager.list_files("exports")) == 5
+    assert sorted(path.name for path in manager.exports_dir.iterdir()) == [f"{i}.csv" for i in range(5)]
@@ -0,0 +1,68 @@
+"""HTTP传输测试：多个客户端连接同一个服务进程"""
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import pandas as pd
+import pytest
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from src import server
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(params=["sse", "streamable-http"])
+def http_server(request, data_cache):
+    """在后台线程中启动HTTP服务，返回 (传输方式, 地址)"""
+    transport = request.param
+    port = _free_port()
+    config = uvicorn.Config(server._create_http_app(transport), host="127.0.0.1", port=port, log_level="warning")
+    uvicorn_server = uvicorn.Server(config)
+    thread = threading.Thread(target=uvicorn_server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not uvicorn_server.started:
+        assert time.time() < deadline, "HTTP服务启动超时"
+        time.sleep(0.05)
+
+    path = "/sse" if transport == "sse" else "/mcp/"
+    yield transport, f"http://127.0.0.1:{port}{path}"
+
+    uvicorn_server.should_exit = True
+    thread.join(timeout=10)
+
+
+async def _session_stats(transport: str, url: str) -> tuple:
+    """建立一个客户端会话，返回 (工具名列表, 缓存统计)"""
+    client = sse_client(url) if transport == "sse" else streamablehttp_client(url)
+    async with client as streams:
+        async with ClientSession(streams[0], streams[1]) as session:
+            await session.initialize()
+            tools = await session.list_tools()
+            result = await session.call_tool("get_cache_stats", {})
+    return [tool.name for tool in tools.tools], json.loads(result.content[0].text)
+
+
+def test_concurrent_clients_share_one_process(http_server, data_cache):
+    transport, url = http_server
+    data_cache.put("indicators", "600519", pd.DataFrame({"value": [1.0]}))
+
+    async def run():
+        return await asyncio.gather(*(_session_stats(transport, url) for _ in range(3)))
+
+    results = asyncio.run(run())
+
+    for tool_names, stats in results:
+        assert "get_stock_financial_indicators" in tool_names
+        # 各会话读到的是同一个进程内的数据缓存
+        assert stats["datasets"]["indicators"]["disk_entries"] == 1
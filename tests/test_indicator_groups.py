@@ -0,0 +1,66 @@
+"""指标列分组测试"""
+import json
+
+import pandas as pd
+import pytest
+
+from src.utils.indicator_groups import IndicatorGroups, _load_indicator_sets, normalize_column
+
+
+COLUMNS = ("日期", "ROE(%)", "摊薄每股收益(元)", "应收帐款周转率(次)", "总资产增长率(%)", "资产负债率(%)", "备注")
+
+
+def test_normalize_column_strips_units_and_applies_aliases():
+    assert normalize_column("ROE(%)") == "净资产收益率"
+    assert normalize_column("roe") == "净资产收益率"
+    assert normalize_column("毛利率（%）") == "销售毛利率"
+    assert normalize_column("应收帐款 周转率") == "应收账款周转率"
+    assert normalize_column("营业总收入同比增长率(%)") == "营业收入增长率"
+
+
+def test_resolve_groups_aliased_columns_with_ids_first():
+    resolved = IndicatorGroups().resolve(COLUMNS)
+
+    assert resolved["basic"] == ["日期", "摊薄每股收益(元)"]
+    assert resolved["profit"] == ["日期", "ROE(%)"]
+    assert resolved["growth"] == ["日期", "总资产增长率(%)"]
+    assert resolved["debt"] == ["日期", "资产负债率(%)"]
+    assert resolved["operation"] == ["日期", "应收帐款周转率(次)"]
+
+
+def test_resolve_is_cached_per_column_layout():
+    groups = IndicatorGroups()
+
+    assert groups.resolve(COLUMNS) is groups.resolve(COLUMNS)
+    assert groups.resolve(COLUMNS[:2]) is not groups.resolve(COLUMNS)
+
+
+def test_select_returns_original_frame_when_nothing_matches():
+    groups = IndicatorGroups()
+    df = pd.DataFrame({"日期": ["2024-03-31"], "备注": ["-"]})
+
+    assert groups.select(df, "all") is df
+    assert groups.select(df, "profit") is df
+    assert list(groups.select(pd.DataFrame(columns=list(COLUMNS)), "debt").columns) == ["日期", "资产负债率(%)"]
+
+
+def test_register_custom_set_invalidates_resolved_layouts():
+    groups = IndicatorGroups()
+    groups.resolve(COLUMNS)
+
+    groups.register("quality", ["净资产收益率", "资产负债率"])
+
+    assert "quality" in groups.names
+    assert groups.resolve(COLUMNS)["quality"] == ["日期", "ROE(%)", "资产负债率(%)"]
+    with pytest.raises(ValueError):
+        groups.register("empty", [])
+
+
+def test_load_indicator_sets_from_file(tmp_path):
+    path = tmp_path / "sets.json"
+    path.write_text(json.dumps({"core": ["EPS", "ROE"]}), encoding="utf-8")
+    groups = IndicatorGroups()
+
+    _load_indicator_sets(groups, str(path))
+
+    assert groups.resolve(COLUMNS)["core"] == ["日期", "ROE(%)", "摊薄每股收益(元)"]
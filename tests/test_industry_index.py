@@ -0,0 +1,108 @@
+"""行业分类索引与同业对比测试"""
+import json
+
+import pandas as pd
+import pytest
+
+from src.tools.peer_data import compare_peers
+from src.utils import industry_index, spot_quotes
+from src.utils.industry_index import INDUSTRY_MEMBERS_DATASET, IndustryIndex
+from src.utils.spot_quotes import SpotQuotes
+
+
+def _profile(industry: str) -> pd.DataFrame:
+    return pd.DataFrame({"item": ["股票代码", "行业"], "value": ["-", industry]})
+
+
+@pytest.fixture
+def index(data_cache, monkeypatch):
+    index = IndustryIndex(data_cache)
+    monkeypatch.setattr(industry_index, "_index", index)
+    return index
+
+
+@pytest.fixture
+def profile_reads(data_cache, monkeypatch):
+    """记录索引每次从缓存读取了哪些股票的个股信息"""
+    reads = []
+    items = data_cache.items
+
+    def recording(dataset, symbols=None):
+        reads.append(sorted(symbols))
+        return items(dataset, symbols)
+
+    monkeypatch.setattr(data_cache, "items", recording)
+    return reads
+
+
+def test_refresh_reads_only_changed_profiles(index, data_cache, profile_reads):
+    data_cache.put("profile", "600519", _profile("白酒"))
+    data_cache.put("profile", "000858", _profile("白酒"))
+    assert index.industries() == {"白酒": 2}
+
+    data_cache.put("profile", "000858", _profile("饮料"))
+    data_cache.put("profile", "000001", _profile("银行"))
+    assert index.industry("000858") == "饮料"
+    assert index.industries() == {"白酒": 1, "饮料": 1, "银行": 1}
+
+    data_cache.invalidate("profile", "000001")
+    assert index.industries() == {"白酒": 1, "饮料": 1}
+    assert profile_reads == [["000858", "600519"], ["000001", "000858"], []]
+
+
+def test_refresh_skips_unchanged_cache(index, data_cache, profile_reads):
+    data_cache.put("profile", "600519", _profile("白酒"))
+    index.refresh()
+    index.refresh()
+
+    assert profile_reads == [["600519"]]
+
+
+def test_members_merge_board_constituents(index, data_cache, monkeypatch):
+    data_cache.put("profile", "600519", _profile("白酒"))
+    calls = []
+
+    def board(name, symbol):
+        calls.append(symbol)
+        return pd.DataFrame({"代码": ["000858", "000568"]})
+
+    monkeypatch.setattr(industry_index, "call_upstream", board)
+
+    assert index.members("白酒") == ["000568", "000858", "600519"]
+    assert index.members("白酒") == ["000568", "000858", "600519"]
+    assert calls == ["白酒"]
+    assert data_cache.get(INDUSTRY_MEMBERS_DATASET, "白酒") is not None
+
+
+def test_members_fall_back_to_index_when_board_fails(index, data_cache, monkeypatch):
+    data_cache.put("profile", "600519", _profile("白酒"))
+
+    def board(name, symbol):
+        raise ConnectionError("upstream down")
+
+    monkeypatch.setattr(industry_index, "call_upstream", board)
+
+    assert index.members("白酒") == ["600519"]
+
+
+def test_compare_peers_ranks_target_among_industry(index, stub_upstream, monkeypatch):
+    monkeypatch.setattr(spot_quotes, "_spot_quotes", SpotQuotes(ttl_seconds=60))
+
+    result = json.loads(compare_peers("000001", sort_by="总市值", max_peers=5))
+
+    assert result.get("error") is not True
+    assert result["industry"] == stub_upstream._industry("000001")
+    assert result["count"] == 5
+    assert "000001" in [row["代码"] for row in result["data"]]
+    assert [row["排名"] for row in result["data"]] == [1, 2, 3, 4, 5]
+    market_caps = [row["总市值"] for row in result["data"]]
+    assert market_caps == sorted(market_caps, reverse=True)
+    assert result["target_ranks"]["总市值"].endswith("/5")
+    assert "净资产收益率(%)" in result["data"][0]
+
+
+def test_compare_peers_rejects_unknown_sort_column(index, stub_upstream):
+    result = json.loads(compare_peers("000001", sort_by="成交量"))
+
+    assert result["error"] is True
+    assert "排序列不正确" in result["message"]
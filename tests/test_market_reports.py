@@ -0,0 +1,126 @@
+"""全市场报告期数据测试"""
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from src.utils import market_reports
+from src.utils.market_reports import (
+    MarketReportStore,
+    is_final,
+    parse_report_period,
+    quarter_end,
+    recent_periods
+)
+
+
+FINAL = date(2023, 12, 31)
+# 披露截止日还未到的报告期，不会定稿
+OPEN = date(date.today().year + 1, 3, 31)
+
+
+class FakeReports:
+    """按报告期返回全市场数据的接口替代，记录调用"""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = set()
+        self.value = 1.0
+
+    def __call__(self, name, date):
+        self.calls.append((name, date))
+        if date in self.fail:
+            raise ConnectionError("upstream down")
+        return pd.DataFrame({
+            "序号": [1, 2],
+            "股票代码": [600519, 1],
+            "每股收益": [self.value, self.value / 10],
+            "最新公告日期": ["2024-04-30 00:00:00", None],
+        })
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = FakeReports()
+    monkeypatch.setattr(market_reports, "call_upstream", fake)
+    return fake
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MarketReportStore(str(tmp_path / "market_reports"))
+
+
+def test_report_periods():
+    assert quarter_end(date(2024, 5, 15)) == date(2024, 3, 31)
+    assert quarter_end(date(2024, 6, 30)) == date(2024, 6, 30)
+    assert quarter_end(date(2024, 2, 1)) == date(2023, 12, 31)
+    assert recent_periods(3, date(2024, 8, 1)) == [date(2024, 6, 30), date(2024, 3, 31), date(2023, 12, 31)]
+    assert parse_report_period("20240930") == date(2024, 9, 30)
+    with pytest.raises(ValueError):
+        parse_report_period("2024-09-29")
+
+
+def test_is_final_after_disclosure_deadline():
+    # 年报披露截止日为次年4月30日
+    assert not is_final(FINAL, date(2024, 5, 30))
+    assert is_final(FINAL, date(2024, 5, 31))
+    assert not is_final(date(2024, 3, 31), date(2024, 5, 30))
+    assert is_final(date(2024, 3, 31), date(2024, 5, 31))
+
+
+def test_ingest_skips_final_periods(store, upstream):
+    first = store.ingest(["performance"], [FINAL, OPEN])
+
+    assert first["upstream_calls"] == 2
+    assert first["rows"] == {"performance": {FINAL.isoformat(): 2, OPEN.isoformat(): 2}}
+    assert first["skipped_final"] == []
+
+    second = store.ingest(["performance"], [FINAL, OPEN])
+    assert second["upstream_calls"] == 1
+    assert second["skipped_final"] == [f"performance:{FINAL.isoformat()}"]
+    assert upstream.calls[-1] == ("stock_yjbb_em", OPEN.strftime("%Y%m%d"))
+
+    refreshed = store.ingest(["performance"], [FINAL, OPEN], refresh=True)
+    assert refreshed["upstream_calls"] == 2
+    assert len(upstream.calls) == 5
+
+
+def test_final_flag_survives_restart(store, upstream, tmp_path):
+    store.ingest(["performance"], [FINAL])
+
+    reopened = MarketReportStore(str(tmp_path / "market_reports"))
+    result = reopened.ingest(["performance"], [FINAL])
+
+    assert result["upstream_calls"] == 0
+    assert reopened.stored_periods("performance") == [FINAL.isoformat()]
+
+
+def test_failed_periods_are_reported_and_retried(store, upstream):
+    upstream.fail.add(FINAL.strftime("%Y%m%d"))
+
+    result = store.ingest(["performance"], [FINAL])
+
+    assert result["errors"] == {f"performance:{FINAL.isoformat()}": "upstream down"}
+    assert store.stored_periods("performance") == []
+    upstream.fail.clear()
+    assert store.ingest(["performance"], [FINAL])["upstream_calls"] == 1
+
+
+def test_market_and_history_read_stored_periods(store, upstream):
+    store.ingest(["performance"], [FINAL, OPEN])
+
+    period, df = store.market("performance")
+    assert period == OPEN.isoformat()
+    assert df["股票代码"].tolist() == ["600519", "000001"]
+    assert "序号" not in df.columns
+    assert df["最新公告日期"].tolist()[0] == "2024-04-30"
+
+    history = store.history("performance", ["600519"])
+    assert history["报告期"].tolist() == [OPEN.isoformat(), FINAL.isoformat()]
+
+    # 重新获取后按股票查询读到新数据
+    upstream.value = 2.0
+    store.ingest(["performance"], [OPEN])
+    assert store.history("performance", ["600519"])["每股收益"].tolist() == [2.0, 1.0]
+    assert store.market("performance", date(2020, 3, 31))[1].empty
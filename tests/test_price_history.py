@@ -0,0 +1,115 @@
+"""日K线存储测试（上游以内存中的K线代替）"""
+import pandas as pd
+import pytest
+
+from src.utils import price_history
+from src.utils.price_history import PriceHistoryStore
+
+
+class FakeUpstream:
+    """2024年的工作日K线，收盘价 = 日序号 × factor"""
+
+    def __init__(self):
+        self.calls = []
+        self.factor = 1.0
+        days = pd.bdate_range("2024-01-01", "2024-12-31")
+        self.bars = pd.DataFrame({"日期": days.strftime("%Y-%m-%d"), "序号": range(1, len(days) + 1)})
+
+    def __call__(self, symbol, start, end, adjust):
+        if start > end:
+            return pd.DataFrame()
+        self.calls.append((start, end))
+        bars = self.bars[(self.bars["日期"] >= start) & (self.bars["日期"] <= end)]
+        return pd.DataFrame({"日期": bars["日期"], "收盘": bars["序号"] * self.factor}).reset_index(drop=True)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = FakeUpstream()
+    monkeypatch.setattr(PriceHistoryStore, "_fetch", staticmethod(fake))
+    monkeypatch.setattr(price_history, "get_offline_bundle", lambda: None)
+    return fake
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceHistoryStore(str(tmp_path / "history"))
+
+
+def _expected(upstream: FakeUpstream, start: str, end: str) -> pd.Series:
+    bars = upstream.bars
+    return bars[(bars["日期"] >= start) & (bars["日期"] <= end)]["日期"].reset_index(drop=True)
+
+
+def _expected_closes(upstream: FakeUpstream, start: str, end: str) -> pd.Series:
+    bars = upstream.bars
+    selected = bars[(bars["日期"] >= start) & (bars["日期"] <= end)]
+    return (selected["序号"] * upstream.factor).reset_index(drop=True)
+
+
+def test_covered_range_is_not_fetched_again(store, upstream):
+    first = store.get("600519", "2024-01-01", "2024-01-31")
+    second = store.get("600519", "2024-01-10", "2024-01-20")
+
+    assert upstream.calls == [("2024-01-01", "2024-01-31")]
+    assert list(first["日期"]) == list(_expected(upstream, "2024-01-01", "2024-01-31"))
+    assert list(second["日期"]) == list(_expected(upstream, "2024-01-10", "2024-01-20"))
+
+
+def test_extends_forward_from_last_stored_bar(store, upstream):
+    store.get("600519", "2024-01-01", "2024-01-31")
+    df = store.get("600519", "2024-01-01", "2024-03-31")
+
+    # 从最后一根已存储K线（1月31日）开始获取，用于检查复权价格是否变化
+    assert upstream.calls[1] == ("2024-01-31", "2024-03-31")
+    assert list(df["日期"]) == list(_expected(upstream, "2024-01-01", "2024-03-31"))
+    assert not df["日期"].duplicated().any()
+
+
+def test_extends_backward_with_only_missing_dates(store, upstream):
+    store.get("600519", "2024-03-01", "2024-03-31")
+    df = store.get("600519", "2024-02-01", "2024-03-31")
+
+    # 获取到第一根已存储K线（3月1日）为止，用于检查复权价格是否变化
+    assert upstream.calls[1] == ("2024-02-01", "2024-03-01")
+    assert list(df["日期"]) == list(_expected(upstream, "2024-02-01", "2024-03-31"))
+
+
+def test_adjusted_price_change_rebuilds_store(store, upstream):
+    store.get("600519", "2024-01-01", "2024-01-31")
+    upstream.factor = 0.5
+    df = store.get("600519", "2024-01-01", "2024-02-29")
+
+    # 最后一根已存储K线的价格变化后从头重新获取
+    assert upstream.calls[-1] == ("2024-01-01", "2024-02-29")
+    assert df["收盘"].iloc[0] == 0.5
+    assert list(df["日期"]) == list(_expected(upstream, "2024-01-01", "2024-02-29"))
+
+
+def test_adjusted_price_change_on_backward_extension_rebuilds_store(store, upstream):
+    store.get("600519", "2024-03-01", "2024-03-31")
+    upstream.factor = 0.5
+    df = store.get("600519", "2024-02-01", "2024-02-29")
+
+    # 只向前扩展也检查第一根已存储K线，不把新旧复权基准的K线混在一起
+    assert upstream.calls[-1] == ("2024-02-01", "2024-03-31")
+    stored = store.get("600519", "2024-02-01", "2024-03-31")
+    assert (stored["收盘"] == _expected_closes(upstream, "2024-02-01", "2024-03-31")).all()
+    assert list(df["日期"]) == list(_expected(upstream, "2024-02-01", "2024-02-29"))
+
+
+def test_offline_coverage_stops_at_last_bundled_bar(store, upstream, monkeypatch):
+    monkeypatch.setattr(price_history, "get_offline_bundle", lambda: object())
+    bundled = upstream.bars
+    upstream.bars = bundled[bundled["日期"] <= "2024-06-28"]
+
+    store.get("600519", "2024-06-01", "2024-09-30")
+    assert store._read_coverage(store._directory("600519", ""))["end"] == "2024-06-28"
+
+    # 恢复在线后补齐数据包之后的日期
+    monkeypatch.setattr(price_history, "get_offline_bundle", lambda: None)
+    upstream.bars = bundled
+    df = store.get("600519", "2024-06-01", "2024-09-30")
+
+    assert upstream.calls[-1] == ("2024-06-28", "2024-09-30")
+    assert list(df["日期"]) == list(_expected(upstream, "2024-06-01", "2024-09-30"))
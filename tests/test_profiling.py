@@ -0,0 +1,35 @@
+"""性能剖析开关测试"""
+import pytest
+
+from src.utils import profiling
+from src.utils.profiling import PROFILE_ARGUMENT, start_profile
+
+
+@pytest.fixture(autouse=True)
+def no_default_profiling(monkeypatch):
+    monkeypatch.setattr(profiling, "_ALL_TOOLS", False)
+    monkeypatch.setattr(profiling, "_TOOLS", frozenset())
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_PERCENT", 0)
+
+
+@pytest.mark.parametrize("value", [True, "true", "TRUE", "1", "yes", "on"])
+def test_truthy_flag_starts_profile(value):
+    arguments = {"symbol": "600519", PROFILE_ARGUMENT: value}
+
+    assert start_profile("get_stock_financial_indicators", arguments) is not None
+    assert arguments == {"symbol": "600519"}
+
+
+@pytest.mark.parametrize("value", [False, "false", "False", "0", "no", "", None, 1, "random"])
+def test_other_values_do_not_profile(value):
+    arguments = {"symbol": "600519", PROFILE_ARGUMENT: value}
+
+    assert start_profile("get_stock_financial_indicators", arguments) is None
+    assert PROFILE_ARGUMENT not in arguments
+
+
+def test_configured_tools_are_profiled(monkeypatch):
+    monkeypatch.setattr(profiling, "_TOOLS", frozenset({"search_stock"}))
+
+    assert start_profile("search_stock", {}) is not None
+    assert start_profile("get_stock_financial_indicators", {}) is None
@@ -0,0 +1,142 @@
+"""工具响应缓存测试"""
+import asyncio
+import json
+import time
+import types
+
+import pandas as pd
+import pytest
+from mcp.types import TextContent
+
+from src.utils import response_cache as response_cache_module
+from src.utils.data_formatter import ErrorResponse, format_dict_to_json, format_error
+from src.utils.response_cache import ResponseCache, response_key
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(max_bytes=10000, ttl_seconds=60, compress_bytes=1000)
+
+
+def test_key_ignores_argument_order_and_none_values():
+    assert response_key("tool", {"symbol": "600519", "indicator_type": "all"}) == \
+        response_key("tool", {"indicator_type": "all", "symbol": "600519", "cursor": None})
+    assert response_key("tool", {"symbol": "600519"}) != response_key("tool", {"symbol": "000001"})
+    assert response_key("tool", {"symbol": "600519"}) != response_key("other", {"symbol": "600519"})
+
+
+def test_hit_requires_same_stamps(cache):
+    cache.put("k", (1, 2), "响应")
+
+    assert cache.get("k", (1, 2)) == "响应"
+    assert cache.get("k", (1, 3)) is None
+    # 版本号不一致的条目直接删除
+    assert cache.get("k", (1, 2)) is None
+
+
+def test_data_cache_write_invalidates_response(cache, data_cache):
+    data_cache.put("income", "600519", pd.DataFrame({"v": [1]}))
+    stamps = (data_cache.generation("income", "600519"),)
+    cache.put("k", stamps, "响应")
+
+    data_cache.put("income", "600519", pd.DataFrame({"v": [2]}))
+    assert cache.get("k", (data_cache.generation("income", "600519"),)) is None
+
+    cache.put("k", (data_cache.generation("income", "600519"),), "响应")
+    data_cache.invalidate("income", "600519")
+    assert cache.get("k", (data_cache.generation("income", "600519"),)) is None
+
+
+def test_entries_expire_after_ttl(cache, monkeypatch):
+    now = [time.time()]
+    monkeypatch.setattr(response_cache_module, "time", types.SimpleNamespace(time=lambda: now[0]))
+    cache.put("k", (), "响应")
+
+    now[0] += 59
+    assert cache.get("k", ()) == "响应"
+    now[0] += 1
+    assert cache.get("k", ()) is None
+
+
+def test_large_responses_are_compressed(cache):
+    text = "数据" * 2000
+    cache.put("k", (), text)
+
+    assert cache.get("k", ()) == text
+    assert cache.stats()["bytes"] < len(text.encode("utf-8"))
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = ResponseCache(max_bytes=250, ttl_seconds=60, compress_bytes=0)
+    for key in "abc":
+        cache.put(key, (), key * 100)
+    assert cache.get("a", ()) is None
+
+    cache.get("b", ())
+    cache.put("d", (), "d" * 100)
+    assert cache.get("b", ()) == "b" * 100
+    assert cache.get("c", ()) is None
+    assert cache.stats()["bytes"] <= 250
+
+
+def test_oversized_response_is_not_stored():
+    cache = ResponseCache(max_bytes=100, ttl_seconds=60, compress_bytes=0)
+    cache.put("k", (), "x" * 101)
+
+    assert cache.get("k", ()) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_format_error_is_marked():
+    assert isinstance(format_error("获取数据失败"), ErrorResponse)
+    assert not isinstance(format_dict_to_json({"error": True}), ErrorResponse)
+
+
+@pytest.fixture
+def server_cache(monkeypatch):
+    from src import server
+
+    cache = ResponseCache(max_bytes=100000, ttl_seconds=60, compress_bytes=0)
+    monkeypatch.setattr(server, "get_response_cache", lambda: cache)
+    return server, cache
+
+
+def _fake_call_tool(text: str, is_error: bool):
+    async def fake_call_tool(name, arguments):
+        fake_call_tool.calls += 1
+        return [TextContent(type="text", text=text)], is_error
+
+    fake_call_tool.calls = 0
+    return fake_call_tool
+
+
+def test_successful_responses_are_cached_whatever_their_shape(server_cache, monkeypatch):
+    server, cache = server_cache
+    fake = _fake_call_tool('["600519", "000001"]', False)
+    monkeypatch.setattr(server, "_call_tool", fake)
+
+    for _ in range(2):
+        result = asyncio.run(server._cached_call_tool("search_stock", {"keyword": "银行"}))
+        assert result[0].text == '["600519", "000001"]'
+    assert fake.calls == 1
+
+
+def test_error_responses_are_not_cached(server_cache, monkeypatch):
+    server, cache = server_cache
+    fake = _fake_call_tool(format_error("获取数据失败"), True)
+    monkeypatch.setattr(server, "_call_tool", fake)
+
+    for _ in range(2):
+        asyncio.run(server._cached_call_tool("search_stock", {"keyword": "银行"}))
+    assert fake.calls == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_call_tool_flags_errors():
+    from src import server
+
+    result, is_error = asyncio.run(server._call_tool("no_such_tool", {}))
+    assert is_error and "未知工具" in result[0].text
+
+    result, is_error = asyncio.run(server._call_tool("get_stock_derived_metrics", {"symbol": "bad"}))
+    assert is_error and json.loads(result[0].text)["error"] is True
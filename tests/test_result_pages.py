@@ -0,0 +1,73 @@
+"""分页游标测试"""
+import pandas as pd
+import pytest
+
+from src.utils.result_pages import PAGES_DATASET, paginate, resume_page
+
+
+KEY = 'get_stock_income_statement:{"symbol": "600519"}'
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"报告期": [f"p{i:04d}" for i in range(rows)], "值": range(rows)})
+
+
+def _all_pages(key: str, df: pd.DataFrame, page_size: int):
+    page, info = paginate(key, df, page_size)
+    pages = [page]
+    while info["next_cursor"]:
+        page, info = resume_page(key, info["next_cursor"], page_size)
+        pages.append(page)
+    return pages
+
+
+def test_single_page_has_no_cursor_and_stores_nothing(data_cache):
+    page, info = paginate(KEY, _frame(5), 10)
+
+    assert len(page) == 5
+    assert info["next_cursor"] is None and info["total"] == 5
+    assert data_cache.generations(PAGES_DATASET) == {}
+
+
+def test_no_page_size_returns_everything():
+    df = _frame(5)
+    page, info = paginate(KEY, df, 0)
+
+    assert page is df and info is None
+
+
+def test_pages_cover_result_without_gaps_or_overlap(data_cache):
+    df = _frame(25)
+    pages = _all_pages(KEY, df, 10)
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    pd.testing.assert_frame_equal(pd.concat(pages, ignore_index=True), df)
+
+
+def test_cursor_format(data_cache):
+    _, info = paginate(KEY, _frame(25), 10)
+    result_id, _, offset = info["next_cursor"].partition(".")
+
+    assert offset == "10"
+    assert len(result_id) == 24 and set(result_id) <= set("0123456789abcdef")
+
+
+def test_cursor_from_other_query_is_rejected(data_cache):
+    _, info = paginate(KEY, _frame(25), 10)
+
+    with pytest.raises(ValueError, match="不匹配"):
+        resume_page('get_stock_income_statement:{"symbol": "000001"}', info["next_cursor"], 10)
+
+
+@pytest.mark.parametrize("cursor", ["", "abc", "abc.10", "0" * 24, "0" * 24 + ".x", "../../x.1"])
+def test_malformed_cursor_is_rejected(data_cache, cursor):
+    with pytest.raises(ValueError, match="格式"):
+        resume_page(KEY, cursor, 10)
+
+
+def test_expired_cursor_is_rejected(data_cache):
+    _, info = paginate(KEY, _frame(25), 10)
+    data_cache.invalidate(PAGES_DATASET)
+
+    with pytest.raises(ValueError, match="过期"):
+        resume_page(KEY, info["next_cursor"], 10)
@@ -0,0 +1,92 @@
+"""浸泡测试脚本的采样与回归判断测试"""
+import asyncio
+import importlib
+import json
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def soak(stub_upstream):
+    return importlib.import_module("soak_test")
+
+
+def _sample(soak, elapsed: float, rss: float = 100.0, objects: int = 50000, p95: float = 20.0, fds: int = 30) -> dict:
+    return {
+        "elapsed_s": elapsed,
+        "rss_mb": rss,
+        "cache_memory_mb": 0.0,
+        "response_cache_mb": 0.0,
+        "objects": {"total": objects, **{name: 100 for name in soak.TRACKED_TYPES}},
+        "latency_ms": {"ALL": {"p95": p95}},
+        "open_fds": fds,
+        "threads": 10,
+    }
+
+
+def _samples(soak, **growth) -> list:
+    """一小时内每6分钟一个采样，指定的指标从初始值线性增长到 growth 给出的终值"""
+    start = {"rss": 100.0, "objects": 50000, "p95": 20.0, "fds": 30}
+    samples = []
+    for i in range(11):
+        values = {
+            name: type(start[name])(start[name] + (growth.get(name, start[name]) - start[name]) * i / 10)
+            for name in start
+        }
+        samples.append(_sample(soak, i * 360.0, **values))
+    return samples
+
+
+def test_slope_per_hour(soak):
+    assert soak.slope_per_hour([(0, 100.0), (1800, 110.0), (3600, 120.0)]) == pytest.approx(20.0)
+    assert soak.slope_per_hour([(0, 100.0)]) == 0.0
+
+
+def test_latency_summary(soak):
+    summary = soak.latency_summary({"a": [0.01, 0.02, 0.03], "b": [0.1]})
+
+    assert summary["a"]["count"] == 3
+    assert summary["a"]["p50"] == 20.0
+    assert summary["ALL"]["count"] == 4
+    assert summary["ALL"]["max"] == 100.0
+
+
+def test_stable_run_has_no_regressions(soak):
+    assert soak.analyze(_samples(soak), soak.parse_args([])) == []
+
+
+@pytest.mark.parametrize("growth, expected", [
+    ({"rss": 150.0}, "RSS 持续增长"),
+    ({"objects": 80000}, "total 对象数"),
+    ({"p95": 60.0}, "p95 延迟"),
+    ({"fds": 60}, "open_fds"),
+])
+def test_regressions_are_reported(soak, growth, expected):
+    regressions = soak.analyze(_samples(soak, **growth), soak.parse_args(["--warmup", "0"]))
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith(expected)
+
+
+def test_warmup_samples_are_ignored(soak):
+    samples = _samples(soak)
+    # 预热期内的高延迟和 RSS 增长不计入
+    samples[0].update(rss_mb=20.0)
+    samples[0]["latency_ms"]["ALL"]["p95"] = 1.0
+
+    assert soak.analyze(samples, soak.parse_args(["--warmup", "300"])) == []
+    assert soak.analyze(samples[:2], soak.parse_args(["--warmup", "0"])) == []
+
+
+def test_short_run_writes_samples(soak, tmp_path):
+    output = tmp_path / "soak.jsonl"
+    args = soak.parse_args([
+        "--duration", "2", "--sample-interval", "1", "--symbols", "20", "--concurrency", "2", "--output", str(output)
+    ])
+
+    samples = asyncio.run(soak.run_soak(args, output))
+
+    assert len(samples) == 2
+    assert [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()] == samples
+    assert sum(sample["calls"] for sample in samples) > 0
+    assert all(sample["errors"] == {} for sample in samples), [s["error_samples"] for s in samples]
@@ -0,0 +1,110 @@
+"""全市场行情快照测试"""
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from src.utils import spot_quotes
+from src.utils.spot_quotes import SpotQuotes
+
+
+class FakeSpot:
+    """stock_zh_a_spot_em 的替代，记录调用次数"""
+
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.fail = False
+        self.delay = delay
+        self.price = 10.0
+
+    def __call__(self, name, **kwargs):
+        assert name == "stock_zh_a_spot_em"
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return pd.DataFrame({
+            "序号": [1, 2],
+            "代码": ["600519", "000001"],
+            "名称": ["贵州茅台", "平安银行"],
+            "最新价": [self.price, self.price / 100],
+        })
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = FakeSpot()
+    monkeypatch.setattr(spot_quotes, "call_upstream", fake)
+    return fake
+
+
+def _expire(quotes: SpotQuotes):
+    quotes._fetched_at -= quotes.ttl_seconds + 1
+
+
+def test_quotes_share_one_snapshot(upstream):
+    quotes = SpotQuotes(ttl_seconds=60)
+
+    found, missing, _ = quotes.quotes(["600519", "999999"])
+    quotes.quotes(["000001"])
+
+    assert upstream.calls == 1
+    assert found["代码"].tolist() == ["600519"]
+    assert "序号" not in found.columns
+    assert missing == ["999999"]
+
+
+def test_concurrent_queries_refresh_once(upstream):
+    upstream.delay = 0.1
+    quotes = SpotQuotes(ttl_seconds=60)
+    threads = [threading.Thread(target=quotes.snapshot) for _ in range(8)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert upstream.calls == 1
+
+
+def test_expired_snapshot_is_refreshed(upstream):
+    quotes = SpotQuotes(ttl_seconds=60)
+    quotes.snapshot()
+    upstream.price = 12.0
+    _expire(quotes)
+
+    table, _ = quotes.snapshot()
+
+    assert upstream.calls == 2
+    assert table.loc["600519", "最新价"] == 12.0
+
+
+def test_failed_refresh_serves_previous_snapshot_without_retrying(upstream):
+    quotes = SpotQuotes(ttl_seconds=60)
+    quotes.snapshot()
+    upstream.fail = True
+    _expire(quotes)
+
+    table, _ = quotes.snapshot()
+    quotes.snapshot()
+
+    assert upstream.calls == 2
+    assert table.loc["600519", "最新价"] == 10.0
+
+
+def test_failure_without_snapshot_backs_off(upstream):
+    upstream.fail = True
+    quotes = SpotQuotes(ttl_seconds=60)
+
+    for _ in range(3):
+        with pytest.raises(ValueError, match="upstream down"):
+            quotes.snapshot()
+
+    assert upstream.calls == 1
+
+    # 到达重试时间后再次请求上游
+    quotes._failed_at -= quotes.ttl_seconds + 1
+    upstream.fail = False
+    quotes.snapshot()
+    assert upstream.calls == 2
@@ -0,0 +1,79 @@
+"""A股代码全集测试"""
+import json
+
+import pandas as pd
+import pytest
+
+from src.tools.stock_info import get_all_stocks, search_stock
+from src.utils import stock_universe
+from src.utils.stock_universe import StockUniverse
+
+
+class FakeList:
+    """stock_info_a_code_name 的替代，记录调用次数"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def __call__(self, name, **kwargs):
+        assert name == "stock_info_a_code_name"
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return pd.DataFrame({
+            "code": ["000001", "600519", "300750", "2"],
+            "name": ["平安银行", "贵州茅台", "宁德时代", "测 试"],
+        })
+
+
+@pytest.fixture
+def upstream(data_cache, monkeypatch):
+    fake = FakeList()
+    monkeypatch.setattr(stock_universe, "call_upstream", fake)
+    return fake
+
+
+@pytest.fixture
+def universe(upstream, monkeypatch):
+    universe = StockUniverse(ttl_seconds=3600)
+    monkeypatch.setattr(stock_universe, "_universe", universe)
+    return universe
+
+
+def test_bitmap_membership(universe, upstream):
+    assert universe.contains("600519") is True
+    assert universe.contains("600518") is False
+    assert universe.contains("000001") is True
+    # 上游返回的代码缺少前导零时补齐
+    assert universe.contains("000002") is True
+    assert universe.code_for_name("测试") == "000002"
+    assert universe.stats()["stocks"] == 4
+    assert upstream.calls == 1
+
+
+def test_name_lookup_ignores_whitespace(universe):
+    assert universe.code_for_name("贵州茅台") == "600519"
+    assert universe.code_for_name("贵州 茅台") == "600519"
+    assert universe.code_for_name("不存在") is None
+
+
+def test_unavailable_list_returns_none(universe, upstream):
+    upstream.fail = True
+
+    assert universe.contains("600519") is None
+    assert universe.frame() is None
+    # 失败后在重试间隔内不再请求上游
+    universe.contains("600519")
+    assert upstream.calls == 1
+
+
+def test_tools_use_the_cached_list(universe, upstream):
+    found = json.loads(search_stock("茅台"))
+    listed = json.loads(get_all_stocks())
+    searched_again = json.loads(search_stock("600"))
+
+    assert [row["code"] for row in found["data"]] == ["600519"]
+    assert listed["count"] == 4
+    assert [row["code"] for row in searched_again["data"]] == ["600519"]
+    assert upstream.calls == 1
@@ -0,0 +1,111 @@
+"""请求追踪测试"""
+import asyncio
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import server
+from src.utils import tracing
+from src.utils.tracing import current_trace, request_trace, span, traced
+
+
+@pytest.fixture
+def emitted(monkeypatch):
+    """收集写出的追踪记录"""
+    records = []
+    monkeypatch.setattr(tracing, "_emit", lambda trace: records.append(trace.to_dict()))
+    return records
+
+
+@traced("validate")
+def _validate(depth: int) -> int:
+    return depth if depth == 0 else _validate(depth - 1)
+
+
+def test_spans_nest_and_aggregate_by_stage(emitted):
+    with request_trace("demo") as trace:
+        with span("upstream_fetch", endpoint="a"):
+            with span("cache_lookup"):
+                pass
+        with span("upstream_fetch", endpoint="b"):
+            pass
+        with span("upstream_fetch", endpoint="a"):
+            pass
+
+    record = emitted[0]
+    assert record["trace_id"] == trace.trace_id
+    assert record["tool"] == "demo"
+    assert set(record["stages_ms"]) == {"upstream_fetch", "cache_lookup"}
+    assert set(record["upstream_ms"]) == {"a", "b"}
+
+    spans = {item["span_id"]: item for item in record["spans"]}
+    root = next(item for item in record["spans"] if item["parent_span_id"] is None)
+    lookup = next(item for item in record["spans"] if item["name"] == "cache_lookup")
+    assert root["name"] == "tool"
+    assert spans[lookup["parent_span_id"]]["attributes"] == {"endpoint": "a"}
+    assert record["duration_ms"] >= max(item["duration_ms"] for item in record["spans"])
+
+
+def test_nested_spans_with_same_name_are_merged(emitted):
+    with request_trace("demo"):
+        assert _validate(3) == 0
+
+    assert [item["name"] for item in emitted[0]["spans"]] == ["tool", "validate"]
+
+
+def test_spans_outside_a_trace_are_not_recorded(emitted):
+    with span("upstream_fetch") as current:
+        current.set(rows=1)
+
+    assert _validate(1) == 0
+    assert current_trace() is None
+    assert emitted == []
+
+
+def test_errors_mark_spans_and_root(emitted):
+    with request_trace("demo") as trace:
+        try:
+            with span("upstream_fetch"):
+                raise ConnectionError("upstream down")
+        except ConnectionError as e:
+            trace.record_error(e)
+
+    record = emitted[0]
+    fetch = next(item for item in record["spans"] if item["name"] == "upstream_fetch")
+    assert record["status"] == "error"
+    assert fetch["status"] == "error"
+    assert fetch["attributes"]["error"] == "ConnectionError"
+    assert "upstream down" in record["error"]
+
+
+def test_spans_in_copied_context_join_the_trace(emitted):
+    def work():
+        with span("simplify"):
+            pass
+
+    with request_trace("demo"):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            executor.submit(contextvars.copy_context().run, work).result()
+            # 未复制上下文的线程不在追踪中
+            executor.submit(work).result()
+
+    assert [item["name"] for item in emitted[0]["spans"]] == ["tool", "simplify"]
+
+
+def test_tool_call_records_fetch_then_cache_hit(emitted, data_cache, stub_upstream, monkeypatch):
+    monkeypatch.setattr(server, "get_response_cache", lambda: None)
+    arguments = {"symbol": "000021", "indicator_type": "all"}
+
+    for _ in range(2):
+        result = asyncio.run(server.call_tool("get_stock_financial_indicators", arguments))
+        assert json.loads(result[0].text).get("error") is not True
+
+    first, second = emitted
+    assert first["tool"] == "get_stock_financial_indicators"
+    assert "stock_financial_analysis_indicator" in first["upstream_ms"]
+    assert {"validate", "cache_lookup", "upstream_fetch", "serialize"} <= set(first["stages_ms"])
+    assert "upstream_fetch" not in second["stages_ms"]
+    lookup = next(item for item in second["spans"] if item["name"] == "cache_lookup")
+    assert lookup["attributes"]["symbol"] == "000021"
@@ -0,0 +1,94 @@
+"""上游请求调度测试"""
+import threading
+import time
+
+import pytest
+
+from src.utils.upstream_scheduler import (
+    BULK,
+    INTERACTIVE,
+    UpstreamScheduler,
+    current_workload,
+    workload
+)
+
+
+@pytest.mark.parametrize("max_concurrency, share, bulk_limit", [
+    (8, 0.5, 4),
+    (2, 1.0, 1),
+    (4, 0.9, 3),
+    (4, 0.0, 1),
+    (1, 0.5, 1),
+])
+def test_bulk_limit_leaves_a_slot_for_interactive(max_concurrency, share, bulk_limit):
+    assert UpstreamScheduler(max_concurrency, share).bulk_limit == bulk_limit
+
+
+def test_workload_context():
+    assert current_workload() == INTERACTIVE
+    with workload(BULK):
+        assert current_workload() == BULK
+    assert current_workload() == INTERACTIVE
+    with pytest.raises(ValueError):
+        with workload("other"):
+            pass
+
+
+def _hold(scheduler: UpstreamScheduler, name: str, release: threading.Event, order: list):
+    with scheduler.slot(name):
+        order.append(name)
+        release.wait(5)
+
+
+def _wait_until(predicate):
+    deadline = time.monotonic() + 5
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_bulk_cannot_take_the_reserved_slot():
+    scheduler = UpstreamScheduler(2, 1.0)
+    release = threading.Event()
+    order = []
+    threads = [threading.Thread(target=_hold, args=(scheduler, BULK, release, order)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: scheduler.stats()["workloads"][BULK]["queued"] == 1)
+
+    # 批量请求占满自己的名额后，交互查询仍可以立即开始
+    with scheduler.slot(INTERACTIVE) as waited:
+        assert waited < 1
+        assert scheduler.stats()["workloads"][BULK]["active"] == 1
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert order == [BULK, BULK]
+
+
+def test_queued_interactive_goes_before_queued_bulk():
+    scheduler = UpstreamScheduler(2, 0.5)
+    release = threading.Event()
+    order = []
+    holders = [
+        threading.Thread(target=_hold, args=(scheduler, INTERACTIVE, release, order)) for _ in range(2)
+    ]
+    for thread in holders:
+        thread.start()
+    _wait_until(lambda: len(order) == 2)
+
+    finish = threading.Event()
+    finish.set()
+    bulk = threading.Thread(target=_hold, args=(scheduler, BULK, finish, order))
+    bulk.start()
+    _wait_until(lambda: scheduler.stats()["workloads"][BULK]["queued"] == 1)
+    interactive = threading.Thread(target=_hold, args=(scheduler, INTERACTIVE, finish, order))
+    interactive.start()
+    _wait_until(lambda: scheduler.stats()["workloads"][INTERACTIVE]["queued"] == 1)
+
+    release.set()
+    for thread in holders + [bulk, interactive]:
+        thread.join()
+    # 先到的批量请求排在后到的交互查询之后
+    assert order[2:] == [INTERACTIVE, BULK]
@@ -0,0 +1,84 @@
+"""估值 as-of 对齐测试"""
+import numpy as np
+import pandas as pd
+
+from src.utils.valuation import _disclosure_dates, compute_valuation
+
+
+def _fundamentals(rows):
+    df = pd.DataFrame(rows, columns=[
+        "股票代码", "报告期", "披露日期", "归母净利润TTM", "营业总收入TTM", "归母净资产", "总股本"
+    ])
+    df["报告期"] = pd.to_datetime(df["报告期"])
+    df["披露日期"] = pd.to_datetime(df["披露日期"])
+    return df
+
+
+def _prices(symbol, days, close=10.0):
+    return pd.DataFrame({"股票代码": symbol, "日期": days, "收盘": close})
+
+
+def test_disclosure_dates_fall_back_to_statutory_deadlines():
+    reports = pd.to_datetime(pd.Series(["2023-03-31", "2023-06-30", "2023-09-30", "2023-12-31", "2023-12-31"]))
+    notices = pd.Series([None, None, None, None, "2024-03-20"])
+
+    result = _disclosure_dates(reports, notices).dt.strftime("%Y-%m-%d").tolist()
+
+    assert result == ["2023-04-30", "2023-08-31", "2023-10-31", "2024-04-30", "2024-03-20"]
+
+
+def test_uses_latest_report_disclosed_before_trading_day():
+    fundamentals = _fundamentals([
+        ["600519", "2023-12-31", "2024-03-28", 100.0, 500.0, 400.0, 10.0],
+        ["600519", "2024-03-31", "2024-04-29", 200.0, 600.0, 800.0, 10.0],
+    ])
+    prices = _prices("600519", ["2024-03-27", "2024-04-26", "2024-04-29", "2024-04-30"])
+
+    result = compute_valuation(prices, fundamentals).set_index("日期")
+
+    assert np.isnan(result.loc["2024-03-27", "市盈率TTM"])
+    # 披露当日仍使用上一期数据
+    assert result.loc["2024-04-29", "对应报告期"] == "2023-12-31"
+    assert result.loc["2024-04-30", "对应报告期"] == "2024-03-31"
+    assert result.loc["2024-04-26", "总市值"] == 100.0
+    assert result.loc["2024-04-26", "市盈率TTM"] == 1.0
+    assert result.loc["2024-04-30", "市盈率TTM"] == 0.5
+    assert result.loc["2024-04-30", "市净率"] == 0.125
+    assert result.loc["2024-04-30", "市销率TTM"] == round(100 / 600, 4)
+
+
+def test_joins_each_symbol_with_its_own_reports():
+    fundamentals = _fundamentals([
+        ["600519", "2023-12-31", "2024-03-28", 100.0, 500.0, 400.0, 10.0],
+        ["000001", "2023-12-31", "2024-03-15", 50.0, 100.0, 200.0, 20.0],
+    ])
+    prices = pd.concat([
+        _prices("600519", ["2024-03-20", "2024-04-01"]),
+        _prices("000001", ["2024-03-20", "2024-04-01"], close=5.0),
+    ], ignore_index=True)
+
+    result = compute_valuation(prices, fundamentals)
+
+    assert list(result["股票代码"]) == ["000001", "000001", "600519", "600519"]
+    assert list(result["市盈率TTM"].fillna(-1)) == [2.0, 2.0, -1, 1.0]
+
+
+def test_same_day_disclosures_use_newer_report():
+    fundamentals = _fundamentals([
+        ["600519", "2023-12-31", "2024-04-25", 100.0, 500.0, 400.0, 10.0],
+        ["600519", "2024-03-31", "2024-04-25", 200.0, 600.0, 800.0, 10.0],
+    ])
+    result = compute_valuation(_prices("600519", ["2024-04-26"]), fundamentals)
+
+    assert result["对应报告期"].iloc[0] == "2024-03-31"
+
+
+def test_loss_or_negative_equity_gives_nan_ratio():
+    fundamentals = _fundamentals([
+        ["600519", "2023-12-31", "2024-03-28", -100.0, 500.0, -1.0, 10.0],
+    ])
+    result = compute_valuation(_prices("600519", ["2024-04-01"]), fundamentals)
+
+    assert np.isnan(result["市盈率TTM"].iloc[0])
+    assert np.isnan(result["市净率"].iloc[0])
+    assert result["市销率TTM"].iloc[0] == 0.2
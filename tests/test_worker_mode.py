@@ -0,0 +1,75 @@
+"""多进程模式测试（工作进程与主进程通过共享的磁盘层交换缓存数据）"""
+import asyncio
+import json
+
+import pytest
+
+from src.tools.cache_tools import invalidate_cache
+from src.tools.financial_data import (
+    get_stock_derived_metrics,
+    get_stock_financial_indicators,
+    get_stock_income_statement
+)
+from src.utils.arrow_io import is_arrow_table
+from src.utils.data_formatter import ErrorResponse
+from src.utils.data_source import get_data_cache
+from src.utils.derived_metrics import get_derived_metrics_store
+from src.utils.worker_pool import WorkerPool
+
+
+def cached_rows(dataset: str, symbol: str) -> str:
+    """在工作进程中读取缓存（返回行数，未缓存时为null）"""
+    df = get_data_cache().get(dataset, symbol)
+    return json.dumps(None if df is None else len(df))
+
+
+@pytest.fixture(scope="module")
+def pool(stub_upstream):
+    # 单个工作进程：保证后续任务由持有内存层数据的同一进程执行
+    pool = WorkerPool(1)
+    yield pool
+    pool.shutdown()
+
+
+def _run(pool: WorkerPool, func, **kwargs) -> dict:
+    return json.loads(asyncio.run(pool.run_tool(func, **kwargs)))
+
+
+def test_derived_metrics_use_statements_fetched_by_worker(pool):
+    # 主进程先计算过派生指标（建立磁盘层索引），利润表之后由工作进程写入
+    assert get_derived_metrics_store().lookup("000011") is None
+    statement = _run(pool, get_stock_income_statement, symbol="000011")
+    assert statement.get("error") is not True
+
+    derived = json.loads(get_stock_derived_metrics("000011"))
+    assert derived.get("error") is not True
+    assert derived["count"] > 0
+
+
+def test_invalidate_reaches_worker_cache(pool):
+    get_data_cache().disk_bytes()
+    assert _run(pool, get_stock_financial_indicators, symbol="000012").get("error") is not True
+    assert _run(pool, cached_rows, dataset="indicators", symbol="000012") > 0
+
+    result = json.loads(invalidate_cache("indicators", "000012"))
+
+    assert result["removed"] == 1
+    assert _run(pool, cached_rows, dataset="indicators", symbol="000012") is None
+
+
+def test_worker_error_responses_keep_their_flag(pool):
+    error = asyncio.run(pool.run_tool(get_stock_income_statement, symbol="bad"))
+    result = asyncio.run(pool.run_tool(get_stock_income_statement, symbol="000013"))
+
+    assert isinstance(error, ErrorResponse)
+    assert not isinstance(result, ErrorResponse)
+
+
+def test_batch_results_hand_off_arrow_tables(pool):
+    fragments, success_count, table = asyncio.run(pool.run_batch(["000014", "000015", "bad"], "all", with_table=True))
+
+    assert success_count == 2
+    assert [json.loads(fragment)["symbol"] for fragment in fragments] == ["000014", "000015", "bad"]
+    assert json.loads(fragments[2])["data"] is None
+    assert is_arrow_table(table)
+    assert set(table.column("股票代码").to_pylist()) == {"000014", "000015"}